@@ -1,22 +1,36 @@
-"""Flask application for real-time data streaming dashboard."""
+"""
+Flask application for real-time data streaming dashboard.
+
+Importing this module has no side effects. create_app() configures logging,
+builds the components and the Flask app, and only then imports the ingestion,
+transformation and storage stacks (requests, NumPy, SQLite). It runs on first
+access to `app` or any component, so `gunicorn backend.app:app` and
+`from backend.app import app` keep working.
+"""
 import logging
+import math
 import os
-from flask import Flask, render_template, jsonify
+import threading
+import time
+from flask import Blueprint, Flask, Response, g, render_template, jsonify, request
 from datetime import datetime, timedelta
+from backend.broadcast import SnapshotBroadcaster
+from backend.cache import SnapshotCache
+from backend.circuit_breaker import CircuitBreaker
+from backend.candles import CandleAggregator, candle_dict
+from backend.delta import delta_data
+from backend.export import FORMATS as EXPORT_FORMATS, export_chunks
 from backend.config import current_config
-from backend.data_ingestion import CoinGeckoIngester
-from backend.transformations import DataTransformer
-
-# Setup logging
-os.makedirs('./logs', exist_ok=True)
-logging.basicConfig(
-    level=current_config.LOG_LEVEL,
-    format=current_config.LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(current_config.LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+from backend.metrics import MetricsRegistry
+from backend.quality import QualityEngine
+from backend.ranking import RankIndexer
+from backend.rate_limiter import TokenBucket
+from backend.retention import Compactor, RetentionPolicy
+from backend.ring_buffer import FIELDS, RecentTicks, column_stats
+from backend.scheduler import IngestionScheduler
+from backend.serialization import EncodedBody, ResponseCache, dumps, etag_variants, loads
+from backend.warm_start import LastGoodSnapshot
+
 logger = logging.getLogger(__name__)
 
 # Determine the project root directory
@@ -24,89 +38,529 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 template_folder = os.path.join(project_root, 'frontend')
 static_folder = os.path.join(project_root, 'frontend')
 
-# Initialize Flask app with absolute paths
-app = Flask(__name__, template_folder=template_folder, static_folder=static_folder)
-app.config.from_object(current_config)
+# Cache TTL in seconds (60 seconds minimum to respect API rate limits)
+CACHE_TTL = 60
 
-# Initialize components
-ingester = CoinGeckoIngester(current_config.COINGECKO_API_URL, current_config.CRYPTOS)
-transformer = DataTransformer(current_config)
+# Module attributes assigned by create_app(); reading any of them creates the app
+COMPONENTS = (
+    'app', 'metrics', 'ingester', 'transformer', 'history_store', 'compactor', 'recent_ticks', 'candle_aggregator',
+    'rank_indexer', 'response_cache', 'query_cache', 'broadcaster', 'snapshot_cache', 'scheduler', 'shared_sync',
+    'last_snapshot'
+)
+_create_lock = threading.RLock()
 
-# In-memory cache for latest data
-cache = {
-    'latest_data': None,
-    'last_update': None,
-    'update_count': 0,
-    'error_count': 0,
-    'cache_expiry': None  # Timestamp when cache expires
-}
+bp = Blueprint('dashboard', __name__)
 
-# Cache TTL in seconds (60 seconds minimum to respect API rate limits)
-CACHE_TTL = 60
+
+def __getattr__(name):
+    """Create the app on first access to it or one of its components."""
+    if name in COMPONENTS:
+        create_app()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def configure_logging():
+    """Log to LOG_FILE and stderr; safe to call more than once."""
+    log_dir = os.path.dirname(current_config.LOG_FILE)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    logging.basicConfig(
+        level=current_config.LOG_LEVEL,
+        format=current_config.LOG_FORMAT,
+        handlers=[
+            logging.FileHandler(current_config.LOG_FILE),
+            logging.StreamHandler()
+        ]
+    )
+
+
+
+def _build_ingester(metrics, recorder=None):
+    """
+    Build the live ingester for MARKET_DATA_SOURCES.
+
+    One source is used directly; several are wrapped in a HedgedIngester.
+    The recorder captures what the pipeline receives, i.e. merged payloads
+    when hedging.
+    """
+    from backend.coincap import CoinCapIngester
+    from backend.data_ingestion import CoinGeckoIngester
+    from backend.hedging import HedgedIngester
+
+    hedged = len(current_config.MARKET_DATA_SOURCES) > 1
+    providers = []
+    for source in current_config.MARKET_DATA_SOURCES:
+        if source == 'coingecko':
+            providers.append(CoinGeckoIngester(
+                current_config.COINGECKO_API_URL,
+                current_config.CRYPTOS,
+                chunk_size=current_config.INGESTION_CHUNK_SIZE,
+                max_workers=current_config.INGESTION_MAX_WORKERS,
+                rate_limiter=TokenBucket(
+                    current_config.COINGECKO_CALLS_PER_MINUTE,
+                    capacity=current_config.COINGECKO_RATE_BURST
+                ),
+                metrics=metrics,
+                vs_currencies=current_config.VS_CURRENCIES,
+                default_retry_after=current_config.RETRY_AFTER_DEFAULT,
+                recorder=None if hedged else recorder
+            ))
+        elif source == 'coincap':
+            providers.append(CoinCapIngester(
+                current_config.COINCAP_API_URL,
+                current_config.CRYPTOS,
+                api_key=current_config.COINCAP_API_KEY,
+                chunk_size=current_config.INGESTION_CHUNK_SIZE,
+                rate_limiter=TokenBucket(current_config.COINCAP_CALLS_PER_MINUTE),
+                metrics=metrics,
+                default_retry_after=current_config.RETRY_AFTER_DEFAULT
+            ))
+        else:
+            raise ValueError(f"Unknown market data source '{source}'")
+    if not providers:
+        raise ValueError("MARKET_DATA_SOURCES is empty")
+    if not hedged:
+        return providers[0]
+    return HedgedIngester(
+        providers,
+        hedge_delay=current_config.HEDGE_DELAY_MS / 1000 if current_config.HEDGE_DELAY_MS > 0 else None,
+        merge_wait=current_config.HEDGE_MERGE_WAIT_MS / 1000,
+        timeout=current_config.HEDGE_TIMEOUT,
+        metrics=metrics,
+        recorder=recorder
+    )
+
+def create_app():
+    """
+    Build the Flask app and its components once per process.
+
+    Returns:
+        The Flask app; later calls return the same instance
+    """
+    global app, metrics, ingester, transformer, history_store, compactor, recent_ticks, candle_aggregator, rank_indexer
+    global response_cache, query_cache, broadcaster, snapshot_cache, scheduler, shared_sync, last_snapshot
+    with _create_lock:
+        existing = globals().get('app')
+        if existing is not None:
+            return existing
+        started = time.perf_counter()
+        configure_logging()
+
+        # requests, NumPy and SQLite load with the app, not with the module
+        from backend.replay import ReplayIngester, SegmentRecorder
+        from backend.shared_snapshot import SharedSnapshotSync
+        from backend.storage import HistoryStore
+        from backend.transformations import DataTransformer
+
+        metrics = MetricsRegistry(detailed_timing=current_config.METRICS_DETAILED_TIMING)
+        if current_config.INGESTION_MODE == 'replay':
+            # Offline load testing: recorded payloads instead of the network
+            ingester = ReplayIngester(
+                current_config.RECORDINGS_DIR,
+                speed=current_config.REPLAY_SPEED,
+                loop=current_config.REPLAY_LOOP
+            )
+        else:
+            ingester = _build_ingester(metrics, SegmentRecorder(
+                current_config.RECORDINGS_DIR,
+                max_records=current_config.RECORD_SEGMENT_RECORDS
+            ) if current_config.INGESTION_MODE == 'record' else None)
+        transformer = DataTransformer(current_config, quality_engine=QualityEngine(current_config), metrics=metrics)
+        retention = RetentionPolicy(current_config.HISTORY_RAW_RETENTION, current_config.HISTORY_ROLLUPS)
+        history_store = HistoryStore(
+            os.path.join(current_config.CACHE_DIR, current_config.DATABASE_FILE),
+            batch_size=current_config.HISTORY_BATCH_SIZE,
+            queue_size=current_config.HISTORY_QUEUE_SIZE,
+            retention=retention
+        )
+        compactor = Compactor(
+            history_store,
+            retention,
+            interval=current_config.COMPACTION_INTERVAL,
+            slice_seconds=current_config.COMPACTION_SLICE_SECONDS,
+            settle=current_config.COMPACTION_SETTLE
+        )
+        recent_ticks = RecentTicks(current_config.RECENT_TICKS_CAPACITY)
+        candle_aggregator = CandleAggregator(current_config.CANDLE_INTERVALS, window=current_config.CANDLE_WINDOW)
+        rank_indexer = RankIndexer()
+        response_cache = ResponseCache(metrics=metrics)
+        # /api/query keys carry client-chosen bounds; a sweep must not evict hot bodies
+        query_cache = ResponseCache(max_entries=current_config.QUERY_CACHE_ENTRIES, metrics=metrics)
+        broadcaster = SnapshotBroadcaster(
+            heartbeat_interval=current_config.SSE_HEARTBEAT_INTERVAL,
+            retry_ms=current_config.SSE_RETRY_MS,
+            max_clients=current_config.SSE_MAX_CLIENTS or None
+        )
+        last_snapshot = LastGoodSnapshot(
+            current_config.LAST_SNAPSHOT_FILE
+        ) if current_config.WARM_START_ENABLED else None
+
+        # In-memory cache for latest data; readers get an immutable Snapshot
+        snapshot_cache = SnapshotCache(ttl=CACHE_TTL, on_publish=_fan_out)
+        if current_config.INGESTION_MODE == 'replay':
+            # Replay paces itself from the recorded timestamps
+            scheduler = IngestionScheduler(
+                ingester, transformer, publish_snapshot, 0,
+                on_error=record_error,
+                on_unchanged=snapshot_cache.touch
+            )
+        else:
+            scheduler = IngestionScheduler(
+                ingester,
+                transformer,
+                publish_snapshot,
+                current_config.INGESTION_INTERVAL,
+                on_error=record_error,
+                on_unchanged=snapshot_cache.touch,
+                min_interval=current_config.INGESTION_MIN_INTERVAL if current_config.ADAPTIVE_POLLING else None,
+                max_backoff=current_config.INGESTION_MAX_BACKOFF,
+                rate_limiter=ingester.rate_limiter,
+                calls_per_cycle=ingester.calls_per_fetch,
+                retry_after=ingester.retry_after_remaining,
+                breaker=CircuitBreaker(
+                    current_config.CIRCUIT_BREAKER_THRESHOLD,
+                    reset_timeout=current_config.CIRCUIT_BREAKER_RESET_TIMEOUT
+                )
+            )
+        # With several workers only the elected leader runs the scheduler
+        shared_sync = SharedSnapshotSync(
+            current_config.SHARED_SNAPSHOT_PATH,
+            on_leader=_start_leader_jobs,
+            on_snapshot=_mirror_shared_snapshot,
+            slot_capacity=current_config.SHARED_SNAPSHOT_CAPACITY,
+            poll_interval=current_config.SHARED_SNAPSHOT_POLL_MS / 1000
+        ) if current_config.SHARED_SNAPSHOT_ENABLED else None
+
+        warm_start()
+
+        # Initialize Flask app with absolute paths
+        flask_app = Flask(__name__, template_folder=template_folder, static_folder=static_folder)
+        flask_app.config.from_object(current_config)
+        flask_app.register_blueprint(bp)
+        app = flask_app
+        logger.info(f"App created in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return app
+
+
+def warm_start():
+    """Serve the last persisted snapshot until the first successful refresh."""
+    if last_snapshot is None:
+        return
+    loaded = last_snapshot.load()
+    if loaded is None:
+        return
+    payload, body = loaded
+    snapshot = snapshot_cache.restore(
+        payload['data'],
+        version=payload['version'],
+        update_count=payload.get('stats', {}).get('update_count', 0),
+        error_count=payload.get('stats', {}).get('error_count', 0),
+        last_update=payload.get('last_update')
+    )
+    if snapshot.version != payload['version']:
+        return
+    # The persisted bytes are the /api/data body of that version; serve them as-is
+    encoded = EncodedBody(body)
+    response_cache.put(('data', data_etag(snapshot)), encoded)
+    broadcaster.publish(snapshot.version, encoded.raw)
+    logger.info(f"Warm start: serving persisted snapshot version {snapshot.version} "
+                f"from {snapshot.last_update}")
+
+
+def currency_view(data, currency='usd'):
+    """
+    A transformed snapshot as served in one quote currency.
+
+    USD is the snapshot itself without its 'quotes'; other currencies swap
+    in their rows and summary. None if the currency has no quotes yet.
+    """
+    if data is None:
+        return None
+    if currency == 'usd':
+        if 'quotes' not in data:
+            return data
+        return {key: value for key, value in data.items() if key != 'quotes'}
+    quote = (data.get('quotes') or {}).get(currency)
+    if quote is None:
+        return None
+    view = {key: value for key, value in data.items() if key not in ('quotes', 'cryptos', 'summary')}
+    view['currency'] = currency
+    view['cryptos'] = quote['cryptos']
+    view['summary'] = quote['summary']
+    return view
+
+
+def data_payload(snapshot, data=None, currency='usd'):
+    """Build the /api/data response body for a snapshot."""
+    return {
+        'data': currency_view(snapshot.data, currency) if data is None else data,
+        'currency': currency,
+        'version': snapshot.version,
+        'last_update': snapshot.last_update,
+        'stats': {
+            'update_count': snapshot.update_count,
+            'error_count': snapshot.error_count
+        }
+    }
 
 
-@app.route('/')
+def _fan_out(snapshot):
+    """Feed a newly published snapshot to ticks, candles, indexes, history, other workers, SSE clients and disk."""
+    from backend.storage import to_epoch
+
+    transformed_data = snapshot.data
+    follower = shared_sync is not None and shared_sync.is_follower
+    timestamp = to_epoch(transformed_data['timestamp'])
+    recent_ticks.ingest(transformed_data, timestamp)
+    sealed = candle_aggregator.ingest(transformed_data, timestamp)
+    rank_indexer.index_for(snapshot)
+    if current_config.HISTORY_ENABLED and not follower:
+        # Only coins whose record changed in this version are persisted
+        history_store.enqueue(transformed_data, only_ids=snapshot.changes.changed_in(snapshot.version))
+        history_store.enqueue_candles(sealed)
+    # Serialize and compress the /api/data body once; SSE shares the same bytes
+    body = response_cache.get_or_build(
+        ('data', data_etag(snapshot)), lambda: data_payload(snapshot)
+    )
+    if shared_sync is not None and shared_sync.is_leader:
+        variants = body.variants
+        if transformed_data.get('quotes'):
+            # Followers rebuild the ?vs= views from these rows
+            variants = dict(variants, quotes=dumps(transformed_data['quotes']))
+        shared_sync.publish(snapshot.version, variants, snapshot.error_count, snapshot.update_count)
+    broadcaster.publish(snapshot.version, body.raw)
+    if last_snapshot is not None and not follower:
+        # Written and fsynced on the snapshot-writer thread, newest version only
+        last_snapshot.submit(snapshot.version, body.raw)
+
+
+def _mirror_shared_snapshot(shared_body):
+    """Follower: adopt a body the leader published, without re-serializing it."""
+    # WSGI servers need bytes, so each version is copied out of the mapping once
+    variants = {name: bytes(view) for name, view in shared_body.variants.items()}
+    quotes = variants.pop('quotes', None)
+    body = EncodedBody.from_variants(variants)
+    response_cache.put(('data', data_etag(shared_body)), body)
+    payload = loads(body.raw)
+    if quotes:
+        payload['data']['quotes'] = loads(quotes)
+    snapshot_cache.mirror(
+        payload['data'],
+        version=payload['version'],
+        update_count=payload['stats']['update_count'],
+        error_count=payload['stats']['error_count']
+    )
+
+
+def publish_snapshot(transformed_data):
+    """Publish a newly transformed snapshot to the cache and its consumers."""
+    return snapshot_cache.publish(transformed_data)
+
+
+def data_etag(snapshot, since=None, currency='usd'):
+    """ETag of the /api/data body for a snapshot, currency and optional delta base."""
+    etag = f"{snapshot.version}-{snapshot.error_count}"
+    if currency != 'usd':
+        etag += f"-{currency}"
+    if since is not None:
+        etag += f"-since{since}"
+    return etag
+
+
+def not_modified(etag):
+    """Return a 304 response if the request's If-None-Match matches any encoding of etag."""
+    for tag in etag_variants(etag).values():
+        if request.if_none_match.contains(tag):
+            response = Response(status=304)
+            response.set_etag(tag)
+            response.vary.add('Accept-Encoding')
+            return response
+    return None
+
+
+def encoded_response(body, etag=None, status=200):
+    """Serve a cached EncodedBody in the best encoding the client accepts."""
+    encoding = body.negotiate(request.accept_encodings)
+    response = Response(body.variants[encoding], status=status, mimetype='application/json')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    if etag:
+        response.set_etag(etag_variants(etag)[encoding])
+    return response
+
+
+def requested_currency():
+    """The ?vs= quote currency (default USD), or None if it is not configured."""
+    currency = (request.args.get('vs') or 'usd').lower()
+    return currency if currency in current_config.VS_CURRENCIES else None
+
+
+def unsupported_currency():
+    """400 response for a ?vs= currency that is not fetched."""
+    return jsonify({
+        'error': f"Unsupported currency '{request.args.get('vs')}'",
+        'supported': current_config.VS_CURRENCIES
+    }), 400
+
+
+def record_error():
+    """Increment the cache error counter."""
+    snapshot_cache.record_error()
+
+
+def fetch_and_transform():
+    """Fetch from upstream and transform; returns None on failure."""
+    raw_data = ingester.fetch_market_data()
+    if not raw_data:
+        logger.error("Failed to fetch market data")
+        return None
+    current = snapshot_cache.get().data
+    if raw_data['_metadata']['status'] == 'finished':
+        # Replay ran out: keep serving the last replayed snapshot
+        return current
+    if raw_data['_metadata']['status'] in ('not_modified', 'duplicate') and current is not None:
+        transformer.record_unchanged_payload()
+        return current
+    return transformer.transform_market_data(raw_data)
+
+
+def start_background_ingestion():
+    """
+    Start background ingestion if enabled in config.
+
+    Call once per process (e.g. from a gunicorn post_fork hook). With
+    SHARED_SNAPSHOT_ENABLED, one worker becomes the ingesting leader and the
+    others mirror its snapshots.
+    """
+    create_app()
+    if not current_config.INGESTION_ENABLED:
+        return
+    if shared_sync is not None:
+        shared_sync.start()
+    else:
+        _start_leader_jobs()
+
+
+def _start_leader_jobs():
+    """Start the jobs only one process may run: ingestion and history compaction."""
+    scheduler.start()
+    if current_config.HISTORY_ENABLED and current_config.COMPACTION_ENABLED:
+        compactor.start()
+
+
+def stop_background_ingestion():
+    """Stop the background ingestion scheduler, close streams and flush history writes."""
+    if globals().get('app') is None:
+        return
+    scheduler.stop()
+    compactor.stop()
+    if shared_sync is not None:
+        shared_sync.stop()
+    broadcaster.close()
+    history_store.stop()
+    if last_snapshot is not None:
+        last_snapshot.stop()
+    ingester.close()
+
+
+@bp.route('/')
 def index():
     """Serve the dashboard homepage."""
     return render_template('index.html')
 
 
-@app.route('/api/data')
+@bp.route('/api/data')
 def get_data():
-    """API endpoint to get latest data."""
-    return jsonify({
-        'data': cache['latest_data'],
-        'last_update': cache['last_update'],
-        'stats': {
-            'update_count': cache['update_count'],
-            'error_count': cache['error_count']
-        }
+    """
+    API endpoint to get latest data.
+
+    Supports If-None-Match (304 when unchanged), ?vs=<currency> for one of
+    VS_CURRENCIES, and ?since=<version>, which returns only crypto records
+    changed after that version (USD only; other currencies always get the
+    full view). Each currency's body is serialized once per version.
+    """
+    currency = requested_currency()
+    if currency is None:
+        return unsupported_currency()
+    snapshot = snapshot_cache.get()
+    since = request.args.get('since', type=int)
+    # A since from the future (e.g. before a restart) gets the full snapshot
+    if since is not None and not 0 <= since <= snapshot.version:
+        since = None
+
+    if snapshot.data is None or currency != 'usd':
+        since = None
+    etag = data_etag(snapshot, since, currency)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    def build():
+        if since is None:
+            return data_payload(snapshot, currency=currency)
+        payload = data_payload(snapshot, delta_data(currency_view(snapshot.data), snapshot.changes, since))
+        payload['since'] = since
+        payload['removed'] = snapshot.changes.removed_since(since)
+        return payload
+
+    return encoded_response(response_cache.get_or_build(('data', etag), build), etag)
+
+
+def refresh_response(snapshot, message, currency='usd'):
+    """Successful /api/refresh response, serialized once per version, message and currency."""
+    etag = str(snapshot.version) if currency == 'usd' else f"{snapshot.version}-{currency}"
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    body = response_cache.get_or_build(('refresh', snapshot.version, message, currency), lambda: {
+        'status': 'success',
+        'message': message,
+        'version': snapshot.version,
+        'currency': currency,
+        'data': currency_view(snapshot.data, currency)
     })
+    return encoded_response(body, etag)
 
 
-@app.route('/api/refresh')
+@bp.route('/api/refresh')
 def refresh_data():
-    """API endpoint to manually refresh data."""
+    """API endpoint to manually refresh data; accepts ?vs=<currency> like /api/data."""
+    currency = requested_currency()
+    if currency is None:
+        return unsupported_currency()
     try:
-        # Check if cache is still valid
-        if cache['cache_expiry'] and datetime.utcnow() < cache['cache_expiry']:
-            logger.info("Returning cached data (cache not yet expired)")
-            return jsonify({
-                'status': 'success',
-                'message': 'Returning cached data (API rate limit protection)',
-                'data': cache['latest_data']
-            }), 200
-        
-        # Fetch raw data
-        raw_data = ingester.fetch_market_data()
-        
-        if raw_data:
-            # Transform data
-            transformed_data = transformer.transform_market_data(raw_data)
-            
-            # Update cache with expiry time
-            cache['latest_data'] = transformed_data
-            cache['last_update'] = datetime.utcnow().isoformat()
-            cache['cache_expiry'] = datetime.utcnow() + timedelta(seconds=CACHE_TTL)
-            cache['update_count'] += 1
-            
-            logger.info(f"Data refreshed successfully. Valid records: {transformed_data['summary']['valid_count']}")
-            
-            return jsonify({
-                'status': 'success',
-                'message': f"Fetched {transformed_data['summary']['valid_count']} cryptocurrencies",
-                'data': transformed_data
-            }), 200
-        else:
-            cache['error_count'] += 1
-            logger.error("Failed to fetch market data")
+        # Background scheduler owns ingestion; never block on the network here
+        if scheduler.is_running:
+            return refresh_response(snapshot_cache.get(), 'Returning latest scheduled snapshot', currency)
+        # Followers never call upstream; the leader's snapshot is mirrored within milliseconds
+        if shared_sync is not None and shared_sync.is_follower:
+            return refresh_response(snapshot_cache.get(), 'Returning latest shared snapshot', currency)
+
+        # Exactly one caller refreshes an expired cache; the rest share its result
+        snapshot, outcome = snapshot_cache.get_or_refresh(
+            fetch_and_transform,
+            stale_while_revalidate=current_config.STALE_WHILE_REVALIDATE
+        )
+        metrics.inc('snapshot_cache_requests_total', outcome=outcome)
+
+        if outcome in ('hit', 'stale'):
+            logger.info(f"Returning cached data ({outcome})")
+            return refresh_response(snapshot, 'Returning cached data (API rate limit protection)', currency)
+
+        if outcome == 'failed':
             return jsonify({
                 'status': 'error',
                 'message': 'Failed to fetch market data from CoinGecko'
             }), 500
-            
+
+        valid_count = snapshot.data['summary']['valid_count']
+        logger.info(f"Data refreshed successfully. Valid records: {valid_count}")
+        return refresh_response(snapshot, f"Fetched {valid_count} cryptocurrencies", currency)
+
     except Exception as e:
-        cache['error_count'] += 1
+        record_error()
         logger.error(f"Error in refresh_data: {str(e)}")
         return jsonify({
             'status': 'error',
@@ -114,30 +568,325 @@ def refresh_data():
         }), 500
 
 
-@app.route('/api/health')
+@bp.route('/api/stream')
+def stream():
+    """
+    Server-Sent Events stream pushing each new snapshot to the client.
+
+    Each open stream holds a server thread, so beyond SSE_MAX_CLIENTS new
+    streams get a 503 and the dashboard falls back to polling.
+    """
+    if not broadcaster.has_capacity():
+        response = jsonify({'error': 'Too many open streams; poll /api/data instead'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(max(1, current_config.SSE_RETRY_MS // 1000))
+        return response
+    response = Response(
+        broadcaster.stream(request.headers.get('Last-Event-ID')),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def requested_range():
+    """
+    Parse ?from= and ?to= (ISO-8601 or epoch seconds; default the last 24 hours).
+
+    Returns:
+        Tuple of (start, end, error_response); error_response is None when valid
+    """
+    from backend.storage import to_epoch
+
+    try:
+        now = datetime.utcnow()
+        start = to_epoch(request.args.get('from') or now - timedelta(days=1))
+        end = to_epoch(request.args.get('to') or now)
+    except ValueError as e:
+        return None, None, (jsonify({'error': f"Invalid range parameter: {str(e)}"}), 400)
+    if end <= start:
+        return None, None, (jsonify({'error': "'to' must be after 'from'"}), 400)
+    return start, end, None
+
+
+@bp.route('/api/history')
+def get_history():
+    """
+    API endpoint for downsampled price history of one crypto.
+
+    At most about HISTORY_MAX_POINTS buckets are returned; a smaller ?step=
+    is raised to fit.
+    """
+    crypto_id = request.args.get('id')
+    if not crypto_id:
+        return jsonify({'error': "Missing required parameter 'id'"}), 400
+
+    start, end, error = requested_range()
+    if error:
+        return error
+    # A client-chosen step may be coarser, never finer, than HISTORY_MAX_POINTS allows
+    min_step = max(1.0, (end - start) / current_config.HISTORY_MAX_POINTS)
+    step = request.args.get('step', type=float)
+    if step is not None and not math.isfinite(step):
+        return jsonify({'error': "'step' must be a finite number of seconds"}), 400
+    if not step or step < min_step:
+        step = min_step
+
+    points = history_store.query(crypto_id.lower(), start, end, step)
+    return jsonify({
+        'id': crypto_id.lower(),
+        'from': start,
+        'to': end,
+        'step': step,
+        'points': points
+    })
+
+
+@bp.route('/api/export')
+def export_history():
+    """
+    Stream raw tick history as NDJSON or CSV (?from=, ?to=, ?ids=a,b, ?format=).
+
+    Rows are read from SQLite and encoded batch by batch into a chunked
+    response, so memory stays flat however long the range.
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unknown format '{fmt}'", 'supported': list(EXPORT_FORMATS)}), 400
+    start, end, error = requested_range()
+    if error:
+        return error
+    ids = [part.strip().lower() for part in request.args.get('ids', '').split(',') if part.strip()]
+
+    response = Response(
+        export_chunks(history_store, start, end, ids or None, fmt, batch_size=current_config.EXPORT_BATCH_SIZE),
+        mimetype=EXPORT_FORMATS[fmt]
+    )
+    response.headers['Content-Disposition'] = f"attachment; filename=history-{int(start)}-{int(end)}.{fmt}"
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@bp.route('/api/sparkline')
+def get_sparkline():
+    """API endpoint for the most recent in-memory samples of one crypto."""
+    crypto_id = (request.args.get('id') or '').lower()
+    field = request.args.get('field', 'price_usd')
+    n = request.args.get('n', type=int)
+    if field not in FIELDS:
+        return jsonify({'error': f"Unknown field '{field}'"}), 400
+
+    buffer = recent_ticks.get(crypto_id)
+    if buffer is None:
+        return jsonify({'error': f"No recent data for '{crypto_id}'"}), 404
+
+    # One consistent read: timestamps and values line up even while ticks are appended
+    columns = buffer.window_columns(('timestamp', field), n)
+    values = columns[field]
+    return jsonify({
+        'id': crypto_id,
+        'field': field,
+        'timestamps': columns['timestamp'].tolist(),
+        'values': [None if v != v else v for v in values],
+        'stats': column_stats(values)
+    })
+
+
+@bp.route('/api/candles')
+def get_candles():
+    """
+    API endpoint for OHLC candles of one crypto, oldest first.
+
+    Served from the aggregator's in-memory window; when ?limit= asks for
+    more, older sealed candles come from the history database. The last
+    candle is still open ('closed': false).
+    """
+    crypto_id = (request.args.get('id') or '').lower()
+    interval = request.args.get('interval', '1m')
+    limit = request.args.get('limit', 100, type=int)
+    if not crypto_id:
+        return jsonify({'error': "Missing required parameter 'id'"}), 400
+    if interval not in candle_aggregator.intervals:
+        return jsonify({
+            'error': f"Unknown interval '{interval}'",
+            'supported': list(candle_aggregator.intervals)
+        }), 400
+    limit = max(1, min(limit, current_config.CANDLE_MAX_LIMIT))
+
+    candles = candle_aggregator.candles(crypto_id, interval, limit) or []
+    if len(candles) < limit and current_config.HISTORY_ENABLED:
+        before = candles[0]['start'] if candles else float('inf')
+        older = history_store.query_candles(crypto_id, interval, limit - len(candles), before=before)
+        candles = [candle_dict(*row) for row in older] + candles
+    if not candles:
+        return jsonify({'error': f"No candles for '{crypto_id}'"}), 404
+
+    return jsonify({
+        'id': crypto_id,
+        'interval': interval,
+        'candles': candles
+    })
+
+
+def rank_parameters(default_order):
+    """
+    Validate ?by= and ?order= for ranking endpoints.
+
+    Returns:
+        Tuple of (by, descending, error_response); error_response is None when valid
+    """
+    by = request.args.get('by', 'market_cap_usd')
+    order = request.args.get('order', default_order)
+    if by not in rank_indexer.fields:
+        return by, False, (jsonify({'error': f"Unknown field '{by}'", 'supported': list(rank_indexer.fields)}), 400)
+    if order not in ('asc', 'desc'):
+        return by, False, (jsonify({'error': f"Unknown order '{order}'", 'supported': ['asc', 'desc']}), 400)
+    return by, order == 'desc', None
+
+
+def ranked_response(snapshot, key, build, cache=None):
+    """Serve a ranking body built at most once per snapshot version and query."""
+    etag = str(snapshot.version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return encoded_response((cache or response_cache).get_or_build(key, build), etag)
+
+
+@bp.route('/api/top')
+def get_top():
+    """
+    API endpoint for the top ?n= cryptos by one field (?by=, ?order=asc|desc).
+
+    Served by slicing the sorted index of the current snapshot; records
+    without a value for the field are not ranked.
+    """
+    by, descending, error = rank_parameters('desc')
+    if error:
+        return error
+    n = max(1, min(request.args.get('n', 10, type=int), current_config.RANK_MAX_RESULTS))
+    snapshot = snapshot_cache.get()
+    index = rank_indexer.index_for(snapshot)
+    if index is None:
+        return jsonify({'error': 'No market data available yet'}), 503
+
+    return ranked_response(snapshot, ('top', snapshot.version, by, n, descending), lambda: {
+        'version': snapshot.version,
+        'by': by,
+        'order': 'desc' if descending else 'asc',
+        'cryptos': index.top(by, n, descending)
+    })
+
+
+@bp.route('/api/query')
+def query_cryptos():
+    """
+    API endpoint for cryptos whose ?by= field lies within [?min=, ?max=].
+
+    Results are ordered by that field (?order=asc|desc) and capped at
+    ?limit=; 'total' counts every match.
+    """
+    by, descending, error = rank_parameters('asc')
+    if error:
+        return error
+    try:
+        low = float(request.args['min']) if request.args.get('min') else None
+        high = float(request.args['max']) if request.args.get('max') else None
+    except ValueError as e:
+        return jsonify({'error': f"Invalid range parameter: {str(e)}"}), 400
+    limit = max(1, min(request.args.get('limit', 100, type=int), current_config.RANK_MAX_RESULTS))
+    snapshot = snapshot_cache.get()
+    index = rank_indexer.index_for(snapshot)
+    if index is None:
+        return jsonify({'error': 'No market data available yet'}), 503
+
+    def build():
+        cryptos, total = index.range(by, low, high, limit, descending)
+        return {
+            'version': snapshot.version,
+            'by': by,
+            'order': 'desc' if descending else 'asc',
+            'min': low,
+            'max': high,
+            'total': total,
+            'cryptos': cryptos
+        }
+
+    return ranked_response(
+        snapshot, ('query', snapshot.version, by, low, high, limit, descending), build, cache=query_cache
+    )
+
+
+@bp.route('/api/metrics')
+def get_metrics():
+    """Prometheus scrape endpoint."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@bp.route('/api/health')
 def health_check():
-    """Health check endpoint."""
+    """Health check endpoint; the body is rebuilt at most once per HEALTH_CACHE_TTL."""
+    bucket = int(time.monotonic() / current_config.HEALTH_CACHE_TTL)
+    return encoded_response(response_cache.get_or_build(('health', bucket), _health_payload))
+
+
+def _health_payload():
+    """Build the /api/health response body."""
     ingester_status = ingester.get_status()
-    return jsonify({
+    snapshot = snapshot_cache.get()
+    return {
         'status': 'healthy',
         'timestamp': datetime.utcnow().isoformat(),
         'ingester': ingester_status,
+        'scheduler': scheduler.get_status(),
+        'quality': transformer.quality_engine.get_status(),
+        'transformer': {'reused_records': transformer.reused_count},
+        'history': history_store.get_status(),
+        'compaction': compactor.get_status(),
+        'recent_ticks': recent_ticks.get_status(),
+        'candles': candle_aggregator.get_status(),
+        'rankings': rank_indexer.get_status(),
+        'stream': broadcaster.get_status(),
+        'responses': response_cache.get_status(),
+        'query_responses': query_cache.get_status(),
+        'metrics': metrics.get_status(),
+        'shared_snapshot': shared_sync.get_status() if shared_sync is not None else None,
+        'warm_start': last_snapshot.get_status() if last_snapshot is not None else None,
         'cache': {
-            'has_data': cache['latest_data'] is not None,
-            'last_update': cache['last_update'],
-            'update_count': cache['update_count'],
-            'error_count': cache['error_count']
+            'has_data': snapshot.data is not None,
+            'last_update': snapshot.last_update,
+            'update_count': snapshot.update_count,
+            'error_count': snapshot.error_count
         }
-    }), 200
+    }
+
+
+@bp.before_app_request
+def start_request_timer():
+    """Remember when request handling started."""
+    if metrics.detailed_timing:
+        g.request_started = time.perf_counter()
+
+
+@bp.after_app_request
+def record_request_metrics(response):
+    """Count every request and time it per route."""
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.inc('http_requests_total', route=route, status=str(response.status_code))
+    started = g.get('request_started')
+    if started is not None:
+        metrics.observe('http_request_seconds', time.perf_counter() - started, route=route)
+    return response
 
 
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
     return jsonify({'error': 'Not found'}), 404
 
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
     logger.error(f"Internal server error: {str(error)}")
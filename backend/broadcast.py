@@ -0,0 +1,121 @@
+"""Server-Sent Events fan-out of published snapshots."""
+import logging
+import threading
+from typing import Dict, Iterator, Optional, Union
+from backend.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT = b': heartbeat\n\n'
+
+
+class SnapshotBroadcaster:
+    """
+    Serializes each snapshot version once and shares it with every SSE client.
+
+    Clients do not get private queues: each waits on a shared condition and
+    sends the latest event when its version differs, so slow clients skip
+    intermediate versions instead of buffering them.
+    """
+
+    def __init__(self, heartbeat_interval: float = 15.0, retry_ms: int = 5000,
+                 max_clients: Optional[int] = None):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            heartbeat_interval: Seconds of silence before a heartbeat comment
+            retry_ms: Reconnect delay advertised to EventSource clients
+            max_clients: Open streams allowed at once (None for no limit); each
+                stream holds a server thread for as long as it is connected
+        """
+        self.heartbeat_interval = heartbeat_interval
+        self.retry_ms = retry_ms
+        self.max_clients = max_clients
+        self.client_count = 0
+        self.rejected_count = 0
+        self._version = 0
+        self._event = None
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def version(self) -> int:
+        """Version of the latest published event."""
+        return self._version
+
+    def publish(self, version: int, payload: Union[Dict, bytes]) -> None:
+        """
+        Frame a snapshot once and wake all connected clients.
+
+        Args:
+            version: Snapshot version, sent as the event id
+            payload: JSON-serializable payload or already-serialized JSON bytes
+        """
+        body = payload if isinstance(payload, bytes) else dumps(payload)
+        event = b'id: %d\nevent: snapshot\ndata: %s\n\n' % (version, body)
+        with self._cond:
+            self._version = version
+            self._event = event
+            self._cond.notify_all()
+
+    def has_capacity(self) -> bool:
+        """
+        Whether another stream may be opened; counts a rejection if not.
+
+        Checked before a stream starts, so concurrent connects may overshoot
+        max_clients by the number of requests racing past the check.
+        """
+        with self._cond:
+            if self.max_clients is None or self.client_count < self.max_clients:
+                return True
+            self.rejected_count += 1
+            return False
+
+    def close(self) -> None:
+        """End all open streams."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stream(self, last_event_id: Optional[str] = None) -> Iterator[bytes]:
+        """
+        Yield SSE frames for one client until it disconnects.
+
+        Args:
+            last_event_id: Last-Event-ID sent by a reconnecting client; the
+                current event is skipped if the client already has it
+        """
+        try:
+            seen = int(last_event_id) if last_event_id else 0
+        except ValueError:
+            seen = 0
+
+        with self._cond:
+            self.client_count += 1
+        try:
+            yield f"retry: {self.retry_ms}\n\n".encode()
+            while True:
+                with self._cond:
+                    if self._version == seen and not self._closed:
+                        self._cond.wait(self.heartbeat_interval)
+                    if self._closed:
+                        return
+                    version, event = self._version, self._event
+                if version != seen and event is not None:
+                    seen = version
+                    yield event
+                else:
+                    yield HEARTBEAT
+        finally:
+            with self._cond:
+                self.client_count -= 1
+
+    def get_status(self) -> Dict:
+        """Get broadcaster status for health reporting."""
+        return {
+            'clients': self.client_count,
+            'max_clients': self.max_clients,
+            'rejected': self.rejected_count,
+            'version': self._version
+        }
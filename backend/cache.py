@@ -0,0 +1,226 @@
+"""Thread-safe snapshot cache with single-flight refresh coalescing."""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from backend.delta import ChangeIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Immutable view of the cached market data and its bookkeeping."""
+
+    data: Optional[Dict] = None
+    version: int = 0
+    changes: ChangeIndex = field(default_factory=ChangeIndex)
+    last_update: Optional[str] = None
+    expires_at: Optional[float] = None  # time.monotonic() deadline
+    update_count: int = 0
+    error_count: int = 0
+
+    def is_fresh(self) -> bool:
+        """Whether the snapshot is still within its TTL."""
+        return self.expires_at is not None and time.monotonic() < self.expires_at
+
+
+class _Call:
+    """In-flight call shared between a leader and its waiters."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls so only one executes at a time."""
+
+    def __init__(self):
+        """Initialize with no call in flight."""
+        self._lock = threading.Lock()
+        self._call = None
+
+    @property
+    def in_flight(self) -> bool:
+        """Whether a call is currently executing."""
+        return self._call is not None
+
+    def do(self, fn: Callable):
+        """
+        Execute fn, or wait for the call already in flight.
+
+        Args:
+            fn: Zero-argument callable to execute
+
+        Returns:
+            Tuple of (result, shared) where shared is True for waiters
+        """
+        with self._lock:
+            call = self._call
+            leader = call is None
+            if leader:
+                call = self._call = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._call = None
+            call.done.set()
+        return call.result, False
+
+
+class SnapshotCache:
+    """Holds the latest Snapshot and swaps it in a single reference assignment."""
+
+    def __init__(self, ttl: float, on_publish: Optional[Callable[[Snapshot], None]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a published snapshot stays fresh
+            on_publish: Optional callback receiving each newly published Snapshot
+        """
+        self.ttl = ttl
+        self.on_publish = on_publish
+        self._snapshot = Snapshot()
+        self._write_lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def get(self) -> Snapshot:
+        """Return the current snapshot; never blocks."""
+        return self._snapshot
+
+    def publish(self, data: Dict) -> Snapshot:
+        """Publish newly transformed data as the current snapshot."""
+        return self._swap(data)
+
+    def mirror(self, data: Dict, version: int, update_count: int, error_count: int) -> Snapshot:
+        """Publish a snapshot replicated from another process, keeping its version and counters."""
+        return self._swap(data, version=version, update_count=update_count, error_count=error_count)
+
+    def restore(self, data: Dict, version: int, update_count: int = 0, error_count: int = 0,
+                last_update: Optional[str] = None) -> Snapshot:
+        """
+        Install a snapshot persisted by a previous process.
+
+        It is served immediately but counts as expired, so the next refresh
+        fetches upstream, and on_publish is not called. Ignored once live data
+        has been published.
+        """
+        with self._write_lock:
+            if self._snapshot.data is not None:
+                return self._snapshot
+            self._snapshot = Snapshot(
+                data=data,
+                version=version,
+                changes=ChangeIndex().advance(data, version),
+                last_update=last_update,
+                update_count=update_count,
+                error_count=error_count
+            )
+            return self._snapshot
+
+    def _swap(self, data: Dict, version: Optional[int] = None, **counters) -> Snapshot:
+        """Install data as the current snapshot and notify on_publish."""
+        with self._write_lock:
+            current = self._snapshot
+            if version is None:
+                version = current.version + 1
+                counters = {'update_count': current.update_count + 1}
+            self._snapshot = replace(
+                current,
+                data=data,
+                version=version,
+                changes=current.changes.advance(data, version),
+                last_update=datetime.utcnow().isoformat(),
+                expires_at=time.monotonic() + self.ttl,
+                **counters
+            )
+            snapshot = self._snapshot
+        if self.on_publish:
+            self.on_publish(snapshot)
+        return snapshot
+
+    def touch(self) -> Snapshot:
+        """Renew the TTL of the current snapshot without changing its data."""
+        with self._write_lock:
+            self._snapshot = replace(self._snapshot, expires_at=time.monotonic() + self.ttl)
+            return self._snapshot
+
+    def record_error(self) -> Snapshot:
+        """Increment the error counter on the current snapshot."""
+        with self._write_lock:
+            self._snapshot = replace(self._snapshot, error_count=self._snapshot.error_count + 1)
+            return self._snapshot
+
+    def get_or_refresh(self, loader: Callable[[], Optional[Dict]],
+                       stale_while_revalidate: bool = False) -> Tuple[Snapshot, str]:
+        """
+        Return a fresh snapshot, refreshing through a single flight if expired.
+
+        Args:
+            loader: Callable returning transformed data, or None on failure
+            stale_while_revalidate: Return stale data immediately and refresh
+                in the background instead of waiting
+
+        Returns:
+            Tuple of (snapshot, outcome) where outcome is one of
+            'hit', 'stale', 'refreshed', 'shared' or 'failed'
+        """
+        snapshot = self._snapshot
+        if snapshot.is_fresh():
+            return snapshot, 'hit'
+
+        if stale_while_revalidate and snapshot.data is not None:
+            if not self._flight.in_flight:
+                threading.Thread(
+                    target=self._refresh_quietly, args=(loader,),
+                    name='snapshot-revalidate', daemon=True
+                ).start()
+            return snapshot, 'stale'
+
+        result, shared = self._flight.do(lambda: self._load(loader))
+        if result is None:
+            return self._snapshot, 'failed'
+        return result, 'shared' if shared else 'refreshed'
+
+    def _load(self, loader: Callable[[], Optional[Dict]]) -> Optional[Snapshot]:
+        """
+        Run the loader unless another caller refreshed while we queued.
+
+        A loader returning the current data object signals "unchanged" and
+        only renews the TTL.
+        """
+        current = self._snapshot
+        if current.is_fresh():
+            return current
+
+        data = loader()
+        if data is None:
+            self.record_error()
+            return None
+        if data is current.data:
+            return self.touch()
+        return self.publish(data)
+
+    def _refresh_quietly(self, loader: Callable[[], Optional[Dict]]) -> None:
+        """Background revalidation; errors are logged, never raised."""
+        try:
+            self._flight.do(lambda: self._load(loader))
+        except Exception as e:
+            self.record_error()
+            logger.error(f"Background revalidation failed: {str(e)}")
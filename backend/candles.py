@@ -0,0 +1,206 @@
+"""Incremental OHLC candles per cryptocurrency, updated once per published snapshot."""
+import math
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Supported candle intervals in seconds
+INTERVALS = {'1m': 60, '5m': 300, '1h': 3600, '1d': 86400}
+
+# Open candle list layout
+_START, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _TICKS = range(7)
+
+NAN = float('nan')
+
+
+def candle_dict(start: float, open_: float, high: float, low: float, close: float,
+                volume: Optional[float], ticks: int, closed: bool = True) -> Dict:
+    """JSON form of one candle; NaN volume becomes None."""
+    return {
+        'start': start,
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': None if volume is None or volume != volume else volume,
+        'ticks': int(ticks),
+        'closed': closed
+    }
+
+
+class CandleWindow:
+    """
+    Ring buffer of sealed candles packed as seven doubles each.
+
+    Memory grows with the candles actually sealed, up to capacity; after
+    that the oldest candle is overwritten in place.
+    """
+
+    RECORD = struct.Struct('<7d')
+    __slots__ = ('capacity', '_data', '_pos', '_size')
+
+    def __init__(self, capacity: int):
+        """
+        Initialize the window.
+
+        Args:
+            capacity: Maximum number of candles retained
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = bytearray()
+        self._pos = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of candles currently held."""
+        return self._size
+
+    def append(self, candle: List) -> None:
+        """Append one [start, open, high, low, close, volume, ticks] candle in O(1)."""
+        if self._size < self.capacity:
+            self._data += self.RECORD.pack(*candle)
+            self._size += 1
+        else:
+            self.RECORD.pack_into(self._data, self._pos * self.RECORD.size, *candle)
+            self._pos = (self._pos + 1) % self.capacity
+
+    def last(self, n: int) -> List[Tuple]:
+        """The last n candles, oldest first."""
+        n = max(0, min(n, self._size))
+        first = self._pos - n if self._size == self.capacity else self._size - n
+        unpack = self.RECORD.unpack_from
+        size = self.RECORD.size
+        return [unpack(self._data, (i % self.capacity) * size) for i in range(first, first + n)]
+
+    def memory_usage(self) -> int:
+        """Bytes held by the packed candles."""
+        return len(self._data)
+
+
+class CandleAggregator:
+    """
+    Open/high/low/close candles for every crypto at several intervals.
+
+    Each published snapshot is one tick per crypto. Its bucket start is
+    computed once per interval, then every open candle is updated in O(1).
+    A tick in a later bucket seals the open candle into a bounded
+    CandleWindow and opens a new one; ticks older than the open candle are
+    counted and ignored. CoinGecko only reports rolling 24h volume, so a
+    candle's volume is the last 24h volume seen in its bucket.
+    """
+
+    def __init__(self, intervals: Iterable[str] = tuple(INTERVALS), window: int = 500):
+        """
+        Initialize the aggregator.
+
+        Args:
+            intervals: Interval names from INTERVALS to maintain
+            window: Sealed candles kept in memory per crypto and interval
+        """
+        unknown = [interval for interval in intervals if interval not in INTERVALS]
+        if unknown:
+            raise ValueError(f"Unknown candle intervals: {', '.join(unknown)}")
+        self.intervals = tuple(intervals)
+        self.window = window
+        self.tick_count = 0
+        self.sealed_count = 0
+        self.late_ticks = 0
+        # interval -> crypto id -> open candle [start, open, high, low, close, volume, ticks]
+        self._open = {interval: {} for interval in self.intervals}
+        # interval -> crypto id -> CandleWindow of sealed candles
+        self._sealed = {interval: {} for interval in self.intervals}
+        self._lock = threading.Lock()
+
+    def ingest(self, snapshot: Dict, timestamp: float) -> List[Tuple]:
+        """
+        Apply one transformed snapshot observed at timestamp.
+
+        Returns:
+            Candles sealed by this snapshot as
+            (crypto_id, interval, start, open, high, low, close, volume, ticks) rows
+        """
+        buckets = [
+            (interval, math.floor(timestamp / INTERVALS[interval]) * INTERVALS[interval], self._open[interval])
+            for interval in self.intervals
+        ]
+        sealed = []
+        with self._lock:
+            for crypto in snapshot.get('cryptos', []):
+                price = crypto.get('price_usd')
+                if price is None:
+                    continue
+                crypto_id = crypto['id']
+                volume = crypto.get('volume_24h_usd')
+                if volume is None:
+                    volume = NAN
+                for interval, start, candles in buckets:
+                    candle = candles.get(crypto_id)
+                    if candle is None:
+                        candles[crypto_id] = [start, price, price, price, price, volume, 1]
+                    elif candle[_START] == start:
+                        if price > candle[_HIGH]:
+                            candle[_HIGH] = price
+                        elif price < candle[_LOW]:
+                            candle[_LOW] = price
+                        candle[_CLOSE] = price
+                        if volume == volume:
+                            candle[_VOLUME] = volume
+                        candle[_TICKS] += 1
+                    elif candle[_START] < start:
+                        self._seal(crypto_id, interval, candle)
+                        sealed.append((crypto_id, interval, *candle))
+                        candles[crypto_id] = [start, price, price, price, price, volume, 1]
+                    else:
+                        self.late_ticks += 1
+            self.tick_count += 1
+        return sealed
+
+    def _seal(self, crypto_id: str, interval: str, candle: List) -> None:
+        """Move a finished candle into the sealed window. Caller holds _lock."""
+        windows = self._sealed[interval]
+        window = windows.get(crypto_id)
+        if window is None:
+            window = windows[crypto_id] = CandleWindow(self.window)
+        window.append(candle)
+        self.sealed_count += 1
+
+    def candles(self, crypto_id: str, interval: str, limit: int) -> Optional[List[Dict]]:
+        """
+        Latest candles of one crypto, oldest first; the last one may still be open.
+
+        Returns:
+            Up to limit candles, or None if the crypto has none at this interval
+        """
+        with self._lock:
+            candle = self._open[interval].get(crypto_id)
+            window = self._sealed[interval].get(crypto_id)
+            if candle is None and window is None:
+                return None
+            result = []
+            if window is not None:
+                result = [candle_dict(*row) for row in window.last(limit - (candle is not None))]
+            if candle is not None and limit > 0:
+                result.append(candle_dict(*candle, closed=False))
+            return result
+
+    def memory_usage(self) -> int:
+        """Bytes held by the sealed candle windows."""
+        return sum(
+            window.memory_usage()
+            for windows in list(self._sealed.values())
+            for window in list(windows.values())
+        )
+
+    def get_status(self) -> Dict:
+        """Get aggregation status for health reporting."""
+        return {
+            'intervals': list(self.intervals),
+            'window': self.window,
+            'ticks': self.tick_count,
+            'sealed': self.sealed_count,
+            'late_ticks': self.late_ticks,
+            'open_candles': sum(len(candles) for candles in self._open.values()),
+            'memory_bytes': self.memory_usage()
+        }
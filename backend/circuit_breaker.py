@@ -0,0 +1,96 @@
+"""Circuit breaker that stops calling a failing upstream for a cool-down period."""
+import threading
+import time
+from typing import Dict, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker around upstream calls.
+
+    After failure_threshold consecutive failures the breaker opens and
+    refuses calls for reset_timeout seconds. It then lets a single trial
+    call through (half-open): success closes it, failure reopens it with
+    the cool-down doubled, up to max_reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 120.0,
+                 max_reset_timeout: Optional[float] = None):
+        """
+        Initialize the breaker closed.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open the first time
+            max_reset_timeout: Longest cool-down after repeated failed trials
+                (defaults to 8 x reset_timeout)
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = float(reset_timeout)
+        self.max_reset_timeout = float(max_reset_timeout if max_reset_timeout is not None else reset_timeout * 8)
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self._state = CLOSED
+        self._timeout = self.reset_timeout
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state; an open breaker past its cool-down reports half-open."""
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        """State at now (lock must be held)."""
+        if self._state == OPEN and now >= self._opened_at + self._timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be made now."""
+        with self._lock:
+            return self._current_state(time.monotonic()) != OPEN
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a call through (0 if it does now)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._current_state(now) != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self._timeout - now)
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self._state = CLOSED
+            self._timeout = self.reset_timeout
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the breaker at the threshold or after a failed trial."""
+        with self._lock:
+            now = time.monotonic()
+            self.consecutive_failures += 1
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                self._timeout = min(self.max_reset_timeout, self._timeout * 2)
+            elif state == OPEN or self.consecutive_failures < self.failure_threshold:
+                return
+            self._state = OPEN
+            self._opened_at = now
+            self.open_count += 1
+
+    def get_status(self) -> Dict:
+        """Get breaker status for health reporting."""
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'failure_threshold': self.failure_threshold,
+            'open_count': self.open_count,
+            'retry_in_seconds': round(self.retry_in(), 1)
+        }
@@ -0,0 +1,229 @@
+"""CoinCap market data provider, normalized to the CoinGecko payload shape."""
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import requests
+from backend.data_ingestion import parse_retry_after
+from backend.fingerprint import PayloadFingerprinter
+from backend.http_client import build_session
+from backend.providers import MarketDataProvider
+from backend.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# CoinCap /assets field -> CoinGecko /simple/price field
+FIELD_MAP = (
+    ('priceUsd', 'usd'),
+    ('marketCapUsd', 'usd_market_cap'),
+    ('volumeUsd24Hr', 'usd_24h_vol'),
+    ('changePercent24Hr', 'usd_24h_change')
+)
+
+
+def _number(value) -> Optional[float]:
+    """CoinCap sends numbers as strings; None for missing or malformed values."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_assets(assets: List[Dict]) -> Dict:
+    """
+    Convert CoinCap /assets rows to {crypto_id: {'usd': ..., ...}}.
+
+    Args:
+        assets: The 'data' list of a CoinCap /assets response
+
+    Returns:
+        Payload in the CoinGecko /simple/price shape (USD only)
+    """
+    data = {}
+    for asset in assets:
+        crypto_id = asset.get('id') if isinstance(asset, dict) else None
+        if not crypto_id:
+            continue
+        data[crypto_id] = {target: _number(asset.get(source)) for source, target in FIELD_MAP}
+    return data
+
+
+class CoinCapIngester(MarketDataProvider):
+    """Fetches USD market data from the CoinCap /assets endpoint."""
+
+    name = 'coincap'
+
+    def __init__(self, api_url: str, cryptos: List[str], api_key: Optional[str] = None,
+                 chunk_size: int = 250, rate_limiter: Optional[TokenBucket] = None,
+                 rate_limit_timeout: float = 30.0, session: Optional[requests.Session] = None,
+                 metrics=None, default_retry_after: float = 60.0, timeout: float = 10.0):
+        """
+        Initialize the ingester.
+
+        Args:
+            api_url: Base URL for the CoinCap API
+            cryptos: List of cryptocurrency IDs to track
+            api_key: Optional API key sent as a Bearer token
+            chunk_size: Maximum IDs per upstream request
+            rate_limiter: Token bucket for CoinCap requests
+            rate_limit_timeout: Seconds a chunk waits for a token before failing
+            session: HTTP session to reuse (defaults to a pooled keep-alive session)
+            metrics: Optional MetricsRegistry for 429 and error counts
+            default_retry_after: Seconds to back off after a 429 without a Retry-After header
+            timeout: Per-request timeout in seconds
+        """
+        self.api_url = api_url
+        self.cryptos = cryptos
+        self.api_key = api_key
+        self.chunk_size = max(1, chunk_size)
+        self.rate_limiter = rate_limiter
+        self.rate_limit_timeout = rate_limit_timeout
+        self.session = session or build_session()
+        self.metrics = metrics
+        self.default_retry_after = default_retry_after
+        self.timeout = timeout
+        self.fingerprinter = PayloadFingerprinter()
+        self.last_fetch_time = None
+        self.last_fetch_duration = None
+        self.error_count = 0
+        self.failed_chunk_count = 0
+        self.rate_limited_count = 0
+        self.skipped_fetch_count = 0
+        self._retry_at = 0.0  # time.monotonic() before which no request is sent
+
+    def _chunks(self) -> List[List[str]]:
+        """Split tracked IDs into request-sized chunks."""
+        return [
+            self.cryptos[i:i + self.chunk_size]
+            for i in range(0, len(self.cryptos), self.chunk_size)
+        ] or [[]]
+
+    @property
+    def calls_per_fetch(self) -> int:
+        """Upstream requests made by one fetch_market_data() call."""
+        return len(self._chunks())
+
+    def retry_after_remaining(self) -> float:
+        """Seconds left before upstream may be called again after a 429."""
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def _fetch_chunk(self, ids: List[str]) -> Optional[Dict]:
+        """
+        Fetch one chunk of IDs.
+
+        Returns:
+            Normalized payload, or None if rate limited
+        """
+        if self.rate_limiter and not self.rate_limiter.acquire(timeout=self.rate_limit_timeout):
+            logger.warning(f"CoinCap rate limiter budget exhausted; skipping chunk of {len(ids)} ids")
+            return None
+
+        params = {'ids': ','.join(ids), 'limit': len(ids)}
+        headers = {'Authorization': f"Bearer {self.api_key}"} if self.api_key else {}
+        response = self.session.get(f"{self.api_url}/assets", params=params, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 429:
+            delay = parse_retry_after(response.headers.get('Retry-After'))
+            if delay is None:
+                delay = self.default_retry_after
+            self._retry_at = max(self._retry_at, time.monotonic() + delay)
+            self.rate_limited_count += 1
+            logger.warning(f"CoinCap API rate limit reached (429). Backing off for {delay:.0f}s")
+            if self.metrics:
+                self.metrics.inc('upstream_rate_limited_total')
+            response.close()
+            return None
+
+        response.raise_for_status()
+        return normalize_assets(response.json().get('data') or [])
+
+    def fetch_market_data(self) -> Optional[Dict]:
+        """
+        Fetch market data for configured cryptocurrencies.
+
+        Chunks are fetched one after another; failed chunks are dropped and
+        the rest merged ('partial'). Only USD fields are available from
+        CoinCap; quote currencies are filled in when a hedged fetch merges
+        this payload with CoinGecko's.
+
+        Returns:
+            Dictionary with market data or None if every chunk failed or a
+            Retry-After period is still running
+        """
+        remaining = self.retry_after_remaining()
+        if remaining > 0:
+            self.skipped_fetch_count += 1
+            logger.warning(f"Skipping CoinCap fetch: rate limited for another {remaining:.0f}s")
+            return None
+
+        started = time.perf_counter()
+        chunks = self._chunks()
+        data = {}
+        failed = 0
+        for ids in chunks:
+            try:
+                payload = self._fetch_chunk(ids)
+            except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+                logger.error(f"Failed to fetch {len(ids)} ids from CoinCap API: {str(e)}")
+                payload = None
+            if payload is None:
+                failed += 1
+                continue
+            data.update(payload)
+
+        if failed == len(chunks):
+            self._record_failure()
+            return None
+        if failed:
+            self.failed_chunk_count += failed
+            logger.warning(f"{failed} of {len(chunks)} CoinCap chunks failed; serving partial data")
+
+        fingerprint, coin_fingerprints, duplicate = self.fingerprinter.observe(data)
+        data['_metadata'] = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'source': 'CoinCap',
+            'status': 'duplicate' if duplicate else ('partial' if failed else 'success'),
+            'fingerprint': fingerprint,
+            'coin_fingerprints': coin_fingerprints
+        }
+        self.last_fetch_duration = time.perf_counter() - started
+        self.last_fetch_time = datetime.utcnow()
+        self.error_count = 0
+        logger.info(f"Successfully fetched data for {len(data)-1} cryptocurrencies from CoinCap")
+        return data
+
+    def _record_failure(self) -> None:
+        """Count a fetch that returned no data."""
+        self.error_count += 1
+        if self.metrics:
+            self.metrics.inc('upstream_errors_total')
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
+
+    def get_status(self) -> Dict:
+        """Get ingestion status and health metrics."""
+        retry_after = self.retry_after_remaining()
+        if retry_after > 0:
+            health = 'rate_limited'
+        else:
+            health = 'healthy' if self.error_count < 3 else 'unhealthy'
+        status = {
+            'last_fetch_time': self.last_fetch_time.isoformat() if self.last_fetch_time else None,
+            'last_fetch_ms': round(self.last_fetch_duration * 1000, 2) if self.last_fetch_duration else None,
+            'error_count': self.error_count,
+            'monitored_cryptos': len(self.cryptos),
+            'chunk_count': len(self._chunks()),
+            'failed_chunk_count': self.failed_chunk_count,
+            'fingerprints': self.fingerprinter.get_status(),
+            'rate_limited_count': self.rate_limited_count,
+            'skipped_fetch_count': self.skipped_fetch_count,
+            'retry_after_seconds': round(retry_after, 1),
+            'status': health
+        }
+        if self.rate_limiter:
+            status['rate_limiter'] = self.rate_limiter.get_status()
+        return status
@@ -14,16 +14,114 @@ class Config:
     COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
     CRYPTOS = ['bitcoin', 'ethereum', 'cardano', 'polkadot', 'solana']
     INGESTION_INTERVAL = int(os.getenv('INGESTION_INTERVAL', 61))  # seconds (respect CoinGecko rate limits)
+    COINGECKO_CALLS_PER_MINUTE = int(os.getenv('COINGECKO_CALLS_PER_MINUTE', 30))  # API plan budget
+    COINGECKO_RATE_BURST = 5      # token bucket capacity
+    INGESTION_CHUNK_SIZE = 250    # ids per upstream request (keeps URLs short)
+    INGESTION_MAX_WORKERS = 4     # concurrent chunk requests
+    INGESTION_ENABLED = os.getenv('INGESTION_ENABLED', 'true').lower() == 'true'  # background scheduler
+    INGESTION_MODE = os.getenv('INGESTION_MODE', 'live')  # live | record | replay
+    # Adaptive polling: as often as INGESTION_MIN_INTERVAL and the call budget
+    # allow while prices change, stretching to INGESTION_INTERVAL while unchanged
+    ADAPTIVE_POLLING = os.getenv('ADAPTIVE_POLLING', 'true').lower() == 'true'
+    INGESTION_MIN_INTERVAL = int(os.getenv('INGESTION_MIN_INTERVAL', 15))  # seconds
+    INGESTION_MAX_BACKOFF = 600         # longest delay after consecutive failures (seconds)
+    RETRY_AFTER_DEFAULT = 60            # back-off after a 429 without Retry-After (seconds)
+    CIRCUIT_BREAKER_THRESHOLD = 5       # consecutive failed cycles that open the breaker
+    CIRCUIT_BREAKER_RESET_TIMEOUT = 120  # seconds open before a half-open trial
+    # Market data sources in preference order; with more than one, fetches are
+    # hedged: the fastest source (by p95 latency) is called first, the next one
+    # after HEDGE_DELAY_MS, and answers are merged per coin
+    MARKET_DATA_SOURCES = [
+        source for source in (
+            part.strip() for part in os.getenv('MARKET_DATA_SOURCES', 'coingecko').lower().split(',')
+        ) if source
+    ]
+    COINCAP_API_URL = os.getenv('COINCAP_API_URL', 'https://api.coincap.io/v2')
+    COINCAP_API_KEY = os.getenv('COINCAP_API_KEY')
+    COINCAP_CALLS_PER_MINUTE = int(os.getenv('COINCAP_CALLS_PER_MINUTE', 200))
+    HEDGE_DELAY_MS = int(os.getenv('HEDGE_DELAY_MS', 0))  # 0 = the primary's p95 latency
+    HEDGE_MERGE_WAIT_MS = 250           # wait for the other answer after the first one
+    HEDGE_TIMEOUT = 15                  # seconds a fetch waits for any source
+    # Quote currencies, all fetched in the same upstream request; USD is always
+    # included and is the primary view (history, quality checks, SSE)
+    VS_CURRENCIES = ['usd'] + [
+        currency for currency in (
+            part.strip() for part in os.getenv('VS_CURRENCIES', 'eur,gbp,jpy').lower().split(',')
+        ) if currency and currency != 'usd'
+    ]
+    
+    # Serve stale data while a single background refresh revalidates the cache
+    STALE_WHILE_REVALIDATE = os.getenv('STALE_WHILE_REVALIDATE', 'false').lower() == 'true'
+    
+    # /api/health bodies are reused for this many seconds
+    HEALTH_CACHE_TTL = 1
+    
+    # Server-Sent Events
+    SSE_HEARTBEAT_INTERVAL = 15  # seconds between keep-alive comments
+    SSE_RETRY_MS = 5000          # client reconnect delay
+    # Open /api/stream clients per process (0 = unlimited). Every client pins
+    # one server thread; gunicorn.conf.py sets this below its thread count
+    SSE_MAX_CLIENTS = int(os.getenv('SSE_MAX_CLIENTS', 0))
     
     # Data storage
     DATABASE_FILE = 'market_data.db'
-    CACHE_DIR = './data'
+    CACHE_DIR = os.getenv('CACHE_DIR', './data')
+    HISTORY_ENABLED = os.getenv('HISTORY_ENABLED', 'true').lower() == 'true'
+    HISTORY_BATCH_SIZE = 5000  # max rows per insert transaction
+    HISTORY_QUEUE_SIZE = 1000  # snapshots buffered before writes are dropped
+    HISTORY_MAX_POINTS = 500   # default downsampling target for /api/history
+    EXPORT_BATCH_SIZE = 5000   # rows read and encoded per /api/export chunk
+
+    # Tiered retention: raw ticks, then rollups as (resolution, retention) in
+    # seconds (None = forever). A background job builds each rollup from the
+    # next finer tier and prunes expired data; queries read the coarsest tier
+    # that meets the requested step
+    HISTORY_RAW_RETENTION = int(os.getenv('HISTORY_RAW_RETENTION_HOURS', 48)) * 3600
+    HISTORY_ROLLUPS = ((60, 30 * 86400), (3600, None))
+    COMPACTION_ENABLED = os.getenv('COMPACTION_ENABLED', 'true').lower() == 'true'
+    COMPACTION_INTERVAL = 300      # seconds between compaction runs
+    COMPACTION_SLICE_SECONDS = 600  # time range rolled up or pruned per transaction
+    COMPACTION_SETTLE = 120         # seconds raw ticks may arrive late before rollup
+    RECENT_TICKS_CAPACITY = 1440  # in-memory samples per crypto (24h at 60s)
+
+    # OHLC candles built from every published snapshot; sealed candles are
+    # kept in memory per crypto and interval and persisted with the history
+    CANDLE_INTERVALS = ('1m', '5m', '1h', '1d')
+    CANDLE_WINDOW = 500
+    CANDLE_MAX_LIMIT = 1000  # largest ?limit= for /api/candles
+
+    # /api/top and /api/query are served from per-version sorted indexes
+    RANK_MAX_RESULTS = 500  # largest ?n= / ?limit=
+    QUERY_CACHE_ENTRIES = 16  # /api/query bodies kept, apart from the shared response cache
+
+    # Last published /api/data body, written atomically and served at startup
+    WARM_START_ENABLED = os.getenv('WARM_START_ENABLED', 'true').lower() == 'true'
+    LAST_SNAPSHOT_FILE = os.path.join(CACHE_DIR, 'last_snapshot.json')
+
+    # Multi-worker deployments: one leader ingests and shares each serialized
+    # snapshot with the other workers through a memory-mapped file
+    SHARED_SNAPSHOT_ENABLED = os.getenv('SHARED_SNAPSHOT_ENABLED', 'false').lower() == 'true'
+    SHARED_SNAPSHOT_PATH = os.getenv('SHARED_SNAPSHOT_PATH', os.path.join(CACHE_DIR, 'snapshot.shm'))
+    SHARED_SNAPSHOT_CAPACITY = 64 * 1024 * 1024  # bytes per body slot
+    SHARED_SNAPSHOT_POLL_MS = 10  # follower check interval
+    
+    # Record/replay of raw upstream payloads (INGESTION_MODE=record|replay)
+    RECORDINGS_DIR = os.path.join(CACHE_DIR, 'recordings')
+    RECORD_SEGMENT_RECORDS = 500  # payloads per gzip NDJSON segment
+    REPLAY_SPEED = float(os.getenv('REPLAY_SPEED', 1))  # 1 = real time, N = N x faster, 0 = unpaced
+    REPLAY_LOOP = os.getenv('REPLAY_LOOP', 'false').lower() == 'true'
+    
+    # Latency histograms for /api/metrics (counters are always recorded)
+    METRICS_DETAILED_TIMING = os.getenv('METRICS_DETAILED_TIMING', 'true').lower() == 'true'
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-    LOG_FILE = './logs/app.log'
+    LOG_FILE = os.getenv('LOG_FILE', './logs/app.log')
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     
+    # Payloads with more records than this use the vectorized transform
+    BATCH_TRANSFORM_MIN_SIZE = 500
+    
     # Data quality thresholds
     MAX_NULL_PERCENTAGE = 10  # Alert if >10% of records have null values
     DUPLICATE_THRESHOLD = 5   # Alert if >5% duplicates detected
@@ -1,85 +1,329 @@
 """Data ingestion module for fetching cryptocurrency data from CoinGecko API."""
 import requests
 import logging
-from datetime import datetime
-from typing import List, Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional, Tuple
+from backend.fingerprint import PayloadFingerprinter
+from backend.http_client import build_session, last_connect_time, reset_connect_time
+from backend.providers import MarketDataProvider
+from backend.rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
 
-class CoinGeckoIngester:
+def parse_retry_after(value) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header value.
+
+    Args:
+        value: Header value, either delta-seconds or an HTTP date
+
+    Returns:
+        Non-negative seconds, or None if the value is missing or malformed
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class CoinGeckoIngester(MarketDataProvider):
     """Fetches real-time cryptocurrency data from CoinGecko API."""
-    
-    def __init__(self, api_url: str, cryptos: List[str]):
+
+    name = 'coingecko'
+
+    def __init__(self, api_url: str, cryptos: List[str], chunk_size: int = 250,
+                 max_workers: int = 4, rate_limiter: Optional[TokenBucket] = None,
+                 rate_limit_timeout: float = 30.0, session: Optional[requests.Session] = None,
+                 metrics=None, recorder=None, vs_currencies: Optional[List[str]] = None,
+                 default_retry_after: float = 60.0):
         """
         Initialize the ingester.
-        
+
         Args:
             api_url: Base URL for CoinGecko API
             cryptos: List of cryptocurrency IDs to track
+            chunk_size: Maximum IDs per upstream request
+            max_workers: Maximum concurrent chunk requests
+            rate_limiter: Token bucket shared by every upstream request
+            rate_limit_timeout: Seconds a chunk waits for a token before failing
+            session: HTTP session to reuse (defaults to a pooled keep-alive session)
+            metrics: Optional MetricsRegistry for fetch latency and 429/304 counts
+            recorder: Optional SegmentRecorder every fetched payload is appended to
+            vs_currencies: Quote currencies requested together in every call (default USD only)
+            default_retry_after: Seconds to back off after a 429 without a Retry-After header
         """
         self.api_url = api_url
         self.cryptos = cryptos
+        self.chunk_size = max(1, chunk_size)
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = rate_limiter
+        self.rate_limit_timeout = rate_limit_timeout
         self.last_fetch_time = None
         self.error_count = 0
-    
+        self.failed_chunk_count = 0
+        self.not_modified_count = 0
+        self.last_fetch_timing = None
+        self.session = session or build_session(pool_size=self.max_workers)
+        self.fingerprinter = PayloadFingerprinter()
+        self.metrics = metrics
+        self.recorder = recorder
+        self.vs_currencies = ','.join(vs_currencies or ['usd'])
+        self.default_retry_after = default_retry_after
+        self.rate_limited_count = 0
+        self.skipped_fetch_count = 0
+        self._retry_at = 0.0  # time.monotonic() before which no request is sent
+        self._executor = None
+        # Per-chunk conditional GET validators and last parsed payload
+        self._validators = {}
+
+    def _chunks(self) -> List[List[str]]:
+        """Split tracked IDs into request-sized chunks."""
+        return [
+            self.cryptos[i:i + self.chunk_size]
+            for i in range(0, len(self.cryptos), self.chunk_size)
+        ] or [[]]
+
+    @property
+    def calls_per_fetch(self) -> int:
+        """Upstream requests made by one fetch_market_data() call."""
+        return len(self._chunks())
+
+    def retry_after_remaining(self) -> float:
+        """Seconds left before upstream may be called again after a 429."""
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the bounded pool used for chunk requests."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='coingecko-fetch'
+            )
+        return self._executor
+
+    def _fetch_chunk(self, ids: List[str]) -> Optional[Tuple[Dict, bool, Dict]]:
+        """
+        Fetch prices for one chunk of IDs.
+
+        Sends If-None-Match / If-Modified-Since from the previous response;
+        on 304 the previously parsed payload is reused without parsing.
+
+        Returns:
+            Tuple of (payload, not_modified, timing), or None if rate limited
+        """
+        if self.rate_limiter and not self.rate_limiter.acquire(timeout=self.rate_limit_timeout):
+            logger.warning(f"Rate limiter budget exhausted; skipping chunk of {len(ids)} ids")
+            return None
+
+        # CoinGecko endpoint for market data
+        params = {
+            'ids': ','.join(ids),
+            'vs_currencies': self.vs_currencies,
+            'include_market_cap': 'true',
+            'include_24hr_vol': 'true',
+            'include_24hr_change': 'true'
+        }
+
+        key = params['ids']
+        cached = self._validators.get(key)
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        endpoint = f"{self.api_url}/simple/price"
+        reset_connect_time()
+        started = time.perf_counter()
+        response = self.session.get(endpoint, params=params, headers=headers, timeout=10, stream=True)
+        headers_at = time.perf_counter()
+        timing = {'connect': last_connect_time(), 'ttfb': headers_at - started, 'download': 0.0, 'parse': 0.0}
+
+        # Rate limited: no request goes out until Retry-After has passed
+        if response.status_code == 429:
+            delay = parse_retry_after(response.headers.get('Retry-After'))
+            if delay is None:
+                delay = self.default_retry_after
+            self._retry_at = max(self._retry_at, time.monotonic() + delay)
+            self.rate_limited_count += 1
+            logger.warning(f"CoinGecko API rate limit reached (429). Backing off for {delay:.0f}s")
+            if self.metrics:
+                self.metrics.inc('upstream_rate_limited_total')
+            response.close()
+            return None
+
+        if response.status_code == 304 and cached:
+            if self.metrics:
+                self.metrics.inc('upstream_not_modified_total')
+            response.close()
+            return cached['payload'], True, timing
+
+        response.raise_for_status()
+        response.content  # read the body so download and parse are timed separately
+        downloaded_at = time.perf_counter()
+        payload = response.json()
+        timing['download'] = downloaded_at - headers_at
+        timing['parse'] = time.perf_counter() - downloaded_at
+        if self.metrics:
+            self.metrics.observe('upstream_parse_seconds', timing['parse'])
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._validators[key] = {'etag': etag, 'last_modified': last_modified, 'payload': payload}
+        return payload, False, timing
+
+    def _fetch_chunk_safe(self, ids: List[str]) -> Optional[Tuple[Dict, bool, Dict]]:
+        """Fetch one chunk, logging failures instead of raising."""
+        try:
+            return self._fetch_chunk(ids)
+        except Exception as e:
+            logger.error(f"Failed to fetch chunk of {len(ids)} ids: {str(e)}")
+            return None
+
     def fetch_market_data(self) -> Optional[Dict]:
         """
         Fetch market data for configured cryptocurrencies.
-        
+
+        IDs are split into chunks fetched concurrently; chunks that fail are
+        dropped and the rest are merged into a single payload. When every
+        chunk answers 304, _metadata.status is 'not_modified'; when the
+        content matches the previous fetch it is 'duplicate'. Callers may
+        skip transformation in both cases. Per-coin fingerprints are passed
+        in _metadata.coin_fingerprints so unchanged coins can be reused.
+
         Returns:
-            Dictionary with market data or None if fetch fails
+            Dictionary with market data or None if fetch fails or a
+            Retry-After period is still running
         """
+        remaining = self.retry_after_remaining()
+        if remaining > 0:
+            self.skipped_fetch_count += 1
+            logger.warning(f"Skipping fetch: rate limited for another {remaining:.0f}s")
+            return None
+
         try:
-            # CoinGecko endpoint for market data
-            params = {
-                'ids': ','.join(self.cryptos),
-                'vs_currencies': 'usd',
-                'include_market_cap': 'true',
-                'include_24hr_vol': 'true',
-                'include_24hr_change': 'true'
-            }
-            
-            endpoint = f"{self.api_url}/simple/price"
-            response = requests.get(endpoint, params=params, timeout=10)
-            
-            # Handle rate limiting gracefully
-            if response.status_code == 429:
-                logger.warning("CoinGecko API rate limit reached (429). Backing off...")
-                self.error_count += 1
+            started = time.perf_counter()
+            chunks = self._chunks()
+            if len(chunks) == 1:
+                results = [self._fetch_chunk(chunks[0])]
+            else:
+                results = list(self._get_executor().map(self._fetch_chunk_safe, chunks))
+
+            data = {}
+            failed = 0
+            unchanged = 0
+            timing = {'connect': 0.0, 'ttfb': 0.0, 'download': 0.0, 'parse': 0.0}
+            for result in results:
+                if result is None:
+                    failed += 1
+                    continue
+                payload, not_modified, chunk_timing = result
+                data.update(payload)
+                unchanged += not_modified
+                for name, value in chunk_timing.items():
+                    timing[name] = max(timing[name], value) if name == 'ttfb' else timing[name] + value
+
+            if failed == len(chunks):
+                self._record_failure()
                 return None
-            
-            response.raise_for_status()
-            
-            data = response.json()
-            
+
+            if failed:
+                self.failed_chunk_count += failed
+                logger.warning(f"{failed} of {len(chunks)} chunks failed; serving partial data")
+
+            fingerprint, coin_fingerprints, duplicate = self.fingerprinter.observe(data)
+            if unchanged == len(chunks):
+                status = 'not_modified'
+                self.not_modified_count += 1
+            elif duplicate:
+                status = 'duplicate'
+            else:
+                status = 'partial' if failed else 'success'
+
             # Add metadata
             data['_metadata'] = {
                 'timestamp': datetime.utcnow().isoformat(),
                 'source': 'CoinGecko',
-                'status': 'success'
+                'status': status,
+                'fingerprint': fingerprint,
+                'coin_fingerprints': coin_fingerprints
             }
-            
+
+            timing['total'] = time.perf_counter() - started
+            if self.metrics:
+                self.metrics.observe('upstream_fetch_seconds', timing['total'])
+            self.last_fetch_timing = {f"{name}_ms": round(value * 1000, 2) for name, value in timing.items()}
+
             self.last_fetch_time = datetime.utcnow()
             self.error_count = 0
-            
+            if self.recorder:
+                self.recorder.record(data, self.last_fetch_timing)
+
             logger.info(f"Successfully fetched data for {len(data)-1} cryptocurrencies")
             return data
-            
+
         except requests.exceptions.RequestException as e:
-            self.error_count += 1
+            self._record_failure()
             logger.error(f"Failed to fetch data from CoinGecko API: {str(e)}")
             return None
         except Exception as e:
-            self.error_count += 1
+            self._record_failure()
             logger.error(f"Unexpected error during data ingestion: {str(e)}")
             return None
-    
+
+    def _record_failure(self) -> None:
+        """Count a fetch that returned no data."""
+        self.error_count += 1
+        if self.metrics:
+            self.metrics.inc('upstream_errors_total')
+
+    def close(self) -> None:
+        """Shut down the chunk request pool and close pooled connections."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.session.close()
+        if self.recorder:
+            self.recorder.close()
+
     def get_status(self) -> Dict:
         """Get ingestion status and health metrics."""
-        return {
+        retry_after = self.retry_after_remaining()
+        if retry_after > 0:
+            health = 'rate_limited'
+        else:
+            health = 'healthy' if self.error_count < 3 else 'unhealthy'
+        status = {
             'last_fetch_time': self.last_fetch_time.isoformat() if self.last_fetch_time else None,
             'error_count': self.error_count,
             'monitored_cryptos': len(self.cryptos),
-            'status': 'healthy' if self.error_count < 3 else 'unhealthy'
+            'vs_currencies': self.vs_currencies,
+            'chunk_count': len(self._chunks()),
+            'failed_chunk_count': self.failed_chunk_count,
+            'not_modified_count': self.not_modified_count,
+            'fingerprints': self.fingerprinter.get_status(),
+            'last_fetch_timing': self.last_fetch_timing,
+            'rate_limited_count': self.rate_limited_count,
+            'skipped_fetch_count': self.skipped_fetch_count,
+            'retry_after_seconds': round(retry_after, 1),
+            'status': health
         }
+        if self.rate_limiter:
+            status['rate_limiter'] = self.rate_limiter.get_status()
+        if self.recorder:
+            status['recorder'] = self.recorder.get_status()
+        return status
@@ -0,0 +1,58 @@
+"""Per-record change tracking between snapshot versions."""
+from typing import Dict, List, Optional, Tuple
+
+# Fields compared when deciding whether a crypto record changed
+COMPARED_FIELDS = ('name', 'price_usd', 'market_cap_usd', 'volume_24h_usd', 'change_24h_percent')
+
+
+class ChangeIndex:
+    """
+    Immutable map of crypto id -> version in which its record last changed.
+
+    Built incrementally at publish time so delta queries never diff
+    snapshots per request.
+    """
+
+    def __init__(self, changed: Optional[Dict[str, int]] = None,
+                 removed: Optional[Dict[str, int]] = None,
+                 fingerprints: Optional[Dict[str, Tuple]] = None):
+        self.changed = changed or {}
+        self.removed = removed or {}
+        self.fingerprints = fingerprints or {}
+
+    def advance(self, data: Optional[Dict], version: int) -> 'ChangeIndex':
+        """Return a new index with changes in data attributed to version."""
+        changed = dict(self.changed)
+        removed = dict(self.removed)
+        fingerprints = {}
+        for crypto in (data or {}).get('cryptos', []):
+            crypto_id = crypto['id']
+            fingerprint = tuple(crypto.get(field) for field in COMPARED_FIELDS)
+            fingerprints[crypto_id] = fingerprint
+            if self.fingerprints.get(crypto_id) != fingerprint:
+                changed[crypto_id] = version
+                removed.pop(crypto_id, None)
+        for crypto_id in self.fingerprints.keys() - fingerprints.keys():
+            removed[crypto_id] = version
+            changed.pop(crypto_id, None)
+        return ChangeIndex(changed, removed, fingerprints)
+
+    def changed_since(self, version: int) -> List[str]:
+        """Ids whose records changed after version."""
+        return [crypto_id for crypto_id, changed in self.changed.items() if changed > version]
+
+    def changed_in(self, version: int) -> set:
+        """Ids whose records changed exactly in version."""
+        return {crypto_id for crypto_id, changed in self.changed.items() if changed == version}
+
+    def removed_since(self, version: int) -> List[str]:
+        """Ids that disappeared after version."""
+        return [crypto_id for crypto_id, removed in self.removed.items() if removed > version]
+
+
+def delta_data(data: Dict, index: ChangeIndex, since: int) -> Dict:
+    """Copy of a transformed snapshot keeping only records changed after since."""
+    changed = set(index.changed_since(since))
+    delta = dict(data)
+    delta['cryptos'] = [crypto for crypto in data.get('cryptos', []) if crypto['id'] in changed]
+    return delta
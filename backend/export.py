@@ -0,0 +1,84 @@
+"""Streaming NDJSON/CSV export of tick history."""
+import csv
+import io
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+from backend.serialization import dumps
+
+# Export columns, in ticks table order
+COLUMNS = ('crypto_id', 'timestamp', 'price_usd', 'market_cap_usd', 'volume_24h_usd', 'change_24h_percent')
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+# Distinct timestamps whose ISO strings are remembered during one export
+ISO_CACHE_SIZE = 100000
+
+
+class _IsoFormatter:
+    """
+    Epoch seconds to ISO-8601 UTC strings, memoized.
+
+    Every coin of a snapshot shares its timestamp, so each timestamp is
+    formatted once instead of once per coin.
+    """
+
+    def __init__(self):
+        self._cache = {}
+
+    def __call__(self, timestamp: float) -> str:
+        iso = self._cache.get(timestamp)
+        if iso is None:
+            if len(self._cache) >= ISO_CACHE_SIZE:
+                self._cache.clear()
+            iso = self._cache[timestamp] = datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+        return iso
+
+
+def _ndjson_chunks(batches) -> Iterator[bytes]:
+    """One NDJSON chunk per batch of rows."""
+    iso = _IsoFormatter()
+    for rows in batches:
+        yield b''.join(
+            dumps(dict(zip(COLUMNS, (row[0], iso(row[1])) + row[2:]))) + b'\n'
+            for row in rows
+        )
+
+
+def _csv_chunks(batches) -> Iterator[bytes]:
+    """A header chunk, then one CSV chunk per batch of rows."""
+    iso = _IsoFormatter()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode('utf-8')
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows((row[0], iso(row[1])) + row[2:] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def export_chunks(store, start: float, end: float, ids: Optional[List[str]] = None,
+                  fmt: str = 'ndjson', batch_size: int = 5000) -> Iterator[bytes]:
+    """
+    Encode the ticks of a time range as a stream of byte chunks.
+
+    Args:
+        store: HistoryStore to read from
+        start: Range start in epoch seconds (inclusive)
+        end: Range end in epoch seconds (exclusive)
+        ids: Only these crypto ids (all if None)
+        fmt: 'ndjson' or 'csv'
+        batch_size: Rows read and encoded per chunk
+
+    Returns:
+        Generator of encoded chunks; memory use is bounded by batch_size
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    batches = store.iter_ticks(start, end, ids, batch_size=batch_size)
+    return _csv_chunks(batches) if fmt == 'csv' else _ndjson_chunks(batches)
@@ -0,0 +1,75 @@
+"""Cheap content fingerprints of raw upstream payloads."""
+from typing import Dict, Hashable, Optional, Tuple
+
+
+def coin_fingerprint(crypto_data) -> Hashable:
+    """
+    Order-independent key of one coin's raw record.
+
+    The key is the record's sorted items rather than their hash(): equal
+    keys mean equal values, so consumers comparing fingerprints never reuse
+    a record whose values changed (hash(-1.0) == hash(-2.0), for one).
+    """
+    try:
+        return tuple(sorted(crypto_data.items()))
+    except (AttributeError, TypeError):
+        return repr(crypto_data)
+
+
+class PayloadFingerprinter:
+    """Tracks payload and per-coin fingerprints across consecutive fetches."""
+
+    def __init__(self):
+        """Initialize with no previous payload."""
+        self.payload_count = 0
+        self.duplicate_payloads = 0
+        self.coin_count = 0
+        self.duplicate_coins = 0
+        self._last_payload = None
+        self._last_coins = {}
+
+    def observe(self, raw_data: Dict) -> Tuple[int, Dict[str, Hashable], bool]:
+        """
+        Fingerprint a payload, ignoring _metadata, and compare with the last one.
+
+        Returns:
+            Tuple of (payload fingerprint, {id: coin fingerprint}, is_duplicate);
+            a duplicate has the same payload hash and equal coin keys
+        """
+        coins = {
+            crypto_id: coin_fingerprint(crypto_data)
+            for crypto_id, crypto_data in raw_data.items()
+            if crypto_id != '_metadata'
+        }
+        try:
+            payload = hash(tuple(coins.items()))
+        except TypeError:  # unhashable values inside a record
+            payload = hash(repr(coins))
+        # Hashes can collide; only equal keys make a duplicate
+        duplicate = payload == self._last_payload and coins == self._last_coins
+
+        last_coins = self._last_coins
+        self.duplicate_coins += sum(1 for crypto_id, fp in coins.items() if last_coins.get(crypto_id) == fp)
+        self.coin_count += len(coins)
+        self.payload_count += 1
+        self.duplicate_payloads += duplicate
+
+        self._last_payload = payload
+        self._last_coins = coins
+        return payload, coins, duplicate
+
+    @staticmethod
+    def _rate(part: int, total: int) -> Optional[float]:
+        """Percentage, or None before any observation."""
+        return round(part / total * 100, 2) if total else None
+
+    def get_status(self) -> Dict:
+        """Get duplicate counters for health reporting."""
+        return {
+            'payloads': self.payload_count,
+            'duplicate_payloads': self.duplicate_payloads,
+            'duplicate_payload_rate': self._rate(self.duplicate_payloads, self.payload_count),
+            'coins': self.coin_count,
+            'duplicate_coins': self.duplicate_coins,
+            'duplicate_coin_rate': self._rate(self.duplicate_coins, self.coin_count)
+        }
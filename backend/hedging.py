@@ -0,0 +1,331 @@
+"""Hedged requests across several market data providers with per-coin merging."""
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from backend.fingerprint import PayloadFingerprinter
+from backend.providers import MarketDataProvider
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    """Thread-safe sliding window of recent fetch latencies with percentiles."""
+
+    def __init__(self, size: int = 100):
+        """
+        Initialize an empty window.
+
+        Args:
+            size: Number of most recent samples kept
+        """
+        self._samples = deque(maxlen=max(1, size))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        """Record one latency sample."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank q-th percentile in seconds, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, max(0, math.ceil(q / 100 * len(samples)) - 1))]
+
+    def get_status(self) -> Dict:
+        """Get sample count and p50/p95 in milliseconds."""
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            'samples': len(self),
+            'p50_ms': round(p50 * 1000, 2) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 2) if p95 is not None else None
+        }
+
+
+def merge_payloads(payloads: Sequence[Dict]) -> Dict:
+    """
+    Merge raw payloads per coin; earlier payloads take precedence.
+
+    Coins missing from the first payload are taken from the next one that
+    has them, and fields that are missing or None are filled in the same
+    way, so a USD-only source can complete another's gaps while the first
+    answer's prices win. _metadata is dropped.
+
+    Args:
+        payloads: Raw payloads in precedence order
+
+    Returns:
+        Merged payload without _metadata
+    """
+    merged = {}
+    for payload in payloads:
+        for crypto_id, crypto_data in payload.items():
+            if crypto_id == '_metadata' or not isinstance(crypto_data, dict):
+                continue
+            current = merged.get(crypto_id)
+            if current is None:
+                merged[crypto_id] = dict(crypto_data)
+                continue
+            for field, value in crypto_data.items():
+                if value is not None and current.get(field) is None:
+                    current[field] = value
+    return merged
+
+
+class HedgedIngester(MarketDataProvider):
+    """
+    Fetches from the fastest provider and hedges with the others.
+
+    Providers are ranked by their p95 latency (untried providers keep their
+    configured order behind measured ones). The primary is called first;
+    if it has not answered within the hedge delay, or fails, the next
+    provider is called too and the first valid answer is used. Answers
+    that arrive within merge_wait of the first one are merged per coin.
+    A provider whose previous request is still running, or that is backing
+    off after a 429, is skipped.
+    """
+
+    name = 'hedged'
+
+    # No shared budget: every provider applies its own rate limiter
+    rate_limiter = None
+
+    def __init__(self, providers: Sequence[MarketDataProvider], hedge_delay: Optional[float] = None,
+                 default_hedge_delay: float = 1.0, merge_wait: float = 0.25, timeout: float = 15.0,
+                 window: int = 100, metrics=None, recorder=None):
+        """
+        Initialize the hedged ingester.
+
+        Args:
+            providers: Market data providers in configured preference order
+            hedge_delay: Seconds before the backup is called (None adapts to the primary's p95)
+            default_hedge_delay: Hedge delay while the primary has no latency samples
+            merge_wait: Seconds to wait for outstanding answers after the first valid one
+            timeout: Seconds a fetch waits for any valid answer; also the latency
+                recorded for a failed request
+            window: Latency samples kept per provider
+            metrics: Optional MetricsRegistry for per-source latency and hedge counts
+            recorder: Optional SegmentRecorder every merged payload is appended to
+        """
+        if not providers:
+            raise ValueError("HedgedIngester needs at least one provider")
+        self.providers = list(providers)
+        self.hedge_delay = hedge_delay
+        self.default_hedge_delay = default_hedge_delay
+        self.merge_wait = merge_wait
+        self.timeout = timeout
+        self.metrics = metrics
+        self.recorder = recorder
+        self.latency = {provider.name: LatencyWindow(window) for provider in self.providers}
+        self.fingerprinter = PayloadFingerprinter()
+        self.fetch_count = 0
+        self.error_count = 0
+        self.skipped_fetch_count = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.merged_count = 0
+        self.last_fetch_time = None
+        self.last_sources = None
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.providers), thread_name_prefix='hedged-fetch')
+
+    @property
+    def calls_per_fetch(self) -> int:
+        """Upstream requests made by one fetch_market_data() call, at most."""
+        return max(provider.calls_per_fetch for provider in self.providers)
+
+    def retry_after_remaining(self) -> float:
+        """Seconds until any provider may be called again after a 429."""
+        return min(provider.retry_after_remaining() for provider in self.providers)
+
+    def ranked(self) -> List[MarketDataProvider]:
+        """Providers ordered by p95 latency; untried ones keep their configured order last."""
+        def p95(provider):
+            value = self.latency[provider.name].percentile(95)
+            return value if value is not None else math.inf
+        return sorted(self.providers, key=p95)
+
+    def _hedge_delay(self, primary: MarketDataProvider) -> float:
+        """Seconds to wait for the primary before calling a backup."""
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        p95 = self.latency[primary.name].percentile(95)
+        return p95 if p95 is not None else self.default_hedge_delay
+
+    def _call(self, provider: MarketDataProvider) -> Optional[Dict]:
+        """Fetch from one provider, recording its latency (failures count as timeout)."""
+        started = time.perf_counter()
+        data = None
+        try:
+            data = provider.fetch_market_data()
+        except Exception as e:
+            logger.error(f"Market data source {provider.name} failed: {str(e)}")
+        finally:
+            elapsed = time.perf_counter() - started
+            self.latency[provider.name].add(elapsed if data is not None else max(elapsed, self.timeout))
+            if self.metrics:
+                self.metrics.observe('upstream_source_seconds', elapsed, source=provider.name)
+            with self._lock:
+                self._in_flight.discard(provider.name)
+        return data
+
+    def _submit(self, provider: MarketDataProvider):
+        """Start a request to provider on the pool."""
+        with self._lock:
+            self._in_flight.add(provider.name)
+        return self._executor.submit(self._call, provider)
+
+    def _candidates(self) -> List[MarketDataProvider]:
+        """Ranked providers that are neither busy nor backing off."""
+        with self._lock:
+            busy = set(self._in_flight)
+        return [
+            provider for provider in self.ranked()
+            if provider.name not in busy and provider.retry_after_remaining() <= 0
+        ]
+
+    def _race(self, candidates: List[MarketDataProvider]) -> List[Tuple[MarketDataProvider, Dict]]:
+        """
+        Call the primary, hedge with backups, and collect answers.
+
+        Returns:
+            (provider, payload) answers, first valid answer first; empty if none
+        """
+        primary, backups = candidates[0], deque(candidates[1:])
+        started = time.monotonic()
+        deadline = started + self.timeout
+        hedge_at = started + self._hedge_delay(primary)
+        pending = {self._submit(primary): primary}
+
+        def fire_backup():
+            backup = backups.popleft()
+            pending[self._submit(backup)] = backup
+            self.hedges_fired += 1
+            if self.metrics:
+                self.metrics.inc('upstream_hedges_total', outcome='fired')
+            return backup
+
+        answers = []
+        while pending and not answers:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            until = min(deadline, hedge_at) if backups else deadline
+            done, _ = wait(list(pending), timeout=max(0.0, until - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = pending.pop(future)
+                data = future.result()
+                if data is not None:
+                    answers.append((provider, data))
+            if answers:
+                break
+            if backups and (done or time.monotonic() >= hedge_at):
+                # Primary failed or is slow: call the next provider now
+                backup = fire_backup()
+                hedge_at = time.monotonic() + self._hedge_delay(backup)
+
+        if answers and pending and self.merge_wait > 0:
+            done, _ = wait(list(pending), timeout=self.merge_wait)
+            for future in done:
+                data = future.result()
+                if data is not None:
+                    answers.append((pending[future], data))
+        return answers
+
+    def fetch_market_data(self) -> Optional[Dict]:
+        """
+        Fetch market data with hedging across providers.
+
+        Returns:
+            Merged payload with _metadata.source naming every contributing
+            source ('duplicate' when identical to the previous fetch), or
+            None if no provider answered within the timeout
+        """
+        candidates = self._candidates()
+        if not candidates:
+            self.skipped_fetch_count += 1
+            logger.warning("Skipping fetch: every market data source is busy or rate limited")
+            return None
+
+        self.fetch_count += 1
+        answers = self._race(candidates)
+        if not answers:
+            self.error_count += 1
+            logger.error(f"No market data source answered within {self.timeout:.0f}s")
+            return None
+
+        winner = answers[0][0]
+        if winner is not candidates[0]:
+            self.hedges_won += 1
+            if self.metrics:
+                self.metrics.inc('upstream_hedges_total', outcome='won')
+        if len(answers) > 1:
+            self.merged_count += 1
+            if self.metrics:
+                self.metrics.inc('upstream_hedges_total', outcome='merged')
+
+        data = merge_payloads([payload for _, payload in answers])
+        statuses = [payload['_metadata'].get('status') for _, payload in answers]
+        fingerprint, coin_fingerprints, duplicate = self.fingerprinter.observe(data)
+        if duplicate:
+            status = 'duplicate'
+        else:
+            status = 'partial' if all(s == 'partial' for s in statuses) else 'success'
+        sources = [payload['_metadata'].get('source', provider.name) for provider, payload in answers]
+        data['_metadata'] = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'source': '+'.join(sources),
+            'status': status,
+            'fingerprint': fingerprint,
+            'coin_fingerprints': coin_fingerprints
+        }
+        self.last_sources = sources
+        self.last_fetch_time = datetime.utcnow()
+        self.error_count = 0
+        if self.recorder:
+            self.recorder.record(data)
+        return data
+
+    def close(self) -> None:
+        """Wait for outstanding requests and close every provider."""
+        self._executor.shutdown(wait=True)
+        for provider in self.providers:
+            provider.close()
+        if self.recorder:
+            self.recorder.close()
+
+    def get_status(self) -> Dict:
+        """Get hedging counters, per-source latency and each provider's status."""
+        ranked = self.ranked()
+        status = {
+            'last_fetch_time': self.last_fetch_time.isoformat() if self.last_fetch_time else None,
+            'primary': ranked[0].name,
+            'hedge_delay_ms': round(self._hedge_delay(ranked[0]) * 1000, 2),
+            'fetch_count': self.fetch_count,
+            'error_count': self.error_count,
+            'skipped_fetch_count': self.skipped_fetch_count,
+            'hedges_fired': self.hedges_fired,
+            'hedges_won': self.hedges_won,
+            'merged_count': self.merged_count,
+            'last_sources': self.last_sources,
+            'fingerprints': self.fingerprinter.get_status(),
+            'sources': {
+                provider.name: {'latency': self.latency[provider.name].get_status(), **provider.get_status()}
+                for provider in self.providers
+            },
+            'status': 'healthy' if self.error_count < 3 else 'unhealthy'
+        }
+        if self.recorder:
+            status['recorder'] = self.recorder.get_status()
+        return status
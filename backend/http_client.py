@@ -0,0 +1,93 @@
+"""Pooled HTTP session with retries and per-request connection timing."""
+import threading
+import time
+from typing import Iterable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+# Connect time of the most recent new connection opened by this thread
+_timing = threading.local()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    """HTTP connection that records how long connect() took."""
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _timing.connect = time.perf_counter() - started
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """HTTPS connection that records how long connect() (TCP + TLS) took."""
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _timing.connect = time.perf_counter() - started
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections report connect time."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool
+        }
+
+
+def reset_connect_time() -> None:
+    """Clear this thread's recorded connect time before a request."""
+    _timing.connect = 0.0
+
+
+def last_connect_time() -> float:
+    """Seconds spent opening a new connection during this thread's last request (0 if reused)."""
+    return getattr(_timing, 'connect', 0.0)
+
+
+def build_session(pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.5,
+                  status_forcelist: Iterable[int] = (500, 502, 503, 504)) -> requests.Session:
+    """
+    Create a keep-alive session with a tuned pool and retry/backoff policy.
+
+    Args:
+        pool_size: Connections kept alive per host
+        retries: Maximum retries for connection errors and retryable statuses
+        backoff_factor: Exponential backoff base in seconds
+        status_forcelist: HTTP statuses that trigger a retry
+
+    Returns:
+        Configured requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=tuple(status_forcelist),
+        allowed_methods=frozenset(['GET']),
+        # 429s go back to the ingesters, which honour Retry-After without blocking
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    adapter = TimedHTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -0,0 +1,242 @@
+"""Low-overhead counters and latency histograms rendered in Prometheus text format."""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Latency bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metrics recorded by the platform: name -> (type, help text)
+CATALOG = {
+    'upstream_fetch_seconds': ('histogram', 'Duration of a full upstream fetch across all chunks'),
+    'upstream_parse_seconds': ('histogram', 'JSON parse time of one upstream chunk response'),
+    'upstream_rate_limited_total': ('counter', 'Upstream responses rejected with 429 Too Many Requests'),
+    'upstream_not_modified_total': ('counter', 'Upstream chunk responses answered with 304 Not Modified'),
+    'upstream_errors_total': ('counter', 'Upstream fetches that returned no data'),
+    'upstream_source_seconds': ('histogram', 'Duration of one fetch from a market data source by source'),
+    'upstream_hedges_total': ('counter', 'Hedged backup requests by outcome (fired, won, merged)'),
+    'transform_seconds': ('histogram', 'Duration of transforming one raw payload'),
+    'quality_check_seconds': ('histogram', 'Duration of the data quality checks for one snapshot'),
+    'serialize_seconds': ('histogram', 'Duration of serializing and compressing one response body'),
+    'response_cache_requests_total': ('counter', 'Serialized response body lookups by result'),
+    'snapshot_cache_requests_total': ('counter', 'On-demand refresh lookups of the snapshot cache by outcome'),
+    'http_request_seconds': ('histogram', 'Flask request handling time by route'),
+    'http_requests_total': ('counter', 'Flask requests by route and status code'),
+}
+
+# Retired shards are folded into the aggregate after this many new shards
+_FOLD_EVERY = 64
+
+
+def _escape(value) -> str:
+    """Escape a label value for the text format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Shard:
+    """Metric values written by a single thread; read (approximately) at scrape time."""
+
+    __slots__ = ('thread', 'counters', 'histograms')
+
+    def __init__(self, thread: threading.Thread):
+        self.thread = thread
+        self.counters = {}
+        self.histograms = {}
+
+
+class _Timer:
+    """Context manager observing elapsed time into a histogram."""
+
+    __slots__ = ('registry', 'name', 'labels', 'started')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, labels: Dict):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class _NullTimer:
+    """Timer used when detailed timing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms aggregated per thread.
+
+    Each thread records into its own shard, so the hot path takes no lock;
+    shards are summed when /api/metrics is scraped. Shards of finished
+    threads are folded into a retired aggregate so short-lived request
+    threads do not accumulate. With detailed_timing off, histograms are not
+    recorded and only counters remain.
+    """
+
+    def __init__(self, detailed_timing: bool = True, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                 namespace: str = 'streaming'):
+        """
+        Initialize the registry.
+
+        Args:
+            detailed_timing: Whether latency histograms are recorded
+            buckets: Histogram bucket upper bounds in seconds
+            namespace: Prefix of every exported metric name
+        """
+        self.detailed_timing = detailed_timing
+        self.buckets = tuple(buckets)
+        self.namespace = namespace
+        self._kinds = {name: kind for name, (kind, _) in CATALOG.items()}
+        self._help = {name: help_text for name, (_, help_text) in CATALOG.items()}
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._retired = _Shard(None)
+        self._lock = threading.Lock()
+        self._new_shards = 0
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        """Declare a metric's type ('counter' or 'histogram') and help text."""
+        self._kinds[name] = kind
+        self._help[name] = help_text
+
+    def _shard(self) -> _Shard:
+        """Return the calling thread's shard, registering it on first use."""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+                self._new_shards += 1
+                if self._new_shards >= _FOLD_EVERY:
+                    self._fold_retired()
+        return shard
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """Increment a counter."""
+        counters = self._shard().counters
+        key = (name, tuple(labels.items()))
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record one latency observation; a no-op when detailed timing is off."""
+        if not self.detailed_timing:
+            return
+        histograms = self._shard().histograms
+        key = (name, tuple(labels.items()))
+        values = histograms.get(key)
+        if values is None:
+            # per-bucket counts, then sum and count
+            values = histograms[key] = [0] * (len(self.buckets) + 3)
+        values[bisect_left(self.buckets, seconds)] += 1
+        values[-2] += seconds
+        values[-1] += 1
+
+    def timer(self, name: str, **labels):
+        """Context manager timing a block into a histogram."""
+        if not self.detailed_timing:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def _fold_retired(self) -> None:
+        """Merge shards of finished threads into the retired aggregate. Caller holds _lock."""
+        alive = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                self._merge(self._retired, shard)
+        self._shards = alive
+        self._new_shards = 0
+
+    @staticmethod
+    def _merge(target: _Shard, shard: _Shard) -> None:
+        """Add a shard's values into target."""
+        for key, value in list(shard.counters.items()):
+            target.counters[key] = target.counters.get(key, 0) + value
+        for key, values in list(shard.histograms.items()):
+            merged = target.histograms.get(key)
+            if merged is None:
+                target.histograms[key] = list(values)
+            else:
+                for i, value in enumerate(values):
+                    merged[i] += value
+
+    def snapshot(self) -> _Shard:
+        """Sum of all shards at this moment."""
+        total = _Shard(None)
+        with self._lock:
+            self._fold_retired()
+            self._merge(total, self._retired)
+            for shard in self._shards:
+                self._merge(total, shard)
+        return total
+
+    def value(self, name: str, **labels) -> Optional[float]:
+        """Current value of a counter, or the observation count of a histogram."""
+        key = (name, tuple(labels.items()))
+        total = self.snapshot()
+        if key in total.counters:
+            return total.counters[key]
+        if key in total.histograms:
+            return total.histograms[key][-1]
+        return None
+
+    @staticmethod
+    def _labels(pairs) -> str:
+        """Render a label set."""
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        total = self.snapshot()
+        series = {}
+        for (name, labels), value in total.counters.items():
+            series.setdefault(name, []).append((labels, value))
+        for (name, labels), values in total.histograms.items():
+            series.setdefault(name, []).append((labels, values))
+
+        lines = []
+        for name in sorted(series):
+            full = f"{self.namespace}_{name}" if self.namespace else name
+            kind = self._kinds.get(name, 'histogram' if name.endswith('_seconds') else 'counter')
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            for labels, value in sorted(series[name], key=lambda item: str(item[0])):
+                if kind != 'histogram':
+                    lines.append(f"{full}{self._labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets, value):
+                    cumulative += count
+                    lines.append(f"{full}_bucket{self._labels(labels + (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{full}_bucket{self._labels(labels + (('le', '+Inf'),))} {value[-1]}")
+                lines.append(f"{full}_sum{self._labels(labels)} {value[-2]}")
+                lines.append(f"{full}_count{self._labels(labels)} {value[-1]}")
+        return '\n'.join(lines) + '\n'
+
+    def get_status(self) -> Dict:
+        """Get registry status for health reporting."""
+        return {
+            'detailed_timing': self.detailed_timing,
+            'threads': len(self._shards)
+        }
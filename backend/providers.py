@@ -0,0 +1,36 @@
+"""Market data provider interface shared by every ingestion source."""
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+class MarketDataProvider(ABC):
+    """
+    A source of raw market data in the CoinGecko /simple/price shape.
+
+    fetch_market_data() returns {crypto_id: {'usd': ..., 'usd_market_cap': ...,
+    'usd_24h_vol': ..., 'usd_24h_change': ...}, '_metadata': {...}} or None
+    on failure, so DataTransformer and the scheduler work with any source.
+    """
+
+    # Short source name used in status, metrics and merged payloads
+    name = 'provider'
+
+    @abstractmethod
+    def fetch_market_data(self) -> Optional[Dict]:
+        """Fetch one payload; None if the source failed."""
+
+    @abstractmethod
+    def get_status(self) -> Dict:
+        """Get source status for health reporting."""
+
+    @property
+    def calls_per_fetch(self) -> int:
+        """Upstream requests made by one fetch_market_data() call."""
+        return 1
+
+    def retry_after_remaining(self) -> float:
+        """Seconds the source asked us to wait before calling it again."""
+        return 0.0
+
+    def close(self) -> None:
+        """Release connections and worker threads."""
@@ -0,0 +1,207 @@
+"""Incremental data-quality checks run on every transformed snapshot."""
+import logging
+import math
+import time
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class _CoinState:
+    """Constant-size per-coin state for duplicate and price-jump checks."""
+
+    __slots__ = ('last_price', 'last_fingerprint', 'mean', 'var', 'samples')
+
+    def __init__(self):
+        self.last_price = None
+        self.last_fingerprint = None
+        self.mean = 0.0
+        self.var = 0.0
+        self.samples = 0
+
+
+class QualityEngine:
+    """
+    Enforces the Config quality thresholds incrementally.
+
+    Rolling rates are exponentially weighted over roughly `window` snapshots
+    and each coin keeps an exponentially weighted mean/variance of its
+    returns (Welford-style update), so memory is constant per coin and no
+    history is rescanned.
+    """
+
+    CHECKS = ('null_rate', 'duplicate_rate', 'price_jump')
+
+    def __init__(self, config, window: int = 30, zscore_threshold: float = 6.0,
+                 min_samples: int = 10):
+        """
+        Initialize the engine.
+
+        Args:
+            config: Config class providing the quality thresholds
+            window: Approximate number of snapshots the rolling rates cover
+            zscore_threshold: Return z-score that flags an anomalous move
+            min_samples: Returns observed before z-scores are trusted
+        """
+        self.max_null_percentage = config.MAX_NULL_PERCENTAGE
+        self.duplicate_threshold = config.DUPLICATE_THRESHOLD
+        self.max_price_change = config.MAX_PRICE_CHANGE_PERCENTAGE
+        self.alpha = 2.0 / (window + 1)
+        self.zscore_threshold = zscore_threshold
+        self.min_samples = min_samples
+
+        self.null_rate = None
+        self.duplicate_rate = None
+        self.evaluations = 0
+        self.alert_count = 0
+        self.duplicate_payloads = 0
+        self._coins = {}
+        self._timings = {check: {'last_ms': 0.0, 'avg_ms': 0.0} for check in self.CHECKS}
+
+    def _state(self, crypto_id: str) -> _CoinState:
+        """Return (creating if needed) the state for a coin."""
+        state = self._coins.get(crypto_id)
+        if state is None:
+            state = self._coins[crypto_id] = _CoinState()
+        return state
+
+    def _ewma(self, current, value: float) -> float:
+        """Exponentially weighted update seeded with the first value."""
+        return value if current is None else current + self.alpha * (value - current)
+
+    def _time(self, check: str, started: float) -> None:
+        """Record the cost of one check."""
+        elapsed = (time.perf_counter() - started) * 1000
+        timing = self._timings[check]
+        timing['last_ms'] = round(elapsed, 4)
+        timing['avg_ms'] = round(self._ewma(timing['avg_ms'] if self.evaluations else None, elapsed), 4)
+
+    def evaluate(self, transformed: Dict) -> List[Dict]:
+        """
+        Run all checks on a transformed snapshot.
+
+        Alerts are appended to transformed['summary']['errors'] and returned.
+        """
+        summary = transformed['summary']
+        cryptos = transformed['cryptos']
+        alerts = []
+
+        started = time.perf_counter()
+        alerts.extend(self._check_null_rate(summary))
+        self._time('null_rate', started)
+
+        started = time.perf_counter()
+        alerts.extend(self._check_duplicates(cryptos))
+        self._time('duplicate_rate', started)
+
+        started = time.perf_counter()
+        alerts.extend(self._check_price_jumps(cryptos))
+        self._time('price_jump', started)
+
+        self.evaluations += 1
+        self.alert_count += len(alerts)
+        summary['errors'].extend(alerts)
+        for alert in alerts:
+            logger.warning(f"Data quality alert: {alert['message']}")
+        return alerts
+
+    def record_duplicate_payload(self) -> List[Dict]:
+        """
+        Count a whole payload that was skipped as unchanged (304 or identical content).
+
+        Such payloads are never transformed, so evaluate() does not see them;
+        each counts as a snapshot in which every record repeated, so a stuck
+        upstream drives the rolling duplicate rate over DUPLICATE_THRESHOLD.
+
+        Returns:
+            Alerts raised, also logged and counted in alert_count
+        """
+        self.duplicate_payloads += 1
+        alerts = self._duplicate_alerts(100.0)
+        self.alert_count += len(alerts)
+        for alert in alerts:
+            logger.warning(f"Data quality alert: {alert['message']}")
+        return alerts
+
+    def _duplicate_alerts(self, rate: float) -> List[Dict]:
+        """Fold one snapshot's duplicate percentage into the rolling rate and check the threshold."""
+        self.duplicate_rate = self._ewma(self.duplicate_rate, rate)
+        if self.duplicate_rate > self.duplicate_threshold:
+            return [{
+                'check': 'duplicate_rate',
+                'value': round(self.duplicate_rate, 2),
+                'message': f"Rolling duplicate rate {self.duplicate_rate:.2f}% exceeds {self.duplicate_threshold}%"
+            }]
+        return []
+
+    def _check_null_rate(self, summary: Dict) -> List[Dict]:
+        """Rolling percentage of records rejected as null/invalid."""
+        if not summary['total_count']:
+            return []
+        rate = summary['null_count'] / summary['total_count'] * 100
+        self.null_rate = self._ewma(self.null_rate, rate)
+        if self.null_rate > self.max_null_percentage:
+            return [{
+                'check': 'null_rate',
+                'value': round(self.null_rate, 2),
+                'message': f"Rolling null rate {self.null_rate:.2f}% exceeds {self.max_null_percentage}%"
+            }]
+        return []
+
+    def _check_duplicates(self, cryptos: List[Dict]) -> List[Dict]:
+        """Rolling percentage of records identical to the coin's previous tick."""
+        if not cryptos:
+            return []
+        duplicates = 0
+        for crypto in cryptos:
+            state = self._state(crypto['id'])
+            fingerprint = (crypto['price_usd'], crypto.get('market_cap_usd'),
+                           crypto.get('volume_24h_usd'), crypto.get('change_24h_percent'))
+            if fingerprint == state.last_fingerprint:
+                duplicates += 1
+            state.last_fingerprint = fingerprint
+        return self._duplicate_alerts(duplicates / len(cryptos) * 100)
+
+    def _check_price_jumps(self, cryptos: List[Dict]) -> List[Dict]:
+        """Flag per-interval moves above the limit or far outside the coin's usual returns."""
+        alerts = []
+        alpha = self.alpha
+        for crypto in cryptos:
+            state = self._state(crypto['id'])
+            price = crypto['price_usd']
+            previous = state.last_price
+            state.last_price = price
+            if not previous or price is None or math.isnan(price):
+                continue
+
+            change = (price - previous) / previous * 100
+            zscore = None
+            if state.samples >= self.min_samples and state.var > 0:
+                zscore = (change - state.mean) / math.sqrt(state.var)
+
+            if abs(change) > self.max_price_change or (zscore is not None and abs(zscore) > self.zscore_threshold):
+                alerts.append({
+                    'check': 'price_jump',
+                    'id': crypto['id'],
+                    'value': round(change, 2),
+                    'message': (f"{crypto['id']} moved {change:+.2f}% in one interval"
+                                + (f" (z={zscore:.1f})" if zscore is not None else ""))
+                })
+
+            delta = change - state.mean
+            state.mean += alpha * delta
+            state.var = (1 - alpha) * (state.var + alpha * delta * delta)
+            state.samples += 1
+        return alerts
+
+    def get_status(self) -> Dict:
+        """Get rolling rates and per-check evaluation cost."""
+        return {
+            'evaluations': self.evaluations,
+            'alert_count': self.alert_count,
+            'tracked_cryptos': len(self._coins),
+            'null_rate': None if self.null_rate is None else round(self.null_rate, 2),
+            'duplicate_rate': None if self.duplicate_rate is None else round(self.duplicate_rate, 2),
+            'duplicate_payloads': self.duplicate_payloads,
+            'check_timings': self._timings
+        }
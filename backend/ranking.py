@@ -0,0 +1,135 @@
+"""Sorted per-snapshot indexes for server-side ranking and range filters."""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Numeric record fields that can be ranked and filtered
+RANK_FIELDS = ('price_usd', 'market_cap_usd', 'volume_24h_usd', 'change_24h_percent')
+
+
+class RankIndex:
+    """
+    Immutable sorted views of one snapshot's crypto records.
+
+    For every field the records with a value are sorted once, ascending,
+    into parallel key and position lists. Top-n and range queries are
+    then list slices (plus a bisect for ranges) instead of per-request sorts.
+    """
+
+    def __init__(self, version: int, cryptos: List, fields: Iterable[str] = RANK_FIELDS):
+        """
+        Build the indexes.
+
+        Args:
+            version: Snapshot version the records belong to
+            cryptos: Transformed crypto records (CryptoRecord or dict)
+            fields: Fields to index
+        """
+        self.version = version
+        self.cryptos = cryptos
+        self._columns = {}
+        for field in fields:
+            values = [crypto.get(field) for crypto in cryptos]
+            positions = sorted((i for i, value in enumerate(values) if value is not None), key=values.__getitem__)
+            self._columns[field] = ([values[i] for i in positions], positions)
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Indexed field names."""
+        return tuple(self._columns)
+
+    def top(self, by: str, n: int, descending: bool = True) -> List:
+        """
+        The n records with the largest (or smallest) value of a field.
+
+        Records without a value are never ranked.
+        """
+        positions = self._columns[by][1]
+        selected = positions[-n:][::-1] if descending else positions[:n]
+        return [self.cryptos[i] for i in selected]
+
+    def range(self, by: str, low: Optional[float] = None, high: Optional[float] = None,
+              limit: Optional[int] = None, descending: bool = False) -> Tuple[List, int]:
+        """
+        Records whose field lies within [low, high], ordered by that field.
+
+        Args:
+            by: Indexed field
+            low: Inclusive lower bound (unbounded if None)
+            high: Inclusive upper bound (unbounded if None)
+            limit: Maximum records returned
+            descending: Largest values first
+
+        Returns:
+            Tuple of (records, total number of matches)
+        """
+        keys, positions = self._columns[by]
+        start = 0 if low is None else bisect_left(keys, low)
+        end = len(keys) if high is None else bisect_right(keys, high)
+        total = max(0, end - start)
+        if limit is not None and total > limit:
+            if descending:
+                start = end - limit
+            else:
+                end = start + limit
+        selected = positions[start:end]
+        if descending:
+            selected = selected[::-1]
+        return [self.cryptos[i] for i in selected], total
+
+
+class RankIndexer:
+    """Keeps the RankIndex of the latest snapshot, building each version once."""
+
+    def __init__(self, fields: Iterable[str] = RANK_FIELDS):
+        """
+        Initialize the indexer.
+
+        Args:
+            fields: Fields every RankIndex covers
+        """
+        self.fields = tuple(fields)
+        self.build_count = 0
+        self.last_build_seconds = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def index_for(self, snapshot) -> Optional[RankIndex]:
+        """
+        Return the index of a snapshot, building it on first use.
+
+        Args:
+            snapshot: Published Snapshot
+
+        Returns:
+            The RankIndex, or None if the snapshot has no data
+        """
+        index = self._index
+        if index is not None and index.version == snapshot.version:
+            return index
+        if snapshot.data is None:
+            return None
+        with self._lock:
+            index = self._index
+            if index is not None and index.version == snapshot.version:
+                return index
+            started = time.perf_counter()
+            index = RankIndex(snapshot.version, snapshot.data.get('cryptos', []), self.fields)
+            self.last_build_seconds = time.perf_counter() - started
+            self.build_count += 1
+            # An older snapshot never replaces the index of a newer one
+            if self._index is None or self._index.version < index.version:
+                self._index = index
+            return index
+
+    def get_status(self) -> Dict:
+        """Get indexer status for health reporting."""
+        index = self._index
+        return {
+            'fields': list(self.fields),
+            'version': index.version if index is not None else None,
+            'indexed_cryptos': len(index.cryptos) if index is not None else 0,
+            'builds': self.build_count,
+            'last_build_ms': round(self.last_build_seconds * 1000, 2) if self.last_build_seconds is not None else None
+        }
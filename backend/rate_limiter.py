@@ -0,0 +1,80 @@
+"""Token-bucket rate limiter shared by all upstream requests."""
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, calls_per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket full.
+
+        Args:
+            calls_per_minute: Sustained request rate allowed by the API plan
+            capacity: Maximum burst size (defaults to one minute of calls)
+        """
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
+        self.rate = calls_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else calls_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens accrued since the last update (lock must be held)."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available without waiting."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, sleeping until they are available.
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if acquired, False if the timeout elapsed first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0 or wait > remaining:
+                    return False
+            time.sleep(wait)
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until tokens will be available (0 if they are now)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (tokens - self._tokens) / self.rate)
+
+    def get_status(self) -> Dict:
+        """Get limiter status for health reporting."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'calls_per_minute': self.rate * 60.0,
+                'capacity': self.capacity,
+                'available_tokens': round(self._tokens, 2)
+            }
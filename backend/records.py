@@ -0,0 +1,120 @@
+"""Compact in-memory representation of transformed crypto rows."""
+from typing import Dict, Iterator, Tuple
+
+
+class _Row:
+    """
+    Dict-style read access shared by the slotted row classes.
+
+    _fields are the JSON field names and _attributes the attribute holding
+    each of them, in the same order.
+    """
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _attributes: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, self._attributes[self._fields.index(key)])
+
+    def __contains__(self, key) -> bool:
+        return key in self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def get(self, key: str, default=None):
+        """Dict-style lookup."""
+        return self[key] if key in self._fields else default
+
+    def keys(self) -> Tuple[str, ...]:
+        """Field names in JSON order."""
+        return self._fields
+
+    def items(self) -> Iterator[Tuple[str, object]]:
+        """(field, value) pairs in JSON order."""
+        return ((key, getattr(self, attribute)) for key, attribute in zip(self._fields, self._attributes))
+
+    def to_dict(self) -> Dict:
+        """The JSON row format served by the API."""
+        return {key: getattr(self, attribute) for key, attribute in zip(self._fields, self._attributes)}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (_Row, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class CryptoRecord(_Row):
+    """
+    One transformed cryptocurrency row.
+
+    Slotted instead of a dict, and every record of a transform shares one
+    transformed_at string, so retained snapshots cost a fraction of the
+    memory. Read access mirrors a dict (record['price_usd'], record.get())
+    for existing consumers; to_dict() produces the JSON format and is only
+    called when a response is serialized. Records may be shared between
+    snapshot versions and must not be mutated.
+    """
+
+    __slots__ = ('id', 'name', 'price_usd', 'market_cap_usd', 'volume_24h_usd',
+                 'change_24h_percent', 'transformed_at')
+    _fields = _attributes = __slots__
+
+    def __init__(self, id: str, name: str, price_usd: float, market_cap_usd=None,
+                 volume_24h_usd=None, change_24h_percent=None, transformed_at: str = None):
+        self.id = id
+        self.name = name
+        self.price_usd = price_usd
+        self.market_cap_usd = market_cap_usd
+        self.volume_24h_usd = volume_24h_usd
+        self.change_24h_percent = change_24h_percent
+        self.transformed_at = transformed_at
+
+
+class QuoteRecord(_Row):
+    """
+    One cryptocurrency row quoted in a currency other than USD.
+
+    Built like CryptoRecord; each currency has a subclass (see
+    quote_record_class) exposing the values under currency-suffixed names
+    such as price_eur, market_cap_eur and volume_24h_eur.
+    """
+
+    __slots__ = ('id', 'name', 'price', 'market_cap', 'volume_24h', 'change_24h_percent', 'transformed_at')
+    _attributes = __slots__
+
+    def __init__(self, id: str, name: str, price: float, market_cap=None,
+                 volume_24h=None, change_24h_percent=None, transformed_at: str = None):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.market_cap = market_cap
+        self.volume_24h = volume_24h
+        self.change_24h_percent = change_24h_percent
+        self.transformed_at = transformed_at
+
+
+_QUOTE_CLASSES = {'usd': CryptoRecord}
+
+
+def quote_record_class(currency: str) -> type:
+    """Row class for a quote currency; 'usd' returns CryptoRecord itself."""
+    cls = _QUOTE_CLASSES.get(currency)
+    if cls is None:
+        fields = ('id', 'name', f'price_{currency}', f'market_cap_{currency}',
+                  f'volume_24h_{currency}', 'change_24h_percent', 'transformed_at')
+        cls = _QUOTE_CLASSES[currency] = type(
+            f"QuoteRecord{currency.upper()}", (QuoteRecord,), {'__slots__': (), '_fields': fields}
+        )
+    return cls
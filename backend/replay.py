@@ -0,0 +1,262 @@
+"""Record raw upstream payloads to compressed NDJSON segments and replay them."""
+import glob
+import gzip
+import logging
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+from backend.fingerprint import PayloadFingerprinter
+from backend.providers import MarketDataProvider
+from backend.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PATTERN = 'segment-*.ndjson.gz'
+
+
+class SegmentRecorder:
+    """
+    Appends every fetched payload, with its timing, to gzip NDJSON segments.
+
+    One JSON line per fetch: recorded_at (epoch seconds), timestamp and
+    status from _metadata, the fetch timing and the raw payload. Each line
+    is sync-flushed, so a segment cut short by a crash is readable up to its
+    last complete record.
+    """
+
+    def __init__(self, directory: str, max_records: int = 500):
+        """
+        Initialize the recorder.
+
+        Args:
+            directory: Directory segments are written to
+            max_records: Records per segment before rotating to a new file
+        """
+        self.directory = directory
+        self.max_records = max(1, max_records)
+        self.record_count = 0
+        self.segment_count = 0
+        self.bytes_written = 0
+        self._file = None
+        self._path = None
+        self._segment_records = 0
+        self._lock = threading.Lock()
+
+    def _open_segment(self) -> None:
+        """Start a new segment file."""
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        self._path = os.path.join(self.directory, f"segment-{stamp}-{self.segment_count:04d}.ndjson.gz")
+        self._file = gzip.open(self._path, 'ab', compresslevel=6)
+        self._segment_records = 0
+        self.segment_count += 1
+
+    def record(self, raw_data: Dict, timing: Optional[Dict] = None) -> None:
+        """
+        Append one raw payload.
+
+        Args:
+            raw_data: Payload returned by fetch_market_data (with _metadata)
+            timing: Fetch timing to store alongside it
+        """
+        metadata = raw_data.get('_metadata', {})
+        line = dumps({
+            'recorded_at': time.time(),
+            'timestamp': metadata.get('timestamp'),
+            'status': metadata.get('status'),
+            'timing': timing,
+            'payload': {key: value for key, value in raw_data.items() if key != '_metadata'}
+        }) + b'\n'
+        with self._lock:
+            try:
+                if self._file is None or self._segment_records >= self.max_records:
+                    self._close_segment()
+                    self._open_segment()
+                self._file.write(line)
+                self._file.flush()
+                self._segment_records += 1
+                self.record_count += 1
+                self.bytes_written += len(line)
+            except OSError as e:
+                logger.error(f"Failed to record payload to {self._path}: {str(e)}")
+
+    def _close_segment(self) -> None:
+        """Finish the current segment, if any."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        """Close the open segment."""
+        with self._lock:
+            self._close_segment()
+
+    def get_status(self) -> Dict:
+        """Get recorder status for health reporting."""
+        return {
+            'directory': self.directory,
+            'current_segment': self._path,
+            'records': self.record_count,
+            'segments': self.segment_count,
+            'uncompressed_bytes': self.bytes_written
+        }
+
+
+def list_segments(directory: str) -> List[str]:
+    """Segment paths in recording order."""
+    return sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN)))
+
+
+def iter_records(paths: List[str]) -> Iterator[Dict]:
+    """
+    Stream records from segments one line at a time.
+
+    A truncated final record (e.g. after a crash) ends that segment.
+    """
+    for path in paths:
+        try:
+            with gzip.open(path, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        yield loads(line)
+        except (EOFError, OSError, zlib.error, ValueError) as e:
+            logger.warning(f"Stopped reading segment {path} early: {str(e)}")
+
+
+class ReplayIngester(MarketDataProvider):
+    """
+    Drop-in replacement for CoinGeckoIngester that replays recorded segments.
+
+    fetch_market_data() returns the next recorded payload, paced to the
+    recorded gaps divided by speed (speed <= 0 replays as fast as possible).
+    Payloads get fresh _metadata and fingerprints, so duplicate detection
+    and the rest of the pipeline behave as with live data. Segments are
+    streamed, never loaded whole.
+    """
+
+    name = 'replay'
+
+    def __init__(self, directory: str, speed: float = 1.0, loop: bool = False,
+                 idle_wait: float = 1.0):
+        """
+        Initialize the replay.
+
+        Args:
+            directory: Directory holding recorded segments
+            speed: Replay speed multiplier; 1 is real time, <= 0 is unpaced
+            loop: Restart from the first segment when the recording ends
+            idle_wait: Seconds each call waits once the recording is exhausted,
+                so an unpaced scheduler loop does not spin
+        """
+        self.directory = directory
+        self.speed = speed
+        self.loop = loop
+        self.idle_wait = idle_wait
+        self.finished = False
+        self.cryptos = []
+        self.error_count = 0
+        self.replayed_count = 0
+        self.last_fetch_time = None
+        self.last_fetch_timing = None
+        self.fingerprinter = PayloadFingerprinter()
+        self._records = None
+        self._origin = None
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+
+    def _next_record(self) -> Optional[Dict]:
+        """Next record in the recording, restarting when looping."""
+        for attempt in range(2):
+            if self._records is None:
+                self._records = iter_records(list_segments(self.directory))
+                self._origin = None
+            record = next(self._records, None)
+            if record is not None:
+                return record
+            if not self.loop or attempt:
+                return None
+            self._records = None
+        return None
+
+    def _wait_until_due(self, recorded_at: float) -> None:
+        """Sleep until the record's scaled offset from the first one."""
+        if self._origin is None:
+            self._origin = (time.monotonic(), recorded_at)
+            return
+        if self.speed <= 0:
+            return
+        started, first_recorded = self._origin
+        delay = started + (recorded_at - first_recorded) / self.speed - time.monotonic()
+        if delay > 0:
+            self._closed.wait(delay)
+
+    def fetch_market_data(self) -> Optional[Dict]:
+        """
+        Return the next recorded payload.
+
+        Returns:
+            Payload in the live ingester's format; once the recording is
+            exhausted, a payload holding only _metadata with status
+            'finished' (not a failure); None if replay was closed
+        """
+        with self._lock:
+            if self._closed.is_set():
+                return None
+            record = None if self.finished else self._next_record()
+            if record is None:
+                if not self.finished:
+                    self.finished = True
+                    logger.info(f"Replay of {self.directory} finished after {self.replayed_count} payloads")
+                self._closed.wait(self.idle_wait)
+                if self._closed.is_set():
+                    return None
+                return {'_metadata': {
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'source': 'CoinGecko (replay)',
+                    'status': 'finished'
+                }}
+            self._wait_until_due(record['recorded_at'])
+            if self._closed.is_set():
+                return None
+
+            data = record['payload']
+            fingerprint, coin_fingerprints, duplicate = self.fingerprinter.observe(data)
+            status = record.get('status') or 'success'
+            if duplicate and status != 'not_modified':
+                status = 'duplicate'
+            data['_metadata'] = {
+                'timestamp': record.get('timestamp') or datetime.utcnow().isoformat(),
+                'source': 'CoinGecko (replay)',
+                'status': status,
+                'fingerprint': fingerprint,
+                'coin_fingerprints': coin_fingerprints
+            }
+            self.cryptos = [key for key in data if key != '_metadata']
+            self.replayed_count += 1
+            self.last_fetch_time = datetime.utcnow()
+            self.last_fetch_timing = record.get('timing')
+            return data
+
+    def close(self) -> None:
+        """Stop replaying and wake any paced wait."""
+        self._closed.set()
+
+    def get_status(self) -> Dict:
+        """Get replay status for health reporting."""
+        return {
+            'mode': 'replay',
+            'directory': self.directory,
+            'speed': self.speed,
+            'loop': self.loop,
+            'replayed_payloads': self.replayed_count,
+            'finished': self.finished,
+            'monitored_cryptos': len(self.cryptos),
+            'last_fetch_time': self.last_fetch_time.isoformat() if self.last_fetch_time else None,
+            'last_fetch_timing': self.last_fetch_timing,
+            'fingerprints': self.fingerprinter.get_status(),
+            'error_count': self.error_count,
+            'status': 'healthy'
+        }
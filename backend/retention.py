@@ -0,0 +1,236 @@
+"""Tiered retention: incremental rollups of stored ticks and pruning of expired data."""
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Resolution of the raw ticks tier
+RAW = 0
+
+
+class RetentionPolicy:
+    """
+    Storage tiers from raw ticks to the coarsest rollup.
+
+    Each tier is (resolution seconds, retention seconds or None = forever);
+    raw ticks have resolution 0. Each rollup tier is built from the next
+    finer one.
+    """
+
+    def __init__(self, raw_retention: Optional[float], rollups: Iterable[Tuple[int, Optional[float]]]):
+        """
+        Initialize the policy.
+
+        Args:
+            raw_retention: Seconds raw ticks are kept (None keeps them forever)
+            rollups: (resolution seconds, retention seconds or None) per rollup tier
+        """
+        self.tiers = [(RAW, raw_retention)] + sorted((int(res), retention) for res, retention in rollups)
+        resolutions = [res for res, _ in self.tiers]
+        if len(set(resolutions)) != len(resolutions) or any(res <= 0 for res in resolutions[1:]):
+            raise ValueError("Rollup resolutions must be positive and distinct")
+        for (finer, _), (coarser, _) in zip(self.tiers[1:], self.tiers[2:]):
+            if coarser % finer:
+                raise ValueError(f"Rollup resolution {coarser}s is not a multiple of {finer}s")
+
+    @property
+    def rollups(self) -> List[Tuple[int, Optional[float]]]:
+        """Rollup tiers, finest first."""
+        return self.tiers[1:]
+
+    def plan(self, start: float, end: float, step: float, watermarks: Dict[int, float],
+             now: float) -> List[Tuple[int, float, float]]:
+        """
+        Split a query range into per-tier segments.
+
+        The coarsest tier no coarser than step serves the range up to its
+        watermark (the end of its rolled-up data); finer tiers serve what is
+        not rolled up yet, ending with raw ticks. A tier whose retention no
+        longer covers start hands over to the next coarser one.
+
+        Returns:
+            (resolution, segment start, segment end) tuples in time order
+        """
+        k = max(i for i, (res, _) in enumerate(self.tiers) if res <= step)
+        while k + 1 < len(self.tiers) and self.tiers[k][1] is not None and start < now - self.tiers[k][1]:
+            k += 1
+        segments = []
+        cursor = start
+        for res, _ in reversed(self.tiers[1:k + 1]):
+            watermark = watermarks.get(res)
+            if watermark is None:
+                continue
+            segment_end = min(end, watermark)
+            if segment_end > cursor:
+                segments.append((res, cursor, segment_end))
+                cursor = segment_end
+        if cursor < end:
+            segments.append((RAW, cursor, end))
+        return segments
+
+
+class Compactor:
+    """
+    Background job that rolls up and prunes a HistoryStore per a RetentionPolicy.
+
+    Rollups advance from a per-tier watermark in slice-sized transactions,
+    so writers are never blocked for long; only complete buckets are
+    rolled (raw ticks get settle seconds to arrive). Expired data is
+    deleted slice by slice, and never before the next coarser tier has
+    rolled it up.
+    """
+
+    def __init__(self, store, policy: RetentionPolicy, interval: float = 300.0,
+                 slice_seconds: float = 600.0, settle: float = 120.0):
+        """
+        Initialize the compactor.
+
+        Args:
+            store: HistoryStore to compact
+            policy: Tiers and retention periods
+            interval: Seconds between compaction runs
+            slice_seconds: Time range handled per transaction
+            settle: Seconds raw ticks may arrive late before their bucket is rolled up
+        """
+        self.store = store
+        self.policy = policy
+        self.interval = interval
+        self.slice_seconds = slice_seconds
+        self.settle = settle
+
+        self.run_count = 0
+        self.rolled_rows = 0
+        self.pruned_rows = 0
+        self.last_run_time = None
+        self.last_run_duration = None
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """
+        Start the background compaction loop.
+
+        Returns:
+            True if a new thread was started, False if already running
+        """
+        with self._lock:
+            if self.is_running:
+                return False
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='history-compactor', daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Signal the loop to exit and wait for the current slice to finish."""
+        with self._lock:
+            thread = self._thread
+            self._stop_event.set()
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        """Loop body: compact, then sleep until the next run or stop."""
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"History compaction failed: {str(e)}")
+            self._stop_event.wait(self.interval)
+
+    def _slice(self, resolution: int) -> float:
+        """Slice length for a tier: a whole number of its buckets."""
+        return max(1, int(self.slice_seconds // resolution)) * resolution
+
+    def run_once(self, now: Optional[float] = None) -> Dict:
+        """
+        Roll up every tier as far as complete buckets allow, then prune expired data.
+
+        Args:
+            now: Current epoch seconds (defaults to the wall clock)
+
+        Returns:
+            Dictionary with rows 'rolled' and 'pruned' per resolution
+        """
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        rolled = {}
+        pruned = {}
+        watermarks = self.store.watermarks()
+
+        source_limit = now - self.settle
+        source = RAW
+        for res, _ in self.policy.rollups:
+            until = math.floor(source_limit / res) * res
+            watermark = watermarks.get(res)
+            if watermark is None:
+                earliest = self.store.earliest(source)
+                watermark = math.floor(earliest / res) * res if earliest is not None else until
+            rolled[res] = 0
+            while watermark < until and not self._stop_event.is_set():
+                slice_end = min(until, watermark + self._slice(res))
+                rolled[res] += self.store.rollup(res, source, watermark, slice_end)
+                watermark = slice_end
+            watermarks[res] = watermark
+            source, source_limit = res, watermark
+
+        next_tiers = [res for res, _ in self.policy.rollups] + [None]
+        for (res, retention), next_res in zip(self.policy.tiers, next_tiers):
+            if retention is None:
+                continue
+            cutoff = now - retention
+            if next_res is not None:
+                # Keep data the next tier has not rolled up yet
+                cutoff = min(cutoff, watermarks.get(next_res, -math.inf))
+            pruned[res] = self._prune(res, cutoff)
+
+        self.rolled_rows += sum(rolled.values())
+        self.pruned_rows += sum(pruned.values())
+        self.run_count += 1
+        self.last_run_time = datetime.utcnow()
+        self.last_run_duration = time.perf_counter() - started
+        if any(rolled.values()) or any(pruned.values()):
+            logger.info(f"History compaction rolled {rolled} and pruned {pruned} rows "
+                        f"in {self.last_run_duration * 1000:.0f} ms")
+        return {'rolled': rolled, 'pruned': pruned}
+
+    def _prune(self, resolution: int, cutoff: float) -> int:
+        """Delete one tier's data older than cutoff, one slice per transaction."""
+        earliest = self.store.earliest(resolution)
+        if earliest is None or not earliest < cutoff:
+            return 0
+        deleted = 0
+        step = self._slice(resolution) if resolution else self.slice_seconds
+        slice_start = earliest
+        while slice_start < cutoff and not self._stop_event.is_set():
+            slice_end = min(cutoff, slice_start + step)
+            deleted += self.store.prune(resolution, slice_start, slice_end)
+            slice_start = slice_end
+        return deleted
+
+    def get_status(self) -> Dict:
+        """Get compaction status for health reporting."""
+        return {
+            'running': self.is_running,
+            'interval_seconds': self.interval,
+            'tiers': [
+                {'resolution_seconds': res, 'retention_seconds': retention}
+                for res, retention in self.policy.tiers
+            ],
+            'run_count': self.run_count,
+            'rolled_rows': self.rolled_rows,
+            'pruned_rows': self.pruned_rows,
+            'last_run_time': self.last_run_time.isoformat() if self.last_run_time else None,
+            'last_run_duration': self.last_run_duration
+        }
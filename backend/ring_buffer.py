@@ -0,0 +1,156 @@
+"""Compact columnar ring buffers of recent ticks per cryptocurrency."""
+import math
+import threading
+from array import array
+from typing import Dict, Iterable, Optional, Sequence
+
+FIELDS = ('price_usd', 'volume_24h_usd', 'market_cap_usd')
+
+NAN = float('nan')
+
+
+def column_stats(column: Iterable[float]) -> Dict:
+    """Mean, standard deviation, min and max of a column of samples, ignoring NaN."""
+    values = [v for v in column if not math.isnan(v)]
+    if not values:
+        return {'count': 0, 'mean': None, 'stdev': None, 'min': None, 'max': None}
+    mean = math.fsum(values) / len(values)
+    variance = math.fsum((v - mean) ** 2 for v in values) / len(values)
+    return {
+        'count': len(values),
+        'mean': mean,
+        'stdev': math.sqrt(variance),
+        'min': min(values),
+        'max': max(values)
+    }
+
+
+class TickRingBuffer:
+    """
+    Fixed-capacity columnar ring buffer of float samples.
+
+    Each column is an array('d') of twice the capacity and every value is
+    written to both halves, so the last n samples are always contiguous and
+    can be returned as a memoryview slice without copying. Readers that need
+    several columns of the same samples use window_columns(), which copies
+    them under the append lock so they line up.
+    """
+
+    def __init__(self, capacity: int, fields: Iterable[str] = FIELDS):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Maximum number of samples retained
+            fields: Column names stored alongside the timestamp
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.fields = ('timestamp',) + tuple(fields)
+        self._columns = {name: array('d', [NAN]) * (2 * capacity) for name in self.fields}
+        self._pos = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of samples currently held."""
+        return self._size
+
+    def append(self, timestamp: float, *values: Optional[float]) -> None:
+        """Append one sample in O(1); None values are stored as NaN."""
+        with self._lock:
+            pos = self._pos
+            mirror = pos + self.capacity
+            column = self._columns['timestamp']
+            column[pos] = column[mirror] = timestamp
+            for name, value in zip(self.fields[1:], values):
+                column = self._columns[name]
+                column[pos] = column[mirror] = NAN if value is None else value
+            self._pos = (pos + 1) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+
+    def window(self, field: str, n: Optional[int] = None) -> memoryview:
+        """
+        Return a read-only zero-copy view of the last n samples, oldest first.
+
+        Args:
+            field: Column name
+            n: Number of samples (defaults to all held samples)
+        """
+        n = self._size if n is None else max(0, min(n, self._size))
+        end = self._pos + self.capacity
+        return memoryview(self._columns[field])[end - n:end].toreadonly()
+
+    def window_columns(self, fields: Sequence[str], n: Optional[int] = None) -> Dict[str, array]:
+        """
+        Copy the last n samples of several columns as one consistent read, oldest first.
+
+        The position and size are read once under the append lock, so every
+        returned column covers the same samples.
+
+        Args:
+            fields: Column names
+            n: Number of samples (defaults to all held samples)
+
+        Returns:
+            Dictionary of column name to array('d') copies of equal length
+        """
+        with self._lock:
+            n = self._size if n is None else max(0, min(n, self._size))
+            end = self._pos + self.capacity
+            return {name: self._columns[name][end - n:end] for name in fields}
+
+    def rolling_stats(self, field: str, n: Optional[int] = None) -> Dict:
+        """Mean, standard deviation, min and max of the last n samples, ignoring NaN."""
+        return column_stats(self.window(field, n))
+
+    def memory_usage(self) -> int:
+        """Bytes held by the column arrays."""
+        return sum(column.buffer_info()[1] * column.itemsize for column in self._columns.values())
+
+
+class RecentTicks:
+    """Per-crypto TickRingBuffers fed from transformed snapshots."""
+
+    def __init__(self, capacity: int):
+        """
+        Initialize the collection.
+
+        Args:
+            capacity: Samples retained per crypto
+        """
+        self.capacity = capacity
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def ingest(self, snapshot: Dict, timestamp: float) -> None:
+        """Append every crypto record of a transformed snapshot."""
+        for crypto in snapshot.get('cryptos', []):
+            buffer = self._buffers.get(crypto['id'])
+            if buffer is None:
+                with self._lock:
+                    buffer = self._buffers.setdefault(crypto['id'], TickRingBuffer(self.capacity))
+            buffer.append(
+                timestamp,
+                crypto.get('price_usd'),
+                crypto.get('volume_24h_usd'),
+                crypto.get('market_cap_usd')
+            )
+
+    def get(self, crypto_id: str) -> Optional[TickRingBuffer]:
+        """Return the buffer for a crypto, or None if never seen."""
+        return self._buffers.get(crypto_id)
+
+    def memory_usage(self) -> int:
+        """Total bytes held by all buffers."""
+        return sum(buffer.memory_usage() for buffer in list(self._buffers.values()))
+
+    def get_status(self) -> Dict:
+        """Get buffer status for health reporting."""
+        return {
+            'tracked_cryptos': len(self._buffers),
+            'capacity': self.capacity,
+            'memory_bytes': self.memory_usage()
+        }
@@ -0,0 +1,256 @@
+"""Background ingestion scheduler for periodic fetch and transform cycles."""
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Poll interval growth per unchanged upstream response in adaptive mode
+UNCHANGED_BACKOFF_FACTOR = 1.5
+
+
+class IngestionScheduler:
+    """
+    Runs the fetch -> transform pipeline in a daemon thread.
+
+    With min_interval set, polling is adaptive: it runs as often as
+    min_interval and the rate limiter's budget allow while upstream keeps
+    changing, and stretches towards interval while it reports no change.
+    After a failed cycle the next one waits an exponentially growing,
+    jittered delay; an optional circuit breaker stops cycles entirely
+    after repeated failures, and a Retry-After deadline always wins.
+    """
+
+    def __init__(self, ingester, transformer, publish: Callable[[Dict], None],
+                 interval: float, on_error: Optional[Callable[[], None]] = None,
+                 on_unchanged: Optional[Callable[[], None]] = None,
+                 min_interval: Optional[float] = None, max_backoff: Optional[float] = None,
+                 rate_limiter=None, calls_per_cycle: int = 1,
+                 retry_after: Optional[Callable[[], float]] = None, breaker=None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            ingester: Object exposing fetch_market_data()
+            transformer: Object exposing transform_market_data(raw_data)
+            publish: Callback receiving each new transformed snapshot
+            interval: Seconds between the start of consecutive cycles (the
+                longest poll interval in adaptive mode)
+            on_error: Optional callback invoked when a cycle fails
+            on_unchanged: Optional callback invoked when upstream reports no change
+            min_interval: Shortest poll interval; None polls every interval seconds
+            max_backoff: Longest delay after failures (defaults to 10 x interval)
+            rate_limiter: Optional TokenBucket whose budget bounds the poll rate
+            calls_per_cycle: Upstream requests made by one cycle
+            retry_after: Optional callable returning seconds upstream asked us to wait
+            breaker: Optional CircuitBreaker consulted before each cycle
+        """
+        self.ingester = ingester
+        self.transformer = transformer
+        self.publish = publish
+        self.interval = float(interval)
+        self.on_error = on_error
+        self.on_unchanged = on_unchanged
+        self.min_interval = min_interval
+        self.max_backoff = float(max_backoff if max_backoff is not None else self.interval * 10)
+        self.rate_limiter = rate_limiter
+        self.calls_per_cycle = max(1, calls_per_cycle)
+        self.retry_after = retry_after
+        self.breaker = breaker
+
+        self.run_count = 0
+        self.failure_count = 0
+        self.unchanged_count = 0
+        self.consecutive_failures = 0
+        self.last_run_time = None
+        self.last_run_duration = None
+        self.last_outcome = None
+        self.next_run_time = None
+        self.next_run_reason = None
+        self.poll_interval = self._min_poll_interval()
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """
+        Start the background ingestion loop.
+
+        Returns:
+            True if a new thread was started, False if already running
+        """
+        with self._lock:
+            if self.is_running:
+                return False
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='ingestion-scheduler', daemon=True
+            )
+            self._thread.start()
+        if self.min_interval is None:
+            logger.info(f"Ingestion scheduler started (every {self.interval}s)")
+        else:
+            logger.info(f"Ingestion scheduler started (adaptive, {self.poll_interval}s to {self.interval}s)")
+        return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Signal the loop to exit and wait for the current cycle to finish."""
+        with self._lock:
+            thread = self._thread
+            self._stop_event.set()
+        if thread is not None:
+            thread.join(timeout)
+        self.next_run_time = None
+        self.next_run_reason = None
+        logger.info("Ingestion scheduler stopped")
+
+    def run_once(self) -> Optional[Dict]:
+        """
+        Execute a single fetch -> transform -> publish cycle.
+
+        Returns:
+            The published snapshot, or None if the cycle failed, upstream
+            data was unchanged or the source is finished; last_outcome tells which
+        """
+        started = time.perf_counter()
+        self.last_outcome = 'failed'
+        try:
+            raw_data = self.ingester.fetch_market_data()
+            if not raw_data:
+                self._record_failure("Failed to fetch market data")
+                return None
+
+            status = raw_data.get('_metadata', {}).get('status')
+            # Source has nothing more to give (a replay ran out): not a failure
+            if status == 'finished':
+                self.last_outcome = 'finished'
+                return None
+
+            # Conditional GET hit or identical content: nothing to transform or publish
+            if status in ('not_modified', 'duplicate'):
+                self.unchanged_count += 1
+                self.last_outcome = 'unchanged'
+                # Still a duplicate snapshot as far as the quality checks are concerned
+                self.transformer.record_unchanged_payload()
+                if self.on_unchanged:
+                    self.on_unchanged()
+                return None
+
+            transformed = self.transformer.transform_market_data(raw_data)
+            self.publish(transformed)
+            self.run_count += 1
+            self.last_outcome = 'published'
+            return transformed
+        except Exception as e:
+            self._record_failure(f"Error in ingestion cycle: {str(e)}")
+            return None
+        finally:
+            self.last_run_time = datetime.utcnow()
+            self.last_run_duration = time.perf_counter() - started
+
+    def _record_failure(self, message: str) -> None:
+        """Count a failed cycle and notify the error callback."""
+        self.failure_count += 1
+        logger.error(message)
+        if self.on_error:
+            self.on_error()
+
+    def _run(self) -> None:
+        """Loop body: run a cycle unless the breaker is open, then sleep until the next slot or stop."""
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            if self.breaker is not None and not self.breaker.allow():
+                outcome = 'skipped'
+            else:
+                self.run_once()
+                outcome = self.last_outcome
+                if outcome == 'finished':
+                    logger.info("Ingestion source finished; scheduler stopping")
+                    self.next_run_time = None
+                    self.next_run_reason = 'finished'
+                    break
+                if self.breaker is not None:
+                    if outcome == 'failed':
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+            delay, reason = self.next_delay(outcome, time.monotonic() - started)
+            self.next_run_time = datetime.utcnow() + timedelta(seconds=delay)
+            self.next_run_reason = reason
+            self._stop_event.wait(delay)
+
+    def _min_poll_interval(self) -> float:
+        """Shortest poll interval allowed by min_interval and the request budget."""
+        if self.min_interval is None:
+            return self.interval
+        budget = self.calls_per_cycle / self.rate_limiter.rate if self.rate_limiter is not None else 0.0
+        return min(self.interval, max(float(self.min_interval), budget))
+
+    def backoff_delay(self) -> float:
+        """Exponential backoff with equal jitter after consecutive failures."""
+        ceiling = min(self.max_backoff, self.poll_interval * 2 ** (self.consecutive_failures - 1))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def next_delay(self, outcome: str, elapsed: float) -> Tuple[float, str]:
+        """
+        Decide how long to wait before the next cycle.
+
+        Args:
+            outcome: 'published', 'unchanged', 'failed' or 'skipped' (breaker open)
+            elapsed: Seconds the cycle took
+
+        Returns:
+            Tuple of (delay seconds, reason) where reason names the constraint
+            that set the delay: 'schedule', 'backoff', 'circuit_open',
+            'retry_after' or 'rate_budget'
+        """
+        if outcome == 'failed':
+            self.consecutive_failures += 1
+        elif outcome != 'skipped':
+            self.consecutive_failures = 0
+        if self.min_interval is not None:
+            # Poll fast while data changes, slow down while upstream repeats itself
+            if outcome == 'published':
+                self.poll_interval = self._min_poll_interval()
+            elif outcome == 'unchanged':
+                self.poll_interval = min(self.interval, self.poll_interval * UNCHANGED_BACKOFF_FACTOR)
+
+        candidates = [(self.poll_interval - elapsed, 'schedule')]
+        if self.consecutive_failures:
+            candidates.append((self.backoff_delay() - elapsed, 'backoff'))
+        if self.breaker is not None:
+            candidates.append((self.breaker.retry_in(), 'circuit_open'))
+        if self.retry_after is not None:
+            candidates.append((self.retry_after(), 'retry_after'))
+        if self.rate_limiter is not None:
+            candidates.append((self.rate_limiter.wait_time(self.calls_per_cycle), 'rate_budget'))
+        delay, reason = max(candidates, key=lambda candidate: candidate[0])
+        return max(0.0, delay), reason
+
+    def get_status(self) -> Dict:
+        """Get scheduler status for health reporting."""
+        return {
+            'running': self.is_running,
+            'interval_seconds': self.interval,
+            'adaptive': self.min_interval is not None,
+            'poll_interval_seconds': round(self.poll_interval, 2),
+            'run_count': self.run_count,
+            'failure_count': self.failure_count,
+            'unchanged_count': self.unchanged_count,
+            'consecutive_failures': self.consecutive_failures,
+            'last_outcome': self.last_outcome,
+            'last_run_time': self.last_run_time.isoformat() if self.last_run_time else None,
+            'last_run_duration': self.last_run_duration,
+            'next_run_time': self.next_run_time.isoformat() if self.next_run_time else None,
+            'next_run_reason': self.next_run_reason,
+            'circuit_breaker': self.breaker.get_status() if self.breaker is not None else None
+        }
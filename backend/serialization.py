@@ -0,0 +1,159 @@
+"""Serialize-once JSON response bodies with pre-compressed variants."""
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli variants are only offered when installed
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+
+def _default(obj):
+    """Convert in-memory record types (e.g. CryptoRecord) to their JSON form."""
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+
+def dumps(obj) -> bytes:
+    """Encode obj as compact JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def loads(data: bytes):
+    """Decode JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class EncodedBody:
+    """A JSON body serialized once, with gzip/brotli variants computed up front."""
+
+    def __init__(self, raw: bytes, compress: bool = True):
+        """
+        Initialize the body.
+
+        Args:
+            raw: Serialized JSON bytes
+            compress: Whether to precompute compressed variants
+        """
+        self.variants = {'identity': raw}
+        if compress and len(raw) >= MIN_COMPRESS_SIZE:
+            self.variants['gzip'] = gzip.compress(raw, compresslevel=6)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(raw, quality=5)
+
+    @classmethod
+    def from_variants(cls, variants: Dict[str, bytes]) -> 'EncodedBody':
+        """Wrap already-encoded variants (e.g. read from another process)."""
+        body = cls.__new__(cls)
+        body.variants = dict(variants)
+        return body
+
+    @property
+    def raw(self) -> bytes:
+        """Uncompressed JSON bytes."""
+        return self.variants['identity']
+
+    def negotiate(self, accept_encodings) -> str:
+        """Pick the best available encoding for an Accept-Encoding header."""
+        offered = [name for name in ('br', 'gzip') if name in self.variants]
+        if not offered or accept_encodings is None:
+            return 'identity'
+        return accept_encodings.best_match(offered) or 'identity'
+
+
+class ResponseCache:
+    """Small LRU of EncodedBody objects keyed by endpoint and snapshot version."""
+
+    def __init__(self, max_entries: int = 64, compress: bool = True, metrics=None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum bodies retained
+            compress: Whether bodies get compressed variants
+            metrics: Optional MetricsRegistry for hit/miss counts and serialization latency
+        """
+        self.max_entries = max_entries
+        self.compress = compress
+        self.metrics = metrics
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], object]) -> EncodedBody:
+        """
+        Return the cached body for key, serializing build() on a miss.
+
+        Args:
+            key: Cache key; include the snapshot version so bodies expire naturally
+            build: Callable returning the JSON-serializable payload
+        """
+        metrics = self.metrics
+        endpoint = str(key[0] if isinstance(key, tuple) else key)
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if metrics:
+            metrics.inc('response_cache_requests_total', endpoint=endpoint, result='hit' if body is not None else 'miss')
+        if body is not None:
+            return body
+
+        started = time.perf_counter()
+        body = EncodedBody(dumps(build()), compress=self.compress)
+        if metrics:
+            metrics.observe('serialize_seconds', time.perf_counter() - started, endpoint=endpoint)
+        self.put(key, body)
+        return body
+
+    def put(self, key: Hashable, body: EncodedBody) -> None:
+        """Store a body built elsewhere."""
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_status(self) -> Dict:
+        """Get cache statistics for health reporting."""
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'encoder': 'orjson' if orjson is not None else 'json',
+            'brotli': brotli is not None
+        }
+
+
+def etag_variants(etag: str) -> Dict[str, str]:
+    """Per-encoding strong ETags derived from a base ETag."""
+    return {
+        'identity': etag,
+        'gzip': f"{etag}-gzip",
+        'br': f"{etag}-br"
+    }
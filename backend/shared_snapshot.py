@@ -0,0 +1,353 @@
+"""Cross-process sharing of serialized snapshots through a memory-mapped file."""
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # leader election needs POSIX file locks
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SNAPSHM2'
+# magic, sequence (odd while a write is in progress), active slot, version,
+# error count, update count, publish time
+HEADER = struct.Struct('<8sQQQQQd')
+# per slot: identity length, gzip length, quotes length
+SLOT_HEADER = struct.Struct('<QQQ')
+DATA_OFFSET = mmap.PAGESIZE
+# Encoded /api/data bodies, then the JSON of the non-USD quote rows
+SECTIONS = ('identity', 'gzip', 'quotes')
+
+
+class SharedBody:
+    """One published snapshot body as seen by a reader."""
+
+    __slots__ = ('sequence', 'version', 'error_count', 'update_count', 'published_at', 'variants')
+
+    def __init__(self, sequence: int, version: int, error_count: int, update_count: int,
+                 published_at: float, variants: Dict[str, memoryview]):
+        self.sequence = sequence
+        self.version = version
+        self.error_count = error_count
+        self.update_count = update_count
+        self.published_at = published_at
+        self.variants = variants
+
+
+class SharedSnapshotFile:
+    """
+    Double-buffered snapshot region in a memory-mapped file.
+
+    The writer fills the inactive slot, then flips the active slot inside a
+    sequence-locked header update; readers retry while the sequence is odd
+    or changes under them. Readers get memoryviews straight into the
+    mapping. A slot is only rewritten two publishes later, so a body stays
+    intact for a full publish interval after it is replaced.
+    """
+
+    def __init__(self, path: str, slot_capacity: int = 64 * 1024 * 1024):
+        """
+        Initialize the region.
+
+        Args:
+            path: File backing the mapping (ideally on tmpfs, e.g. /dev/shm)
+            slot_capacity: Maximum bytes of one published body (all sections)
+        """
+        self.path = path
+        self.slot_capacity = slot_capacity
+        self._mm = None
+        self._fd = None
+        self._last = None
+
+    @property
+    def size(self) -> int:
+        """Total mapped size."""
+        return DATA_OFFSET + 2 * self.slot_capacity
+
+    def open(self, create: bool = False) -> bool:
+        """
+        Map the file; returns False if it does not exist yet and create is False.
+
+        The writer opens with create=True, initializing the header once and
+        keeping the sequence of a previous leader.
+        """
+        if self._mm is not None:
+            return True
+        if not create and not os.path.exists(self.path):
+            return False
+        directory = os.path.dirname(self.path)
+        if create and directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | (os.O_CREAT if create else 0), 0o644)
+        size = os.fstat(fd).st_size
+        if size < self.size:
+            if not create:
+                os.close(fd)
+                return False
+            os.ftruncate(fd, self.size)
+        self._fd = fd
+        self._mm = mmap.mmap(fd, self.size)
+        if create and self._mm[:len(MAGIC)] != MAGIC:
+            HEADER.pack_into(self._mm, 0, MAGIC, 0, 0, 0, 0, 0, 0.0)
+        return True
+
+    def close(self) -> None:
+        """Unmap the file."""
+        if self._mm is not None:
+            self._last = None
+            try:
+                self._mm.close()
+            except BufferError:
+                # a reader still holds a view; the mapping is freed with it
+                pass
+            os.close(self._fd)
+            self._mm = None
+            self._fd = None
+
+    def _slot_offset(self, slot: int) -> int:
+        return DATA_OFFSET + slot * self.slot_capacity
+
+    def write(self, version: int, variants: Dict[str, bytes], error_count: int = 0,
+              update_count: int = 0) -> bool:
+        """
+        Publish a body; returns False if it does not fit in a slot.
+
+        Args:
+            version: Snapshot version
+            variants: Encoded bodies keyed by encoding ('identity', optional 'gzip'),
+                plus optional 'quotes' bytes
+            error_count: Error counter of the published snapshot
+            update_count: Update counter of the published snapshot
+        """
+        self.open(create=True)
+        mm = self._mm
+        lengths = [len(variants.get(name, b'')) for name in SECTIONS]
+        if sum(lengths) > self.slot_capacity:
+            logger.error(f"Snapshot body of {sum(lengths)} bytes exceeds shared slot of {self.slot_capacity}")
+            return False
+
+        _, sequence, active, *_ = HEADER.unpack_from(mm, 0)
+        slot = 1 - active
+        offset = self._slot_offset(slot)
+        for name, length in zip(SECTIONS, lengths):
+            if length:
+                mm[offset:offset + length] = variants[name]
+            offset += length
+
+        # Odd sequence marks the header as being updated
+        struct.pack_into('<Q', mm, len(MAGIC), sequence + 1)
+        SLOT_HEADER.pack_into(mm, HEADER.size + slot * SLOT_HEADER.size, *lengths)
+        HEADER.pack_into(mm, 0, MAGIC, sequence + 1, slot, version, error_count, update_count, time.time())
+        struct.pack_into('<Q', mm, len(MAGIC), sequence + 2)
+        return True
+
+    def sequence(self) -> Optional[int]:
+        """Current sequence number, or None if nothing can be read yet."""
+        if not self.open():
+            return None
+        return struct.unpack_from('<Q', self._mm, len(MAGIC))[0]
+
+    def read(self) -> Optional[SharedBody]:
+        """Latest published body as zero-copy views, or None before the first publish."""
+        if not self.open():
+            return None
+        mm = self._mm
+        for _ in range(1000):
+            magic, sequence, slot, version, error_count, update_count, published_at = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or sequence == 0:
+                return None
+            if sequence % 2:
+                continue
+            if self._last is not None and self._last.sequence == sequence:
+                return self._last
+            lengths = SLOT_HEADER.unpack_from(mm, HEADER.size + slot * SLOT_HEADER.size)
+            if struct.unpack_from('<Q', mm, len(MAGIC))[0] != sequence:
+                continue
+            view = memoryview(mm)
+            offset = self._slot_offset(slot)
+            variants = {}
+            for name, length in zip(SECTIONS, lengths):
+                if length:
+                    variants[name] = view[offset:offset + length]
+                offset += length
+            self._last = SharedBody(sequence, version, error_count, update_count, published_at, variants)
+            return self._last
+        logger.warning("Gave up reading shared snapshot: header kept changing")
+        return None
+
+
+class LeaderLock:
+    """Non-blocking exclusive file lock electing one ingesting process."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the lock.
+
+        Args:
+            path: Lock file path
+        """
+        self.path = path
+        self._fd = None
+
+    @property
+    def held(self) -> bool:
+        """Whether this process holds the lock."""
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Take the lock if no other process holds it."""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            # Without POSIX locks every process leads, as before
+            self._fd = -1
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Release the lock."""
+        if self._fd is not None and self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+
+class SharedSnapshotSync:
+    """
+    Leader/follower coordination for multi-worker deployments.
+
+    Every worker runs a watcher thread. The worker holding the leader lock
+    ingests and publishes into the shared file; the others never call
+    upstream and instead poll the file's sequence number every
+    poll_interval seconds, handing each new body to on_snapshot. Followers
+    retry the lock periodically, so another worker takes over if the
+    leader exits.
+    """
+
+    def __init__(self, path: str, on_leader: Callable[[], None],
+                 on_snapshot: Callable[[SharedBody], None], slot_capacity: int = 64 * 1024 * 1024,
+                 poll_interval: float = 0.01, lock_retry_interval: float = 1.0):
+        """
+        Initialize the coordinator.
+
+        Args:
+            path: Shared snapshot file; the lock file is path + '.lock'
+            on_leader: Called once when this process becomes leader
+            on_snapshot: Called in followers with each newly published body
+            slot_capacity: Maximum bytes of one published body
+            poll_interval: Seconds between follower sequence checks
+            lock_retry_interval: Seconds between follower attempts to take over
+        """
+        self.shared = SharedSnapshotFile(path, slot_capacity)
+        self.lock = LeaderLock(path + '.lock')
+        self.on_leader = on_leader
+        self.on_snapshot = on_snapshot
+        self.poll_interval = poll_interval
+        self.lock_retry_interval = lock_retry_interval
+        self.published_count = 0
+        self.received_count = 0
+        self.last_sequence = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this process ingests and publishes."""
+        return self.lock.held
+
+    @property
+    def is_follower(self) -> bool:
+        """Whether this process mirrors the leader's snapshots."""
+        return self._thread is not None and not self.lock.held
+
+    def start(self) -> None:
+        """Elect a role and start the watcher thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        if self.lock.try_acquire():
+            self._become_leader()
+        self._thread = threading.Thread(target=self._run, name='shared-snapshot', daemon=True)
+        self._thread.start()
+
+    def _become_leader(self) -> None:
+        """Start publishing; the shared file is created if needed."""
+        logger.info(f"Process {os.getpid()} is the ingestion leader")
+        self.shared.open(create=True)
+        self.on_leader()
+
+    def _run(self) -> None:
+        """Follower loop: pick up new bodies and retry leadership."""
+        next_lock_attempt = time.monotonic() + self.lock_retry_interval
+        while not self._stop_event.is_set():
+            if self.lock.held:
+                self._stop_event.wait(self.lock_retry_interval)
+                continue
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Failed to read shared snapshot: {str(e)}")
+            if time.monotonic() >= next_lock_attempt:
+                next_lock_attempt = time.monotonic() + self.lock_retry_interval
+                if self.lock.try_acquire():
+                    self._become_leader()
+                    continue
+            self._stop_event.wait(self.poll_interval)
+
+    def poll(self) -> bool:
+        """Deliver the latest body to on_snapshot if it is new; returns True if delivered."""
+        sequence = self.shared.sequence()
+        if sequence is None or sequence == self.last_sequence:
+            return False
+        body = self.shared.read()
+        if body is None:
+            return False
+        self.last_sequence = body.sequence
+        self.received_count += 1
+        self.on_snapshot(body)
+        return True
+
+    def publish(self, version: int, variants: Dict[str, bytes], error_count: int = 0,
+                update_count: int = 0) -> bool:
+        """Publish a body if this process is the leader."""
+        if not self.lock.held:
+            return False
+        written = self.shared.write(version, variants, error_count, update_count)
+        self.published_count += written
+        return written
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the watcher and give up leadership."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.lock.release()
+        self.shared.close()
+
+    def get_status(self) -> Dict:
+        """Get coordination status for health reporting."""
+        return {
+            'role': 'leader' if self.is_leader else ('follower' if self.is_follower else 'stopped'),
+            'pid': os.getpid(),
+            'path': self.shared.path,
+            'published': self.published_count,
+            'received': self.received_count,
+            'sequence': self.shared.sequence()
+        }
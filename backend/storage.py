@@ -0,0 +1,542 @@
+"""Persistent SQLite time-series store for transformed market snapshots."""
+import logging
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticks (
+    crypto_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    price_usd REAL,
+    market_cap_usd REAL,
+    volume_24h_usd REAL,
+    change_24h_percent REAL
+);
+CREATE INDEX IF NOT EXISTS idx_ticks_crypto_time ON ticks (crypto_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_ticks_time ON ticks (timestamp);
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution INTEGER NOT NULL,
+    crypto_id TEXT NOT NULL,
+    bucket REAL NOT NULL,
+    price_sum REAL,
+    price_count INTEGER,
+    price_min REAL,
+    price_max REAL,
+    market_cap_sum REAL,
+    market_cap_count INTEGER,
+    volume_sum REAL,
+    volume_count INTEGER,
+    change_sum REAL,
+    change_count INTEGER,
+    samples INTEGER,
+    PRIMARY KEY (resolution, crypto_id, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_rollups_time ON rollups (resolution, bucket);
+CREATE TABLE IF NOT EXISTS compaction_state (
+    resolution INTEGER PRIMARY KEY,
+    rolled_until REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candles (
+    crypto_id TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start REAL NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    volume REAL,
+    ticks INTEGER,
+    PRIMARY KEY (crypto_id, interval, start)
+) WITHOUT ROWID;
+"""
+
+INSERT_SQL = (
+    "INSERT INTO ticks (crypto_id, timestamp, price_usd, market_cap_usd, "
+    "volume_24h_usd, change_24h_percent) VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+CANDLE_UPSERT_SQL = (
+    "INSERT OR REPLACE INTO candles (crypto_id, interval, start, open, high, low, close, "
+    "volume, ticks) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+CANDLES_SQL = """
+SELECT start, open, high, low, close, volume, ticks
+FROM candles
+WHERE crypto_id = :crypto_id AND interval = :interval AND start < :before
+ORDER BY start DESC
+LIMIT :limit
+"""
+
+# Export order follows an index so rows stream without a full sort:
+# idx_ticks_crypto_time for selected ids, idx_ticks_time for all coins
+EXPORT_SQL = """
+SELECT crypto_id, timestamp, price_usd, market_cap_usd, volume_24h_usd, change_24h_percent
+FROM ticks
+WHERE timestamp >= ? AND timestamp < ?{id_filter}
+ORDER BY {order}
+"""
+
+
+def export_sql(ids: Optional[List[str]] = None) -> str:
+    """EXPORT_SQL for a time range, optionally restricted to ids (one placeholder each)."""
+    return EXPORT_SQL.format(
+        id_filter=f" AND crypto_id IN ({', '.join('?' * len(ids))})" if ids else '',
+        order='crypto_id, timestamp' if ids else 'timestamp, crypto_id'
+    )
+
+# Range queries return sums and counts so buckets from different tiers can be merged
+RANGE_SQL = """
+SELECT CAST(timestamp / :step AS INTEGER) * :step AS bucket,
+       SUM(price_usd), COUNT(price_usd), MIN(price_usd), MAX(price_usd),
+       SUM(market_cap_usd), COUNT(market_cap_usd), SUM(volume_24h_usd), COUNT(volume_24h_usd),
+       SUM(change_24h_percent), COUNT(change_24h_percent), COUNT(*)
+FROM ticks
+WHERE crypto_id = :crypto_id AND timestamp >= :start AND timestamp < :end
+GROUP BY 1
+ORDER BY 1
+"""
+
+ROLLUP_RANGE_SQL = """
+SELECT CAST(bucket / :step AS INTEGER) * :step AS step_bucket,
+       SUM(price_sum), SUM(price_count), MIN(price_min), MAX(price_max),
+       SUM(market_cap_sum), SUM(market_cap_count), SUM(volume_sum), SUM(volume_count),
+       SUM(change_sum), SUM(change_count), SUM(samples)
+FROM rollups
+WHERE resolution = :resolution AND crypto_id = :crypto_id AND bucket >= :start AND bucket < :end
+GROUP BY 1
+ORDER BY 1
+"""
+
+ROLLUP_FROM_TICKS_SQL = """
+INSERT OR REPLACE INTO rollups
+SELECT :resolution, crypto_id, CAST(timestamp / :resolution AS INTEGER) * :resolution,
+       SUM(price_usd), COUNT(price_usd), MIN(price_usd), MAX(price_usd),
+       SUM(market_cap_usd), COUNT(market_cap_usd), SUM(volume_24h_usd), COUNT(volume_24h_usd),
+       SUM(change_24h_percent), COUNT(change_24h_percent), COUNT(*)
+FROM ticks
+WHERE timestamp >= :start AND timestamp < :end
+GROUP BY crypto_id, 3
+"""
+
+ROLLUP_FROM_ROLLUPS_SQL = """
+INSERT OR REPLACE INTO rollups
+SELECT :resolution, crypto_id, CAST(bucket / :resolution AS INTEGER) * :resolution,
+       SUM(price_sum), SUM(price_count), MIN(price_min), MAX(price_max),
+       SUM(market_cap_sum), SUM(market_cap_count), SUM(volume_sum), SUM(volume_count),
+       SUM(change_sum), SUM(change_count), SUM(samples)
+FROM rollups
+WHERE resolution = :source AND bucket >= :start AND bucket < :end
+GROUP BY crypto_id, 3
+"""
+
+
+def _mean(total, count):
+    """Average from a sum and a count; None when nothing was counted."""
+    return total / count if count else None
+
+
+def _finite(value: float) -> float:
+    """Return value, rejecting inf and NaN, which SQLite and JSON cannot round-trip."""
+    if not math.isfinite(value):
+        raise ValueError(f"{value} is not a finite timestamp")
+    return value
+
+
+def to_epoch(value) -> float:
+    """
+    Convert an ISO-8601 string (naive = UTC), datetime or number to epoch seconds.
+
+    Raises:
+        ValueError: If value is malformed or not a finite number ('inf', 'nan')
+    """
+    if isinstance(value, (int, float)):
+        return _finite(float(value))
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            value = datetime.fromisoformat(value)
+        else:
+            return _finite(number)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def snapshot_rows(snapshot: Dict, only_ids: Optional[set] = None) -> List[Tuple]:
+    """Flatten a transformed snapshot into ticks table rows, optionally for a subset of ids."""
+    timestamp = to_epoch(snapshot['timestamp'])
+    return [
+        (
+            crypto['id'],
+            timestamp,
+            crypto.get('price_usd'),
+            crypto.get('market_cap_usd'),
+            crypto.get('volume_24h_usd'),
+            crypto.get('change_24h_percent')
+        )
+        for crypto in snapshot.get('cryptos', [])
+        if only_ids is None or crypto['id'] in only_ids
+    ]
+
+
+class HistoryStore:
+    """Append-only tick history and sealed candles with a background batched writer."""
+
+    def __init__(self, db_path: str, batch_size: int = 5000, queue_size: int = 1000, retention=None):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path to the SQLite database file
+            batch_size: Maximum rows written per transaction
+            queue_size: Maximum snapshots buffered before new ones are dropped
+            retention: Optional RetentionPolicy whose rollup tiers serve queries
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.retention = retention
+        self.rows_written = 0
+        self.candles_written = 0
+        self.dropped_snapshots = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in WAL mode and ensure the schema exists."""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Per-thread read connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the writer thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background writer thread if it is not running."""
+        with self._lock:
+            if self.is_running:
+                return
+            self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Flush pending writes and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def flush(self) -> None:
+        """Block until every queued snapshot has been written."""
+        self._queue.join()
+
+    def enqueue(self, snapshot: Dict, only_ids: Optional[set] = None) -> bool:
+        """
+        Queue a transformed snapshot for persistence without blocking.
+
+        Args:
+            snapshot: Transformed snapshot
+            only_ids: If given, persist only these crypto ids
+
+        Returns:
+            True if queued, False if the snapshot was dropped
+        """
+        try:
+            rows = snapshot_rows(snapshot, only_ids)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Skipping snapshot with invalid timestamp: {str(e)}")
+            return False
+        if not rows:
+            return True
+        return self._put(INSERT_SQL, rows)
+
+    def enqueue_candles(self, rows: List[Tuple]) -> bool:
+        """
+        Queue sealed candles for persistence without blocking.
+
+        Args:
+            rows: (crypto_id, interval, start, open, high, low, close, volume, ticks) tuples
+
+        Returns:
+            True if queued, False if the candles were dropped
+        """
+        if not rows:
+            return True
+        return self._put(CANDLE_UPSERT_SQL, rows)
+
+    def _put(self, sql: str, rows: List[Tuple]) -> bool:
+        """Hand rows for one statement to the writer thread."""
+        self.start()
+        try:
+            self._queue.put_nowait((sql, rows))
+            return True
+        except queue.Full:
+            self.dropped_snapshots += 1
+            logger.warning("History write queue full; dropping snapshot")
+            return False
+
+    def _run(self) -> None:
+        """Writer loop: drain queued snapshots into batched transactions."""
+        conn = self._connect()
+        stopping = False
+        try:
+            while not stopping:
+                item = self._queue.get()
+                taken = 1
+                if item is _STOP:
+                    self._queue.task_done()
+                    break
+                # Rows are grouped per statement; ticks and candles share a batch
+                batches = {item[0]: list(item[1])}
+                size = len(item[1])
+                while size < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batches.setdefault(item[0], []).extend(item[1])
+                    size += len(item[1])
+                try:
+                    for sql, rows in batches.items():
+                        self._write(conn, rows, sql)
+                finally:
+                    for _ in range(taken):
+                        self._queue.task_done()
+        finally:
+            conn.close()
+            self._thread = None
+
+    def _write(self, conn: sqlite3.Connection, rows: List[Tuple], sql: str = INSERT_SQL) -> None:
+        """Insert rows in a single transaction."""
+        try:
+            with conn:
+                conn.executemany(sql, rows)
+            if sql is CANDLE_UPSERT_SQL:
+                self.candles_written += len(rows)
+            else:
+                self.rows_written += len(rows)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write {len(rows)} history rows: {str(e)}")
+
+    def insert_rows(self, rows: Iterable[Tuple]) -> None:
+        """Synchronously insert rows; intended for backfills and tests."""
+        self._write(self._reader(), list(rows))
+
+    def query(self, crypto_id: str, start: float, end: float, step: float) -> List[Dict]:
+        """
+        Return downsampled history for one crypto.
+
+        With a retention policy the range is read from the coarsest tier
+        that still meets step, with the not yet rolled-up tail from finer
+        tiers; buckets split across tiers are merged.
+
+        Args:
+            crypto_id: Cryptocurrency ID
+            start: Range start in epoch seconds (inclusive)
+            end: Range end in epoch seconds (exclusive)
+            step: Bucket width in seconds
+
+        Returns:
+            List of per-bucket aggregates ordered by time
+        """
+        if self.retention is None:
+            segments = [(0, start, end)]
+        else:
+            segments = self.retention.plan(start, end, step, self.watermarks(), time.time())
+        conn = self._reader()
+        merged = []
+        for resolution, segment_start, segment_end in segments:
+            params = {'step': step, 'crypto_id': crypto_id, 'start': segment_start, 'end': segment_end}
+            if resolution:
+                cursor = conn.execute(ROLLUP_RANGE_SQL, dict(params, resolution=resolution))
+            else:
+                cursor = conn.execute(RANGE_SQL, params)
+            for row in cursor:
+                if merged and merged[-1][0] == row[0]:
+                    merged[-1] = self._merge_buckets(merged[-1], row)
+                else:
+                    merged.append(row)
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(bucket, timezone.utc).isoformat(),
+                'price_usd': _mean(price_sum, price_count),
+                'price_min': price_min,
+                'price_max': price_max,
+                'market_cap_usd': _mean(market_cap_sum, market_cap_count),
+                'volume_24h_usd': _mean(volume_sum, volume_count),
+                'change_24h_percent': _mean(change_sum, change_count),
+                'samples': samples
+            }
+            for (bucket, price_sum, price_count, price_min, price_max, market_cap_sum, market_cap_count,
+                 volume_sum, volume_count, change_sum, change_count, samples) in merged
+        ]
+
+    @staticmethod
+    def _merge_buckets(left: Tuple, right: Tuple) -> Tuple:
+        """Combine two aggregate rows of the same bucket."""
+        def add(a, b):
+            return b if a is None else a if b is None else a + b
+
+        def pick(fn, a, b):
+            return b if a is None else a if b is None else fn(a, b)
+
+        return (
+            left[0], add(left[1], right[1]), add(left[2], right[2]),
+            pick(min, left[3], right[3]), pick(max, left[4], right[4]),
+            *(add(a, b) for a, b in zip(left[5:], right[5:]))
+        )
+
+    def watermarks(self) -> Dict[int, float]:
+        """End of the rolled-up data per rollup resolution."""
+        return dict(self._reader().execute("SELECT resolution, rolled_until FROM compaction_state"))
+
+    def earliest(self, resolution: int) -> Optional[float]:
+        """Oldest timestamp held in a tier (0 = raw ticks), or None if it is empty."""
+        conn = self._reader()
+        if resolution:
+            row = conn.execute("SELECT MIN(bucket) FROM rollups WHERE resolution = ?", (resolution,)).fetchone()
+        else:
+            row = conn.execute("SELECT MIN(timestamp) FROM ticks").fetchone()
+        return row[0]
+
+    def rollup(self, resolution: int, source: int, start: float, end: float) -> int:
+        """
+        Aggregate one slice of a finer tier into a rollup tier and advance its watermark.
+
+        Args:
+            resolution: Rollup bucket width in seconds
+            source: Resolution of the tier read (0 = raw ticks)
+            start: Slice start, aligned to resolution
+            end: Slice end, aligned to resolution
+
+        Returns:
+            Number of rollup rows written
+        """
+        conn = self._reader()
+        params = {'resolution': resolution, 'source': source, 'start': start, 'end': end}
+        with conn:
+            cursor = conn.execute(ROLLUP_FROM_ROLLUPS_SQL if source else ROLLUP_FROM_TICKS_SQL, params)
+            conn.execute(
+                "INSERT OR REPLACE INTO compaction_state (resolution, rolled_until) VALUES (?, ?)",
+                (resolution, end)
+            )
+        return cursor.rowcount
+
+    def prune(self, resolution: int, start: float, end: float) -> int:
+        """
+        Delete one slice of a tier (0 = raw ticks) in a single short transaction.
+
+        Returns:
+            Number of rows deleted
+        """
+        conn = self._reader()
+        with conn:
+            if resolution:
+                cursor = conn.execute(
+                    "DELETE FROM rollups WHERE resolution = ? AND bucket >= ? AND bucket < ?",
+                    (resolution, start, end)
+                )
+            else:
+                cursor = conn.execute("DELETE FROM ticks WHERE timestamp >= ? AND timestamp < ?", (start, end))
+        return cursor.rowcount
+
+    def iter_ticks(self, start: float, end: float, ids: Optional[List[str]] = None,
+                   batch_size: int = 5000) -> Iterator[List[Tuple]]:
+        """
+        Stream raw ticks in a time range, batch by batch.
+
+        With ids, rows are ordered by (crypto_id, timestamp) and read from
+        idx_ticks_crypto_time; without, by (timestamp, crypto_id) from
+        idx_ticks_time, where SQLite only sorts the coins of one timestamp
+        at a time. Either way rows stream without sorting the range first,
+        and memory stays at one batch however large the range. The
+        generator owns its connection and closes it when exhausted or
+        closed.
+
+        Args:
+            start: Range start in epoch seconds (inclusive)
+            end: Range end in epoch seconds (exclusive)
+            ids: Only these crypto ids (all if None)
+            batch_size: Rows fetched per batch
+
+        Yields:
+            Lists of ticks table rows
+        """
+        sql = export_sql(ids)
+        conn = self._connect()
+        try:
+            cursor = conn.execute(sql, [start, end] + list(ids or []))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def query_candles(self, crypto_id: str, interval: str, limit: int,
+                      before: float = float('inf')) -> List[Tuple]:
+        """
+        Return persisted candles of one crypto, oldest first.
+
+        Args:
+            crypto_id: Cryptocurrency ID
+            interval: Candle interval name, e.g. '5m'
+            limit: Maximum number of candles (the most recent ones)
+            before: Only candles starting before this epoch second
+
+        Returns:
+            List of (start, open, high, low, close, volume, ticks) tuples
+        """
+        cursor = self._reader().execute(CANDLES_SQL, {
+            'crypto_id': crypto_id,
+            'interval': interval,
+            'before': before,
+            'limit': limit
+        })
+        return cursor.fetchall()[::-1]
+
+    def get_status(self) -> Dict:
+        """Get store status for health reporting."""
+        return {
+            'db_path': self.db_path,
+            'writer_running': self.is_running,
+            'pending_snapshots': self._queue.qsize(),
+            'rows_written': self.rows_written,
+            'candles_written': self.candles_written,
+            'dropped_snapshots': self.dropped_snapshots
+        }
@@ -1,22 +1,63 @@
 """Data transformation and validation module."""
 import logging
+import time
 from typing import Dict, List, Optional
 from datetime import datetime
+from backend.records import CryptoRecord, quote_record_class
+
+try:
+    import numpy as np
+except ImportError:  # batch mode falls back to the scalar path
+    np = None
 
 logger = logging.getLogger(__name__)
 
+# Above this magnitude value * 100 no longer fits a float64 mantissa exactly
+_ROUND2_EXACT_LIMIT = 2 ** 53 / 100
+
 
 class DataTransformer:
     """Transforms and validates incoming data."""
     
-    def __init__(self, config):
-        """Initialize transformer with configuration."""
+    def __init__(self, config, quality_engine=None, metrics=None):
+        """
+        Initialize transformer with configuration.
+        
+        Args:
+            config: Config class
+            quality_engine: Optional QualityEngine run on every transformed snapshot
+            metrics: Optional MetricsRegistry for transform and quality check latency
+        """
         self.config = config
+        self.quality_engine = quality_engine
+        self.metrics = metrics
+        self.batch_min_size = getattr(config, 'BATCH_TRANSFORM_MIN_SIZE', None)
+        # Currencies quoted next to the primary USD rows, from the same payload
+        self.quote_currencies = [
+            currency for currency in getattr(config, 'VS_CURRENCIES', ['usd']) if currency != 'usd'
+        ]
+        # (currency, market cap key, volume key, change key, row class) per quote currency
+        self._quote_keys = [
+            (currency, f'{currency}_market_cap', f'{currency}_24h_vol', f'{currency}_24h_change',
+             quote_record_class(currency))
+            for currency in self.quote_currencies
+        ]
+        self.reused_count = 0
+        # raw id -> (id, display name) strings shared by every version's records
+        self._names = {}
+        # id -> (raw fingerprint, USD record, quote records) from the previous transform
+        self._records = {}
     
     def transform_market_data(self, raw_data: Dict) -> Dict:
         """
         Transform raw CoinGecko API data into standardized format.
         
+        Rows are CryptoRecord objects sharing one transformed_at timestamp.
+        When _metadata carries coin_fingerprints, records whose raw
+        fingerprint is unchanged since the previous call are reused as-is.
+        With quote currencies configured, the same pass builds their rows
+        into result['quotes'][currency] = {'cryptos', 'summary'}.
+        
         Args:
             raw_data: Raw data from CoinGecko API
             
@@ -27,6 +68,11 @@ class DataTransformer:
             logger.warning("Invalid or missing raw data")
             return self._empty_result()
         
+        # Large payloads go through the vectorized path
+        if self.batch_min_size and np is not None and len(raw_data) > self.batch_min_size:
+            return self.transform_market_data_batch(raw_data)
+        
+        started = time.perf_counter()
         try:
             transformed = {
                 'timestamp': raw_data['_metadata']['timestamp'],
@@ -40,22 +86,47 @@ class DataTransformer:
                 }
             }
             
+            fingerprints = raw_data['_metadata'].get('coin_fingerprints') or {}
+            previous = self._records
+            records = {}
+            quote_rows = [[] for _ in self.quote_currencies]
+            transformed_at = datetime.utcnow().isoformat()
+            
             # Process each cryptocurrency
             for crypto_id, crypto_data in raw_data.items():
                 if crypto_id == '_metadata':
                     continue
                 
-                cell = self._transform_crypto(crypto_id, crypto_data)
+                fingerprint = fingerprints.get(crypto_id)
+                cached = previous.get(crypto_id)
+                if fingerprint is not None and cached and cached[0] == fingerprint:
+                    cell, quotes = cached[1], cached[2]
+                    self.reused_count += 1
+                else:
+                    cell = self._transform_crypto(crypto_id, crypto_data, transformed_at)
+                    quotes = self._transform_quotes(crypto_id, crypto_data, transformed_at)
+                if fingerprint is not None and (cell or any(quotes)):
+                    records[crypto_id] = (fingerprint, cell, quotes)
                 if cell:
                     transformed['cryptos'].append(cell)
                     transformed['summary']['valid_count'] += 1
                 else:
                     transformed['summary']['null_count'] += 1
+                for rows, quote in zip(quote_rows, quotes):
+                    if quote is not None:
+                        rows.append(quote)
                 
                 transformed['summary']['total_count'] += 1
             
+            self._records = records
+            
             # Calculate quality metrics
             transformed['summary']['data_quality_score'] = self._calculate_quality_score(transformed['summary'])
+            if self.quote_currencies:
+                transformed['quotes'] = self._quote_views(quote_rows, transformed['summary'])
+            if self.metrics:
+                self.metrics.observe('transform_seconds', time.perf_counter() - started, path='scalar')
+            self._run_quality_checks(transformed)
             
             return transformed
             
@@ -63,7 +134,129 @@ class DataTransformer:
             logger.error(f"Error transforming data: {str(e)}")
             return self._empty_result()
     
-    def _transform_crypto(self, crypto_id: str, crypto_data: Dict) -> Optional[Dict]:
+    def transform_market_data_batch(self, raw_data: Dict) -> Dict:
+        """
+        Transform raw CoinGecko API data column-wise with NumPy.
+
+        Produces the same structure and values as transform_market_data.
+        Records with unchanged coin_fingerprints are reused and skip
+        vectorization.
+        
+        Args:
+            raw_data: Raw data from CoinGecko API
+            
+        Returns:
+            Transformed data in standard format
+        """
+        if not raw_data or '_metadata' not in raw_data:
+            logger.warning("Invalid or missing raw data")
+            return self._empty_result()
+        if np is None:
+            logger.warning("NumPy not installed; using scalar transform")
+            return self.transform_market_data(raw_data)
+        
+        started = time.perf_counter()
+        try:
+            fingerprints = raw_data['_metadata'].get('coin_fingerprints') or {}
+            previous = self._records
+            records = {}
+            order = []  # reused (fingerprint, record, quotes), or None for positions in ids
+            ids = []
+            entries = []
+            for crypto_id, crypto_data in raw_data.items():
+                if crypto_id == '_metadata':
+                    continue
+                fingerprint = fingerprints.get(crypto_id)
+                cached = previous.get(crypto_id)
+                if fingerprint is not None and cached and cached[0] == fingerprint:
+                    order.append(cached)
+                    records[crypto_id] = cached
+                else:
+                    order.append(None)
+                    ids.append(crypto_id)
+                    entries.append(crypto_data)
+            total = len(order)
+            pending = len(ids)
+            self.reused_count += total - pending
+            
+            transformed_at = datetime.utcnow().isoformat()
+            labels = [self._labels(crypto_id) if isinstance(crypto_id, str) else None for crypto_id in ids]
+            fresh = [None] * pending
+            for i, price in zip(*_price_column(ids, entries, 'usd')):
+                crypto_data = entries[i]
+                fresh[i] = CryptoRecord(
+                    labels[i][0],
+                    labels[i][1],
+                    price,
+                    crypto_data.get('usd_market_cap'),
+                    crypto_data.get('usd_24h_vol'),
+                    crypto_data.get('usd_24h_change'),
+                    transformed_at
+                )
+            fresh_quotes = [[None] * len(self.quote_currencies) for _ in range(pending)]
+            for j, (currency, market_cap, volume, change, record_class) in enumerate(self._quote_keys):
+                for i, price in zip(*_price_column(ids, entries, currency)):
+                    crypto_data = entries[i]
+                    fresh_quotes[i][j] = record_class(
+                        labels[i][0],
+                        labels[i][1],
+                        price,
+                        crypto_data.get(market_cap),
+                        crypto_data.get(volume),
+                        crypto_data.get(change),
+                        transformed_at
+                    )
+            for i, crypto_id in enumerate(ids):
+                quotes = fresh_quotes[i] = tuple(fresh_quotes[i])
+                fingerprint = fingerprints.get(crypto_id)
+                if fingerprint is not None and (fresh[i] or any(quotes)):
+                    records[crypto_id] = (fingerprint, fresh[i], quotes)
+            
+            # Merge reused and freshly transformed records in payload order
+            cryptos = []
+            quote_rows = [[] for _ in self.quote_currencies]
+            position = 0
+            for cached in order:
+                if cached is None:
+                    record, quotes = fresh[position], fresh_quotes[position]
+                    position += 1
+                else:
+                    record, quotes = cached[1], cached[2]
+                if record is not None:
+                    cryptos.append(record)
+                for rows, quote in zip(quote_rows, quotes):
+                    if quote is not None:
+                        rows.append(quote)
+            self._records = records
+            valid_count = len(cryptos)
+            
+            summary = {
+                'total_count': total,
+                'valid_count': valid_count,
+                'null_count': total - valid_count,
+                'errors': []
+            }
+            summary['data_quality_score'] = self._calculate_quality_score(summary)
+            
+            transformed = {
+                'timestamp': raw_data['_metadata']['timestamp'],
+                'source': raw_data['_metadata']['source'],
+                'cryptos': cryptos,
+                'summary': summary
+            }
+            if self.quote_currencies:
+                transformed['quotes'] = self._quote_views(quote_rows, summary)
+            if self.metrics:
+                self.metrics.observe('transform_seconds', time.perf_counter() - started, path='batch')
+            self._run_quality_checks(transformed)
+            return transformed
+            
+        except Exception as e:
+            logger.error(f"Error batch transforming data: {str(e)}")
+            return self._empty_result()
+    
+    def _transform_crypto(self, crypto_id: str, crypto_data: Dict,
+                          transformed_at: Optional[str] = None) -> Optional[CryptoRecord]:
         """Transform individual cryptocurrency data."""
         try:
             # Handle USDdata
@@ -76,22 +269,93 @@ class DataTransformer:
             if not isinstance(usd_data, (int, float)):
                 return None
             
-            transformed = {
-                'id': crypto_id.lower(),
-                'name': crypto_id.replace('_', ' ').title(),
-                'price_usd': round(float(usd_data), 2),
-                'market_cap_usd': crypto_data.get('usd_market_cap'),
-                'volume_24h_usd': crypto_data.get('usd_24h_vol'),
-                'change_24h_percent': crypto_data.get('usd_24h_change'),
-                'transformed_at': datetime.utcnow().isoformat()
-            }
+            labels = self._labels(crypto_id)
             
-            return transformed
+            return CryptoRecord(
+                labels[0],
+                labels[1],
+                round(float(usd_data), 2),
+                crypto_data.get('usd_market_cap'),
+                crypto_data.get('usd_24h_vol'),
+                crypto_data.get('usd_24h_change'),
+                transformed_at or datetime.utcnow().isoformat()
+            )
             
         except Exception as e:
             logger.warning(f"Failed to transform crypto {crypto_id}: {str(e)}")
             return None
     
+    def _transform_quotes(self, crypto_id: str, crypto_data: Dict, transformed_at: str) -> tuple:
+        """Quote records of one cryptocurrency, one per quote currency (None where invalid)."""
+        if not self._quote_keys:
+            return ()
+        if not isinstance(crypto_data, dict):
+            return (None,) * len(self._quote_keys)
+        try:
+            labels = self._labels(crypto_id)
+        except Exception as e:
+            logger.warning(f"Failed to transform quotes of {crypto_id}: {str(e)}")
+            return (None,) * len(self._quote_keys)
+        quotes = []
+        for currency, market_cap, volume, change, record_class in self._quote_keys:
+            price = crypto_data.get(currency)
+            if isinstance(price, (int, float)):
+                quotes.append(record_class(
+                    labels[0],
+                    labels[1],
+                    round(float(price), 2),
+                    crypto_data.get(market_cap),
+                    crypto_data.get(volume),
+                    crypto_data.get(change),
+                    transformed_at
+                ))
+            else:
+                quotes.append(None)
+        return tuple(quotes)
+    
+    def _labels(self, crypto_id: str) -> tuple:
+        """(id, display name) strings of a raw id, shared by all records."""
+        labels = self._names.get(crypto_id)
+        if labels is None:
+            labels = self._names[crypto_id] = (crypto_id.lower(), crypto_id.replace('_', ' ').title())
+        return labels
+    
+    def _quote_views(self, quote_rows: List[List], summary: Dict) -> Dict:
+        """Per-currency rows and summaries; quality alerts are shared with the USD summary."""
+        views = {}
+        for currency, rows in zip(self.quote_currencies, quote_rows):
+            quote_summary = {
+                'total_count': summary['total_count'],
+                'valid_count': len(rows),
+                'null_count': summary['total_count'] - len(rows),
+                'errors': summary['errors']
+            }
+            quote_summary['data_quality_score'] = self._calculate_quality_score(quote_summary)
+            views[currency] = {'cryptos': rows, 'summary': quote_summary}
+        return views
+    
+    def _run_quality_checks(self, transformed: Dict) -> None:
+        """Run the quality engine, if any, recording alerts in summary['errors']."""
+        if self.quality_engine is None:
+            return
+        try:
+            if self.metrics:
+                with self.metrics.timer('quality_check_seconds'):
+                    self.quality_engine.evaluate(transformed)
+            else:
+                self.quality_engine.evaluate(transformed)
+        except Exception as e:
+            logger.error(f"Quality checks failed: {str(e)}")
+    
+    def record_unchanged_payload(self) -> None:
+        """Tell the quality engine, if any, that a fetched payload was skipped as unchanged."""
+        if self.quality_engine is None:
+            return
+        try:
+            self.quality_engine.record_duplicate_payload()
+        except Exception as e:
+            logger.error(f"Quality checks failed: {str(e)}")
+    
     def _calculate_quality_score(self, summary: Dict) -> float:
         """Calculate data quality score (0-100)."""
         if summary['total_count'] == 0:
@@ -128,3 +392,38 @@ class DataTransformer:
         """
         required_keys = ['timestamp', 'cryptos', 'summary']
         return all(key in data for key in required_keys)
+
+
+def _price_column(ids: List, entries: List, key: str):
+    """
+    Positions of entries with a numeric value under key, and those values rounded to 2 decimals.
+
+    Entries that are not objects, or whose id is not a string, never qualify.
+    """
+    column = [
+        crypto_data.get(key) if isinstance(crypto_data, dict) and isinstance(crypto_id, str) else None
+        for crypto_id, crypto_data in zip(ids, entries)
+    ]
+    valid = np.fromiter((isinstance(v, (int, float)) for v in column), dtype=bool, count=len(column))
+    valid_idx = np.flatnonzero(valid)
+    prices = np.array([float(column[i]) for i in valid_idx], dtype=np.float64)
+    return valid_idx.tolist(), _round2(prices).tolist()
+
+
+def _round2(values):
+    """
+    Round a float64 array to 2 decimals exactly as the built-in round() does.
+
+    np.round scales by 100 and rounds half to even, which only disagrees
+    with round() when the scaled value lands exactly on .5; those few
+    entries are recomputed with round(). So are inf, NaN and magnitudes
+    whose scaled value exceeds 2**53, where the scaling itself is inexact.
+    """
+    fast = np.isfinite(values) & (np.abs(values) < _ROUND2_EXACT_LIMIT)
+    rounded = values.copy()
+    rounded[fast] = np.round(values[fast], 2)
+    scaled = values[fast] * 100
+    ties = np.flatnonzero(fast)[np.abs(scaled - np.trunc(scaled)) == 0.5]
+    for i in np.concatenate((ties, np.flatnonzero(~fast))):
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
@@ -0,0 +1,200 @@
+"""Persist the last good /api/data body so a restarted process can serve it immediately."""
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from backend.serialization import loads
+
+logger = logging.getLogger(__name__)
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """
+    Replace path with data so readers see either the old or the new file, never a partial one.
+
+    The bytes go to a temporary file in the same directory, are fsynced, and
+    the file is renamed over path; the directory is fsynced so the rename
+    survives a crash.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # e.g. directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+class LastGoodSnapshot:
+    """
+    The most recently published /api/data body, kept on disk.
+
+    save() is given the already-serialized body, so persisting costs one
+    write and no extra serialization. submit() hands the body to a
+    background writer instead, so the publish path never waits for disk;
+    bodies submitted while a write is running are coalesced to the newest.
+    load() returns the payload together with its bytes, which can be served
+    as-is; a missing or unreadable file yields None and never prevents
+    startup.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path: File the body is written to
+        """
+        self.path = path
+        self.saved_count = 0
+        self.error_count = 0
+        self.last_saved_version = None
+        self.last_save_seconds = None
+        self.loaded_version = None
+        self.coalesced_count = 0
+
+        self._pending = None  # newest (version, body) not yet written
+        self._writing = False
+        self._stopping = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the writer thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, version: int, body: bytes) -> None:
+        """
+        Queue a body for the background writer without blocking.
+
+        Args:
+            version: Snapshot version of the body
+            body: Serialized /api/data payload
+        """
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced_count += 1
+            self._pending = (version, body)
+            if not self.is_running:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='snapshot-writer', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        """Writer loop: persist the newest submitted body until stopped."""
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopping:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                version, body = self._pending
+                self._pending = None
+                self._writing = True
+            try:
+                self.save(version, body)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every submitted body has been written.
+
+        Returns:
+            True if nothing is pending, False if the timeout elapsed first
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Write the pending body, then stop the writer thread."""
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def save(self, version: int, body: bytes) -> bool:
+        """
+        Atomically replace the persisted body; returns False on failure.
+
+        Args:
+            version: Snapshot version of the body
+            body: Serialized /api/data payload
+        """
+        started = time.perf_counter()
+        try:
+            write_atomic(self.path, body)
+        except OSError as e:
+            self.error_count += 1
+            logger.error(f"Failed to persist snapshot to {self.path}: {str(e)}")
+            return False
+        self.saved_count += 1
+        self.last_saved_version = version
+        self.last_save_seconds = time.perf_counter() - started
+        return True
+
+    def load(self) -> Optional[Tuple[Dict, bytes]]:
+        """
+        Read the persisted payload.
+
+        Returns:
+            Tuple of (payload, body): the parsed dictionary with 'data',
+            'version', 'last_update' and 'stats', and the bytes it was parsed
+            from; None if nothing usable was persisted
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"Failed to read persisted snapshot {self.path}: {str(e)}")
+            return None
+        try:
+            payload = loads(raw)
+            if not isinstance(payload.get('data'), dict) or not isinstance(payload.get('version'), int):
+                raise ValueError("missing data or version")
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable persisted snapshot {self.path}: {str(e)}")
+            return None
+        self.loaded_version = payload['version']
+        return payload, raw
+
+    def get_status(self) -> Dict:
+        """Get persistence status for health reporting."""
+        return {
+            'path': self.path,
+            'saved': self.saved_count,
+            'errors': self.error_count,
+            'last_saved_version': self.last_saved_version,
+            'last_save_ms': round(self.last_save_seconds * 1000, 3) if self.last_save_seconds is not None else None,
+            'loaded_version': self.loaded_version,
+            'pending': self._pending is not None,
+            'coalesced': self.coalesced_count
+        }
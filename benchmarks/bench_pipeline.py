@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+"""
+End-to-end benchmark: ingest -> transform -> serve against a local stub of
+CoinGecko, at several payload sizes, written as JSON for regression checks.
+
+For each size the real CoinGeckoIngester fetches from benchmarks.synthetic's
+stub server, the configured DataTransformer (with quality checks) transforms
+the payload, and the Flask app is served over HTTP to concurrent clients
+hitting /api/data (USD and the last of VS_CURRENCIES) and /api/refresh.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--coins 5 1000 10000] [--clients 8]
+        [--requests 400] [--null-rate 0.01] [--malformed-rate 0.005]
+        [--output results.json] [--baseline previous.json --tolerance 0.2]
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server  # noqa: E402
+from backend import app as app_module  # noqa: E402
+from backend.cache import SnapshotCache  # noqa: E402
+from backend.data_ingestion import CoinGeckoIngester  # noqa: E402
+from backend.quality import QualityEngine  # noqa: E402
+from backend.serialization import ResponseCache  # noqa: E402
+from backend.transformations import DataTransformer  # noqa: E402
+from benchmarks.synthetic import StubCoinGecko  # noqa: E402
+
+# Metrics where a larger value is better; all others are latencies
+HIGHER_IS_BETTER = ('coins_per_s', 'rps')
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(latencies, elapsed, coins=None):
+    """Throughput and latency percentiles in milliseconds."""
+    summary = {
+        'count': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+    if coins is not None:
+        summary['coins_per_s'] = round(coins * len(latencies) / elapsed, 1)
+    else:
+        summary['rps'] = round(len(latencies) / elapsed, 1)
+    return summary
+
+
+def time_calls(fn, iterations):
+    """Run fn repeatedly; return (results, latencies, elapsed)."""
+    results, latencies = [], []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        results.append(fn())
+        latencies.append(time.perf_counter() - call_started)
+    return results, latencies, time.perf_counter() - started
+
+
+def load(url, clients, total):
+    """Issue total GETs from concurrent clients; return (latencies, errors, elapsed)."""
+    per_client = max(1, total // clients)
+    latencies, errors = [], []
+
+    def client():
+        session = requests.Session()
+        local, failed = [], 0
+        for _ in range(per_client):
+            started = time.perf_counter()
+            try:
+                response = session.get(url, timeout=30)
+                response.content
+                if response.status_code != 200:
+                    failed += 1
+            except requests.RequestException:
+                failed += 1
+            local.append(time.perf_counter() - started)
+        session.close()
+        return local, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for local, failed in pool.map(lambda _: client(), range(clients)):
+            latencies.extend(local)
+            errors.append(failed)
+    return latencies, sum(errors), time.perf_counter() - started
+
+
+def bench_size(coins, args):
+    """Benchmark one payload size."""
+    config = app_module.current_config
+    with StubCoinGecko(coins, args.null_rate, args.malformed_rate, seed=args.seed) as stub:
+        ingester = CoinGeckoIngester(
+            stub.url, stub.ids,
+            chunk_size=config.INGESTION_CHUNK_SIZE,
+            max_workers=config.INGESTION_MAX_WORKERS,
+            vs_currencies=config.VS_CURRENCIES
+        )
+        transformer = DataTransformer(config, quality_engine=QualityEngine(config))
+
+        # Warm up connections and caches
+        transformer.transform_market_data(ingester.fetch_market_data())
+
+        payloads, fetch_latencies, fetch_elapsed = time_calls(ingester.fetch_market_data, args.iterations)
+        payloads = iter(payloads)
+        _, transform_latencies, transform_elapsed = time_calls(
+            lambda: transformer.transform_market_data(next(payloads)), args.iterations
+        )
+
+        # Serve through the real app wired to the stub-backed components
+        app_module.ingester = ingester
+        app_module.transformer = transformer
+        app_module.snapshot_cache = SnapshotCache(ttl=args.refresh_ttl, on_publish=app_module._fan_out)
+        app_module.response_cache = ResponseCache(metrics=app_module.metrics)
+        server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_port}"
+        try:
+            requests.get(f"{base}/api/refresh", timeout=60).raise_for_status()
+            endpoints = {}
+            for path in ('/api/data', f"/api/data?vs={config.VS_CURRENCIES[-1]}", '/api/refresh'):
+                latencies, errors, elapsed = load(base + path, args.clients, args.requests)
+                endpoints[path] = dict(summarize(latencies, elapsed), errors=errors)
+        finally:
+            server.shutdown()
+            thread.join()
+            ingester.close()
+
+        valid = app_module.snapshot_cache.get().data['summary']['valid_count']
+
+    return {
+        'coins': coins,
+        'valid_coins': valid,
+        'ingest': summarize(fetch_latencies, fetch_elapsed, coins),
+        'transform': summarize(transform_latencies, transform_elapsed, coins),
+        'endpoints': endpoints,
+        'upstream_requests': stub.request_count
+    }
+
+
+def flatten(results):
+    """Map 'coins/stage/metric' -> value for comparisons."""
+    flat = {}
+    for entry in results:
+        stages = {'ingest': entry['ingest'], 'transform': entry['transform'], **entry['endpoints']}
+        for stage, metrics in stages.items():
+            for metric, value in metrics.items():
+                if metric in HIGHER_IS_BETTER or metric.endswith('_ms'):
+                    flat[f"{entry['coins']}/{stage}/{metric}"] = value
+    return flat
+
+
+def compare(results, baseline, tolerance):
+    """Describe every metric that regressed by more than tolerance vs baseline."""
+    current, previous = flatten(results), flatten(baseline)
+    regressions = []
+    for key, value in current.items():
+        before = previous.get(key)
+        if not before or value is None:
+            continue
+        higher_is_better = key.rsplit('/', 1)[1] in HIGHER_IS_BETTER
+        change = (value - before) / before
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{key}: {before} -> {value} ({change:+.0%})")
+    return regressions
+
+
+def git_revision():
+    """Current commit hash, if available."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """Run the suite, write JSON results and optionally compare with a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--coins', type=int, nargs='+', default=[5, 1000, 10000])
+    parser.add_argument('--null-rate', type=float, default=0.01)
+    parser.add_argument('--malformed-rate', type=float, default=0.005)
+    parser.add_argument('--iterations', type=int, default=10, help='fetch/transform repetitions per size')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=400, help='requests per endpoint per size')
+    parser.add_argument('--refresh-ttl', type=float, default=0,
+                        help='snapshot TTL; 0 makes every /api/refresh fetch upstream (coalesced)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--baseline', default=None, help='previous results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    app_module.current_config.HISTORY_ENABLED = False
+    app_module.current_config.WARM_START_ENABLED = False
+    # Build the app before bench_size swaps in stub-backed components
+    app_module.create_app()
+
+    results = []
+    for coins in args.coins:
+        entry = bench_size(coins, args)
+        results.append(entry)
+        print(f"{coins:>6} coins  ingest p50 {entry['ingest']['p50_ms']:9.2f} ms  "
+              f"transform p50 {entry['transform']['p50_ms']:8.2f} ms")
+        for path, stats in entry['endpoints'].items():
+            print(f"        {path:<17} {stats['rps']:8.1f} req/s  p50 {stats['p50_ms']:8.2f} ms  "
+                  f"p99 {stats['p99_ms']:8.2f} ms  errors {stats['errors']}")
+
+    report = {
+        'benchmark': 'pipeline',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'results': results
+    }
+    output = args.output or f"benchmark-pipeline-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
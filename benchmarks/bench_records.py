@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Memory benchmark: retained snapshots of dict rows (one timestamp string per
+row) vs CryptoRecord rows sharing one timestamp, measured with tracemalloc.
+
+Every version changes every price, so no record is reused between versions
+and the numbers are the worst case for retention.
+
+Usage:
+    python -m benchmarks.bench_records [--coins 10000] [--versions 1000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import DevelopmentConfig  # noqa: E402
+from backend.transformations import DataTransformer  # noqa: E402
+
+
+def make_payload(coins, version):
+    """Raw payload whose prices all differ from the previous version."""
+    raw = {
+        f'coin_{i}': {
+            'usd': 1000.0 / (i + 1) + version * 0.01,
+            'usd_market_cap': 1e9 + i * 12345.678 + version,
+            'usd_24h_vol': 1e7 + i * 321.5 + version,
+            'usd_24h_change': (i % 200) / 10 - 10
+        }
+        for i in range(coins)
+    }
+    raw['_metadata'] = {'timestamp': datetime.utcnow().isoformat(), 'source': 'CoinGecko', 'status': 'success'}
+    return raw
+
+
+def legacy_rows(raw):
+    """The previous representation: a dict per row with its own timestamp string."""
+    return [
+        {
+            'id': crypto_id.lower(),
+            'name': crypto_id.replace('_', ' ').title(),
+            'price_usd': round(float(crypto_data['usd']), 2),
+            'market_cap_usd': crypto_data.get('usd_market_cap'),
+            'volume_24h_usd': crypto_data.get('usd_24h_vol'),
+            'change_24h_percent': crypto_data.get('usd_24h_change'),
+            'transformed_at': datetime.utcnow().isoformat()
+        }
+        for crypto_id, crypto_data in raw.items()
+        if crypto_id != '_metadata'
+    ]
+
+
+def record_rows(transformer, raw):
+    """The current representation produced by DataTransformer."""
+    return transformer.transform_market_data(raw)['cryptos']
+
+
+def measure(build, coins, versions):
+    """Bytes still allocated while `versions` snapshots are held."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    retained = []
+    for version in range(versions):
+        raw = make_payload(coins, version)
+        retained.append(build(raw))
+        del raw
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del retained
+    return used
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--coins', type=int, default=10000)
+    parser.add_argument('--versions', type=int, default=1000)
+    args = parser.parse_args()
+
+    transformer = DataTransformer(DevelopmentConfig)
+    results = {
+        'dict rows': measure(legacy_rows, args.coins, args.versions),
+        'CryptoRecord rows': measure(lambda raw: record_rows(transformer, raw), args.coins, args.versions),
+    }
+    print(f"{args.coins} coins retained over {args.versions} versions")
+    for name, used in results.items():
+        per_row = used / (args.coins * args.versions)
+        print(f"  {name:<20} {used / 2**20:10.1f} MiB  {per_row:6.1f} B/row")
+    print(f"  saving {1 - results['CryptoRecord rows'] / results['dict rows']:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark: /api/data requests/sec with per-request jsonify vs the
+serialize-once response cache, on a synthetic snapshot of ~5k coins.
+
+Usage:
+    python -m benchmarks.bench_serialization [--coins 5000] [--requests 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify  # noqa: E402
+from backend import app as app_module  # noqa: E402
+
+
+def make_snapshot(coins):
+    """Build a transformed snapshot with the given number of coins."""
+    return {
+        'timestamp': '2026-01-01T00:00:00',
+        'source': 'CoinGecko',
+        'cryptos': [
+            {
+                'id': f'coin-{i}',
+                'name': f'Coin {i}',
+                'price_usd': round(1000.0 / (i + 1), 2),
+                'market_cap_usd': 1e9 + i * 12345.678,
+                'volume_24h_usd': 1e7 + i * 321.5,
+                'change_24h_percent': (i % 200) / 10 - 10,
+                'transformed_at': '2026-01-01T00:00:00'
+            }
+            for i in range(coins)
+        ],
+        'summary': {'total_count': coins, 'valid_count': coins, 'null_count': 0,
+                    'errors': [], 'data_quality_score': 100.0}
+    }
+
+
+def legacy_get_data():
+    """The pre-cache handler: jsonify the snapshot on every request."""
+    return jsonify(app_module.data_payload(app_module.snapshot_cache.get()))
+
+
+def measure(client, path, requests, headers=None):
+    """Return requests/sec for repeated GETs of path."""
+    client.get(path, headers=headers)
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers=headers)
+    return requests / (time.perf_counter() - started)
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    app_module.current_config.HISTORY_ENABLED = False
+    app_module.current_config.WARM_START_ENABLED = False
+    app_module.app.add_url_rule('/bench/legacy-data', 'bench_legacy_data', legacy_get_data)
+    app_module.publish_snapshot(make_snapshot(args.coins))
+    client = app_module.app.test_client()
+
+    results = {
+        'jsonify per request': measure(client, '/bench/legacy-data', args.requests),
+        'serialize-once (identity)': measure(client, '/api/data', args.requests),
+        'serialize-once (gzip)': measure(client, '/api/data', args.requests, {'Accept-Encoding': 'gzip'}),
+    }
+    print(f"/api/data with {args.coins} coins, {args.requests} requests")
+    for name, rps in results.items():
+        print(f"  {name:<28} {rps:10.1f} req/s")
+
+
+if __name__ == '__main__':
+    main()
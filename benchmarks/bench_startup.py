@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Startup benchmark: import time, app construction and time to first response.
+
+Each run is a fresh interpreter with its own CACHE_DIR and ingestion
+disabled, so the only data it can serve is what warm start loads. A cold
+run has no persisted snapshot; a warm run starts next to a persisted
+snapshot of --coins coins. Reported per scenario (median of --runs):
+import_ms (import backend.app), create_ms (create_app()), first_response_ms
+(first GET /api/data) and whether that response carried data.
+
+Usage:
+    python -m benchmarks.bench_startup [--coins 5000] [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from backend.serialization import dumps  # noqa: E402
+from backend.warm_start import LastGoodSnapshot  # noqa: E402
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+import backend.app as app_module
+imported = time.perf_counter()
+app = app_module.create_app()
+created = time.perf_counter()
+response = app.test_client().get('/api/data')
+answered = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'first_response_ms': (answered - started) * 1000,
+    'has_data': response.get_json()['data'] is not None
+}))
+"""
+
+
+def persisted_body(coins):
+    """An /api/data body as the previous process would have persisted it."""
+    cryptos = [
+        {'id': f"coin_{i}", 'name': f"Coin_{i}", 'price_usd': 1000.0 / (i + 1),
+         'market_cap_usd': 1e9, 'volume_24h_usd': 1e7, 'change_24h_percent': 0.5,
+         'transformed_at': '2026-01-01T00:00:00'}
+        for i in range(coins)
+    ]
+    return dumps({
+        'data': {
+            'timestamp': '2026-01-01T00:00:00',
+            'source': 'CoinGecko',
+            'cryptos': cryptos,
+            'summary': {'total_count': coins, 'valid_count': coins, 'null_count': 0,
+                        'errors': [], 'data_quality_score': 100.0}
+        },
+        'version': 42,
+        'last_update': '2026-01-01T00:00:00',
+        'stats': {'update_count': 42, 'error_count': 0}
+    })
+
+
+def run_once(cache_dir):
+    """Start one fresh interpreter and return its timings."""
+    env = dict(os.environ, CACHE_DIR=cache_dir, LOG_FILE=os.path.join(cache_dir, 'app.log'),
+               INGESTION_ENABLED='false', HISTORY_ENABLED='false', LOG_LEVEL='WARNING')
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD], cwd=PROJECT_ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench(scenario, coins, runs):
+    """Median timings of a cold or warm start."""
+    samples = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            if scenario == 'warm':
+                body = persisted_body(coins)
+                LastGoodSnapshot(os.path.join(cache_dir, 'last_snapshot.json')).save(42, body)
+            samples.append(run_once(cache_dir))
+    result = {'scenario': scenario, 'has_data': all(sample['has_data'] for sample in samples)}
+    for key in ('import_ms', 'create_ms', 'first_response_ms'):
+        result[key] = round(statistics.median(sample[key] for sample in samples), 1)
+    return result
+
+
+def main():
+    """Run cold and warm starts and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--coins', type=int, default=5000, help='coins in the persisted snapshot')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    for scenario in ('cold', 'warm'):
+        result = bench(scenario, args.coins, args.runs)
+        print(f"{scenario:>5}  import {result['import_ms']:7.1f} ms  create_app {result['create_ms']:7.1f} ms  "
+              f"first /api/data {result['first_response_ms']:7.1f} ms  has data: {result['has_data']}")
+
+
+if __name__ == '__main__':
+    main()
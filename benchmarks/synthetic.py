@@ -0,0 +1,158 @@
+"""
+Synthetic CoinGecko /simple/price payloads and a local stub server.
+
+The stub answers /simple/price like CoinGecko for any subset of the
+generated ids, so CoinGeckoIngester can be pointed at it through its
+api_url. Bodies are encoded once per (ids, tick) and cached, keeping the
+stub's own cost out of the measurements.
+"""
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Units of each currency per USD; unknown currencies quote 1:1
+FX_RATES = {'usd': 1.0, 'eur': 0.92, 'gbp': 0.79, 'jpy': 150.0}
+
+
+def make_ids(coins: int) -> List[str]:
+    """Ids of a synthetic universe of coins."""
+    return [f"coin_{i}" for i in range(coins)]
+
+
+def make_price_payload(ids: List[str], null_rate: float = 0.0, malformed_rate: float = 0.0,
+                       seed: int = 0, tick: int = 0, currencies: Tuple[str, ...] = ('usd',)) -> Dict:
+    """
+    Build a /simple/price response body.
+
+    Args:
+        ids: Coin ids to include
+        null_rate: Fraction of coins whose usd price is null
+        malformed_rate: Fraction of coins with a non-numeric price or a non-object entry
+        seed: Seed for reproducible payloads
+        tick: Advances prices so consecutive ticks differ
+        currencies: Quote currencies, as in the vs_currencies parameter
+
+    Returns:
+        Mapping of coin id to its price fields
+    """
+    rng = random.Random(f"{seed}:{tick}")
+    payload = {}
+    for i, crypto_id in enumerate(ids):
+        roll = rng.random()
+        if roll < null_rate:
+            payload[crypto_id] = {currency: None for currency in currencies}
+        elif roll < null_rate + malformed_rate:
+            payload[crypto_id] = 'N/A' if i % 2 else {currency: 'N/A' for currency in currencies}
+        else:
+            usd_price = 1000.0 / (i + 1) * (1 + rng.uniform(-0.02, 0.02))
+            change = round(rng.uniform(-10, 10), 4)
+            entry = payload[crypto_id] = {}
+            for currency in currencies:
+                price = usd_price * FX_RATES.get(currency, 1.0)
+                entry[currency] = round(price, 6)
+                entry[f'{currency}_market_cap'] = round(price * 1e7 * (i % 97 + 1), 2)
+                entry[f'{currency}_24h_vol'] = round(price * 1e5 * (i % 13 + 1), 2)
+                entry[f'{currency}_24h_change'] = change
+    return payload
+
+
+class StubCoinGecko:
+    """Local HTTP stand-in for the CoinGecko API."""
+
+    def __init__(self, coins: int, null_rate: float = 0.0, malformed_rate: float = 0.0,
+                 seed: int = 0, ticks: int = 4):
+        """
+        Initialize the stub.
+
+        Args:
+            coins: Size of the synthetic coin universe
+            null_rate: Fraction of coins with null prices
+            malformed_rate: Fraction of coins with malformed entries
+            seed: Seed for reproducible payloads
+            ticks: Distinct payload versions served in rotation
+        """
+        self.ids = make_ids(coins)
+        self.null_rate = null_rate
+        self.malformed_rate = malformed_rate
+        self.seed = seed
+        self.ticks = max(1, ticks)
+        self.request_count = 0
+        self._payloads = {}
+        self._bodies = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base API URL to pass as COINGECKO_API_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v3"
+
+    def _body(self, ids_param: str, currencies_param: str = 'usd') -> bytes:
+        """Encoded response for a chunk of ids at the current tick."""
+        with self._lock:
+            tick = self.request_count % self.ticks
+            self.request_count += 1
+        key = (ids_param, currencies_param, tick)
+        body = self._bodies.get(key)
+        if body is None:
+            payload = self._payloads.get((currencies_param, tick))
+            if payload is None:
+                currencies = tuple(currencies_param.lower().split(',')) if currencies_param else ('usd',)
+                payload = self._payloads[(currencies_param, tick)] = make_price_payload(
+                    self.ids, self.null_rate, self.malformed_rate, self.seed, tick, currencies
+                )
+            requested = ids_param.split(',') if ids_param else []
+            body = self._bodies[key] = json.dumps(
+                {crypto_id: payload[crypto_id] for crypto_id in requested if crypto_id in payload}
+            ).encode('utf-8')
+        return body
+
+    def start(self) -> 'StubCoinGecko':
+        """Serve on an ephemeral localhost port in a background thread."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if not parsed.path.endswith('/simple/price'):
+                    self.send_error(404)
+                    return
+                query = parse_qs(parsed.query)
+                body = stub._body(query.get('ids', [''])[0], query.get('vs_currencies', ['usd'])[0])
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stub-coingecko', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Shut the server down."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join(timeout)
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
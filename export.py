@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Export tick history from the SQLite store as NDJSON or CSV.
+
+Streams the same encoding as /api/export, batch by batch, so memory stays
+flat for any range. Works offline, without starting the app.
+
+Usage:
+    python export.py --from 2026-01-01 --to 2026-01-08 --ids bitcoin,ethereum --format csv -o ticks.csv
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from backend.config import current_config  # noqa: E402
+from backend.export import FORMATS, export_chunks  # noqa: E402
+from backend.storage import HistoryStore, to_epoch  # noqa: E402
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--from', dest='start', help='range start, ISO-8601 or epoch seconds (default: 24h ago)')
+    parser.add_argument('--to', dest='end', help='range end, ISO-8601 or epoch seconds (default: now)')
+    parser.add_argument('--ids', default='', help='comma-separated crypto ids (default: all)')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='ndjson')
+    parser.add_argument('--db', default=os.path.join(current_config.CACHE_DIR, current_config.DATABASE_FILE),
+                        help='history database (default: %(default)s)')
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    parser.add_argument('--batch-size', type=int, default=current_config.EXPORT_BATCH_SIZE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the export; returns the process exit code."""
+    args = parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"History database not found: {args.db}", file=sys.stderr)
+        return 1
+    now = datetime.utcnow()
+    try:
+        start = to_epoch(args.start or now - timedelta(days=1))
+        end = to_epoch(args.end or now)
+    except ValueError as e:
+        print(f"Invalid range: {e}", file=sys.stderr)
+        return 2
+    if end <= start:
+        print("Invalid range: --to must be after --from", file=sys.stderr)
+        return 2
+    ids = [part.strip().lower() for part in args.ids.split(',') if part.strip()] or None
+
+    chunks = export_chunks(HistoryStore(args.db), start, end, ids, args.format, batch_size=args.batch_size)
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
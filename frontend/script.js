@@ -4,11 +4,18 @@
 const AUTO_REFRESH_INTERVAL = 60000;
 let autoRefreshTimer = null;
 
+// Server push: fall back to polling after this many consecutive stream errors
+const STREAM_MAX_ERRORS = 3;
+let eventSource = null;
+let streamErrors = 0;
+
 // Initialize dashboard on page load
 document.addEventListener('DOMContentLoaded', () => {
     console.log('Dashboard initialized');
     refreshData();
-    startAutoRefresh();
+    if (!startStream()) {
+        startAutoRefresh();
+    }
 });
 
 // Refresh button click handler
@@ -39,10 +46,58 @@ async function refreshData() {
     }
 }
 
+/**
+ * Subscribe to /api/stream; returns false if EventSource is unavailable
+ */
+function startStream() {
+    if (!window.EventSource) {
+        return false;
+    }
+
+    eventSource = new EventSource('/api/stream');
+
+    eventSource.addEventListener('snapshot', (event) => {
+        const result = JSON.parse(event.data);
+        streamErrors = 0;
+        stopAutoRefresh();
+        updateDashboard(result.data, result.stats);
+        updateStatus('healthy', 'Connected (live)');
+    });
+
+    eventSource.onopen = () => {
+        streamErrors = 0;
+        stopAutoRefresh();
+        console.log('Live stream connected');
+    };
+
+    // EventSource reconnects on its own (resending Last-Event-ID);
+    // poll in the meantime and give up on the stream if it keeps failing
+    eventSource.onerror = () => {
+        streamErrors += 1;
+        startAutoRefresh();
+        if (eventSource.readyState === EventSource.CLOSED || streamErrors >= STREAM_MAX_ERRORS) {
+            console.warn('Live stream unavailable, falling back to polling');
+            stopStream();
+        }
+    };
+
+    return true;
+}
+
+/**
+ * Close the live stream
+ */
+function stopStream() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
 /**
  * Update dashboard with new data
  */
-function updateDashboard(data) {
+function updateDashboard(data, stats) {
     if (!data) {
         console.warn('No data to display');
         return;
@@ -73,8 +128,12 @@ function updateDashboard(data) {
         tableBody.innerHTML = '<tr class="empty-row"><td colspan="5">No data available</td></tr>';
     }
 
-    // Fetch and update stats
-    fetchStats();
+    // Pushed snapshots carry their stats; polling needs a second request
+    if (stats) {
+        document.getElementById('updateCount').textContent = stats.update_count || 0;
+    } else {
+        fetchStats();
+    }
 }
 
 /**
@@ -150,7 +209,7 @@ async function fetchStats() {
  */
 function startAutoRefresh() {
     if (autoRefreshTimer) {
-        clearInterval(autoRefreshTimer);
+        return;
     }
     
     autoRefreshTimer = setInterval(refreshData, AUTO_REFRESH_INTERVAL);
@@ -163,9 +222,13 @@ function startAutoRefresh() {
 function stopAutoRefresh() {
     if (autoRefreshTimer) {
         clearInterval(autoRefreshTimer);
+        autoRefreshTimer = null;
         console.log('Auto-refresh stopped');
     }
 }
 
 // Cleanup on page unload
-window.addEventListener('beforeunload', stopAutoRefresh);
+window.addEventListener('beforeunload', () => {
+    stopAutoRefresh();
+    stopStream();
+});
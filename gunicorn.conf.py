@@ -0,0 +1,46 @@
+"""
+Gunicorn settings for multi-worker deployments.
+
+Usage:
+    gunicorn -c gunicorn.conf.py backend.app:app
+
+Every worker starts background ingestion; with more than one worker the
+shared snapshot is enabled so only the elected leader polls CoinGecko and
+the others serve its snapshots.
+
+Workers use the gthread class, where every open /api/stream (SSE) client
+holds one thread for as long as it stays connected. Each worker therefore
+runs GUNICORN_THREADS threads (default 32) and accepts at most
+GUNICORN_THREADS - SSE_RESERVED_THREADS streams (SSE_MAX_CLIENTS); further
+streams get a 503 and the dashboard polls instead, so regular requests
+always find a free thread. A cluster serves about
+workers x SSE_MAX_CLIENTS streaming clients; raise GUNICORN_THREADS for
+more. Async workers (gevent/eventlet) would avoid pinning threads but
+are not used: ingestion, the history writer and the snapshot mirror rely
+on real threads.
+"""
+import os
+
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', 5000)}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 32))
+# Threads kept free of SSE clients for regular requests
+_sse_reserved = int(os.getenv('SSE_RESERVED_THREADS', 4))
+os.environ.setdefault('SSE_MAX_CLIENTS', str(max(1, threads - _sse_reserved)))
+
+if workers > 1:
+    # Read by backend.config when workers import the app
+    os.environ.setdefault('SHARED_SNAPSHOT_ENABLED', 'true')
+
+
+def post_worker_init(worker):
+    """Start ingestion (leader) or snapshot mirroring (followers) in each worker."""
+    from backend.app import start_background_ingestion
+    start_background_ingestion()
+
+
+def worker_exit(server, worker):
+    """Release leadership and flush history so another worker can take over."""
+    from backend.app import stop_background_ingestion
+    stop_background_ingestion()
@@ -8,10 +8,14 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
 # Now import and run the app
-from backend.app import app
+from backend.app import create_app, start_background_ingestion
 
 if __name__ == '__main__':
     print(f"Starting application in {os.getcwd()}")
+    app = create_app()
+    # Only the reloader child serves requests; avoid polling from both processes
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_ingestion()
     app.run(
         host='0.0.0.0',
         port=5000,
@@ -0,0 +1,388 @@
+"""Tests for the Flask API in app module."""
+import gzip
+import json
+import os
+import subprocess
+import sys
+import pytest
+from backend import app as app_module
+from backend.broadcast import SnapshotBroadcaster
+from backend.cache import SnapshotCache
+from backend.candles import CandleAggregator
+from backend.ranking import RankIndexer
+from backend.serialization import ResponseCache
+from backend.storage import HistoryStore
+from backend.warm_start import LastGoodSnapshot
+
+
+def make_data(**prices):
+    """Build a transformed snapshot with the given prices."""
+    return {
+        'timestamp': '2026-01-01T00:00:00',
+        'source': 'CoinGecko',
+        'cryptos': [
+            {'id': crypto_id, 'name': crypto_id.title(), 'price_usd': price}
+            for crypto_id, price in prices.items()
+        ],
+        'summary': {'total_count': len(prices), 'valid_count': len(prices),
+                    'null_count': 0, 'errors': [], 'data_quality_score': 100.0}
+    }
+
+
+class TestApi:
+    """Test cases for the REST endpoints."""
+
+    @pytest.fixture
+    def client(self, monkeypatch, tmp_path):
+        """Flask test client with a fresh cache and no disk persistence."""
+        monkeypatch.setattr(app_module.current_config, 'HISTORY_ENABLED', False)
+        monkeypatch.setattr(app_module, 'last_snapshot', LastGoodSnapshot(str(tmp_path / 'last_snapshot.json')))
+        monkeypatch.setattr(
+            app_module, 'snapshot_cache',
+            SnapshotCache(ttl=60, on_publish=app_module._fan_out)
+        )
+        monkeypatch.setattr(app_module, 'response_cache', ResponseCache())
+        monkeypatch.setattr(app_module, 'query_cache', ResponseCache(max_entries=4))
+        return app_module.app.test_client()
+
+    def test_data_etag_and_304(self, client):
+        """Test /api/data answers 304 when the client's ETag is current."""
+        app_module.publish_snapshot(make_data(bitcoin=1.0))
+
+        first = client.get('/api/data')
+        etag = first.headers['ETag']
+        second = client.get('/api/data', headers={'If-None-Match': etag})
+
+        assert first.status_code == 200
+        assert first.json['version'] == 1
+        assert second.status_code == 304
+        assert second.data == b''
+
+    def test_data_etag_changes_with_version(self, client):
+        """Test a new snapshot invalidates the previous ETag."""
+        app_module.publish_snapshot(make_data(bitcoin=1.0))
+        etag = client.get('/api/data').headers['ETag']
+        app_module.publish_snapshot(make_data(bitcoin=2.0))
+
+        response = client.get('/api/data', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.json['version'] == 2
+
+    def test_data_since_returns_changed_records(self, client):
+        """Test ?since= returns only records changed after that version."""
+        app_module.publish_snapshot(make_data(bitcoin=1.0, ethereum=2.0, solana=3.0))
+        app_module.publish_snapshot(make_data(bitcoin=1.0, ethereum=2.5))
+
+        response = client.get('/api/data?since=1')
+
+        assert response.json['since'] == 1
+        assert [c['id'] for c in response.json['data']['cryptos']] == ['ethereum']
+        assert response.json['removed'] == ['solana']
+
+    def test_data_since_from_future_returns_full_snapshot(self, client):
+        """Test an unknown future version falls back to the full snapshot."""
+        app_module.publish_snapshot(make_data(bitcoin=1.0))
+
+        response = client.get('/api/data?since=99')
+
+        assert 'since' not in response.json
+        assert len(response.json['data']['cryptos']) == 1
+
+    def test_refresh_etag_and_304(self, client):
+        """Test /api/refresh honors If-None-Match for a fresh cache."""
+        app_module.publish_snapshot(make_data(bitcoin=1.0))
+
+        first = client.get('/api/refresh')
+        second = client.get('/api/refresh', headers={'If-None-Match': first.headers['ETag']})
+
+        assert first.status_code == 200
+        assert second.status_code == 304
+
+    def test_data_served_gzip_when_accepted(self, client):
+        """Test large bodies are served precompressed per Accept-Encoding."""
+        app_module.publish_snapshot(make_data(**{f'coin{i}': float(i) for i in range(100)}))
+
+        response = client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+        revalidated = client.get('/api/data', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']
+        })
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert json.loads(gzip.decompress(response.data))['version'] == 1
+        assert revalidated.status_code == 304
+
+    def test_data_body_serialized_once_per_version(self, client, monkeypatch):
+        """Test repeated requests reuse the body serialized at publish time."""
+        calls = []
+        original = app_module.data_payload
+        monkeypatch.setattr(app_module, 'data_payload', lambda *args: calls.append(1) or original(*args))
+        app_module.publish_snapshot(make_data(bitcoin=1.0))
+
+        for _ in range(3):
+            assert client.get('/api/data').status_code == 200
+
+        assert len(calls) == 1
+
+    def test_metrics_endpoint_exposes_route_counters(self, client, monkeypatch):
+        """Test /api/metrics renders request counters and histograms in Prometheus format."""
+        monkeypatch.setattr(app_module, 'metrics', app_module.MetricsRegistry())
+        app_module.publish_snapshot(make_data(bitcoin=1.0))
+        client.get('/api/data')
+
+        response = client.get('/api/metrics')
+        text = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert 'streaming_http_requests_total{route="/api/data",status="200"} 1' in text
+        assert 'streaming_http_request_seconds_count{route="/api/data"} 1' in text
+
+    def test_follower_serves_mirrored_snapshot(self, client, tmp_path, monkeypatch):
+        """Test a follower adopts the leader's shared body and serves it unchanged."""
+        from backend.shared_snapshot import SharedSnapshotFile
+        from backend.serialization import dumps
+        leader_body = dumps({
+            'data': make_data(bitcoin=3.0), 'version': 9, 'last_update': None,
+            'stats': {'update_count': 9, 'error_count': 0}
+        })
+        shared = SharedSnapshotFile(str(tmp_path / 'snapshot.shm'), slot_capacity=4096)
+        shared.write(9, {'identity': leader_body}, update_count=9)
+
+        app_module._mirror_shared_snapshot(shared.read())
+        response = client.get('/api/data')
+
+        assert response.data == leader_body
+        assert response.headers['ETag'] == '"9-0"'
+        assert app_module.snapshot_cache.get().version == 9
+
+    def test_follower_receives_quotes(self, client, tmp_path):
+        """Test quote rows published by the leader reach the follower's ?vs= view."""
+        from backend.shared_snapshot import SharedSnapshotFile
+        from backend.serialization import dumps
+        leader_body = dumps({
+            'data': make_data(bitcoin=3.0), 'version': 4, 'last_update': None,
+            'stats': {'update_count': 4, 'error_count': 0}
+        })
+        quotes = {'jpy': {'cryptos': [{'id': 'bitcoin', 'price_jpy': 450.0}], 'summary': {'valid_count': 1}}}
+        shared = SharedSnapshotFile(str(tmp_path / 'snapshot.shm'), slot_capacity=4096)
+        shared.write(4, {'identity': leader_body, 'quotes': dumps(quotes)}, update_count=4)
+
+        app_module._mirror_shared_snapshot(shared.read())
+
+        assert client.get('/api/data').data == leader_body
+        assert client.get('/api/data?vs=jpy').get_json()['data']['cryptos'] == quotes['jpy']['cryptos']
+
+    def test_published_snapshot_is_served_after_restart(self, client, monkeypatch):
+        """Test warm start serves the persisted body, with its ETag, before any refresh."""
+        app_module.publish_snapshot(make_data(bitcoin=1.0))
+        before = client.get('/api/data')
+        assert app_module.last_snapshot.flush(timeout=5)
+
+        # A new process: empty caches, same persisted file
+        monkeypatch.setattr(app_module, 'snapshot_cache', SnapshotCache(ttl=60, on_publish=app_module._fan_out))
+        monkeypatch.setattr(app_module, 'response_cache', ResponseCache())
+        app_module.warm_start()
+        after = client.get('/api/data')
+
+        assert after.data == before.data
+        assert after.headers['ETag'] == before.headers['ETag']
+        assert not app_module.snapshot_cache.get().is_fresh()
+        assert app_module.publish_snapshot(make_data(bitcoin=2.0)).version == 2
+
+
+    def test_currency_view_cached_separately(self, client):
+        """Test ?vs= serves the quote rows under their own ETag, built once per version."""
+        data = make_data(bitcoin=45000.0)
+        data['quotes'] = {'eur': {
+            'cryptos': [{'id': 'bitcoin', 'name': 'Bitcoin', 'price_eur': 41000.0}],
+            'summary': dict(data['summary'])
+        }}
+        app_module.publish_snapshot(data)
+
+        usd = client.get('/api/data')
+        eur = client.get('/api/data?vs=EUR')
+        again = client.get('/api/data?vs=eur', headers={'If-None-Match': eur.headers['ETag']})
+
+        assert 'quotes' not in usd.get_json()['data']
+        assert eur.get_json()['currency'] == 'eur'
+        assert eur.get_json()['data']['cryptos'] == [{'id': 'bitcoin', 'name': 'Bitcoin', 'price_eur': 41000.0}]
+        assert eur.headers['ETag'] != usd.headers['ETag']
+        assert again.status_code == 304
+        assert app_module.response_cache.get_status()['entries'] == 2
+
+    def test_unsupported_currency_rejected(self, client):
+        """Test a currency outside VS_CURRENCIES is a 400."""
+        response = client.get('/api/data?vs=xyz')
+
+        assert response.status_code == 400
+        assert 'usd' in response.get_json()['supported']
+
+    def test_stream_rejected_at_capacity(self, client, monkeypatch):
+        """Test /api/stream answers 503 instead of pinning another thread past SSE_MAX_CLIENTS."""
+        broadcaster = SnapshotBroadcaster(max_clients=1)
+        monkeypatch.setattr(app_module, 'broadcaster', broadcaster)
+        held = broadcaster.stream()
+        next(held)
+
+        response = client.get('/api/stream')
+        held.close()
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '5'
+
+    def test_history_step_is_clamped_to_max_points(self, client, monkeypatch, tmp_path):
+        """Test a tiny ?step= cannot return more than HISTORY_MAX_POINTS raw rows."""
+        store = HistoryStore(str(tmp_path / 'history.db'))
+        store.insert_rows(('bitcoin', float(t), 1.0, None, None, None) for t in range(0, 3600, 10))
+        monkeypatch.setattr(app_module, 'history_store', store)
+        monkeypatch.setattr(app_module.current_config, 'HISTORY_MAX_POINTS', 60)
+
+        tiny = client.get('/api/history?id=bitcoin&from=0&to=3600&step=0.001').get_json()
+        coarse = client.get('/api/history?id=bitcoin&from=0&to=3600&step=600').get_json()
+
+        assert tiny['step'] == 60
+        assert len(tiny['points']) == 60
+        assert coarse['step'] == 600
+        assert len(coarse['points']) == 6
+
+    @pytest.mark.parametrize('param,value', [
+        ('step', 'inf'), ('step', 'nan'), ('to', 'inf'), ('from', 'nan'), ('from', '-inf')
+    ])
+    def test_history_rejects_non_finite_parameters(self, client, monkeypatch, tmp_path, param, value):
+        """Test inf and NaN in the range or step are a 400, not a 500 or invalid JSON."""
+        store = HistoryStore(str(tmp_path / 'history.db'))
+        monkeypatch.setattr(app_module, 'history_store', store)
+        params = {'id': 'bitcoin', 'from': '0', 'to': '3600', param: value}
+
+        response = client.get('/api/history', query_string=params)
+
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+    def test_candles_from_memory_and_history(self, client, monkeypatch, tmp_path):
+        """Test /api/candles serves open and sealed candles, backfilling older ones from SQLite."""
+        store = HistoryStore(str(tmp_path / 'history.db'))
+        monkeypatch.setattr(app_module, 'history_store', store)
+        monkeypatch.setattr(app_module, 'candle_aggregator', CandleAggregator(['1m', '1h']))
+        store.enqueue_candles([('bitcoin', '1m', 1767225540.0, 9.0, 9.0, 9.0, 9.0, None, 1)])
+        store.flush()
+        for minute, price in enumerate([10.0, 11.0]):
+            data = make_data(bitcoin=price)
+            data['timestamp'] = f"2026-01-01T00:0{minute}:00"
+            app_module.publish_snapshot(data)
+
+        memory_only = client.get('/api/candles?id=BITCOIN&interval=1m&limit=2').get_json()
+        monkeypatch.setattr(app_module.current_config, 'HISTORY_ENABLED', True)
+        backfilled = client.get('/api/candles?id=bitcoin&interval=1m&limit=5').get_json()
+        store.stop(timeout=2)
+
+        assert [(c['open'], c['closed']) for c in memory_only['candles']] == [(10.0, True), (11.0, False)]
+        assert [c['open'] for c in backfilled['candles']] == [9.0, 10.0, 11.0]
+
+    def test_top_and_query_served_from_index(self, client, monkeypatch):
+        """Test /api/top and /api/query slice one index per version and cache each body."""
+        monkeypatch.setattr(app_module, 'rank_indexer', RankIndexer())
+        app_module.publish_snapshot(make_data(bitcoin=45000.0, ethereum=3000.0, solana=100.0, cardano=0.5))
+
+        top = client.get('/api/top?by=price_usd&n=2')
+        again = client.get('/api/top?by=price_usd&n=2', headers={'If-None-Match': top.headers['ETag']})
+        query = client.get('/api/query?by=price_usd&min=1&max=5000&order=desc&limit=1').get_json()
+
+        assert [c['id'] for c in top.get_json()['cryptos']] == ['bitcoin', 'ethereum']
+        assert again.status_code == 304
+        assert [c['id'] for c in query['cryptos']] == ['ethereum']
+        assert query['total'] == 2
+        assert app_module.rank_indexer.build_count == 1
+
+    def test_query_sweep_keeps_data_cached(self, client, monkeypatch):
+        """Test many distinct /api/query bounds do not evict the /api/data and /api/top bodies."""
+        monkeypatch.setattr(app_module, 'rank_indexer', RankIndexer())
+        monkeypatch.setattr(app_module, 'response_cache', ResponseCache(max_entries=4))
+        app_module.publish_snapshot(make_data(bitcoin=45000.0, ethereum=3000.0))
+        client.get('/api/data')
+        client.get('/api/top?by=price_usd')
+        misses = app_module.response_cache.misses
+
+        for low in range(100):
+            client.get(f'/api/query?by=price_usd&min={low}.5')
+        client.get('/api/data')
+        client.get('/api/top?by=price_usd')
+
+        assert app_module.response_cache.misses == misses
+        assert app_module.query_cache.get_status()['entries'] == 4
+
+    def test_ranking_rejects_bad_requests(self, client, monkeypatch):
+        """Test unknown fields and orders are a 400 and a missing snapshot a 503."""
+        monkeypatch.setattr(app_module, 'rank_indexer', RankIndexer())
+
+        assert client.get('/api/top?by=name').status_code == 400
+        assert client.get('/api/query?by=price_usd&order=up').status_code == 400
+        assert client.get('/api/query?by=price_usd&min=abc').status_code == 400
+        assert client.get('/api/top').status_code == 503
+
+    def test_export_streams_history(self, client, monkeypatch, tmp_path):
+        """Test /api/export streams rows from the store as a chunked attachment."""
+        store = HistoryStore(str(tmp_path / 'history.db'))
+        store.insert_rows([('bitcoin', 60.0, 1.0, None, None, None), ('solana', 60.0, 2.0, None, None, None)])
+        monkeypatch.setattr(app_module, 'history_store', store)
+
+        response = client.get('/api/export?from=0&to=600&ids=BITCOIN')
+        rejected = client.get('/api/export?format=xml')
+
+        assert response.is_streamed
+        assert response.mimetype == 'application/x-ndjson'
+        assert 'attachment' in response.headers['Content-Disposition']
+        assert [json.loads(line)['crypto_id'] for line in response.data.splitlines()] == ['bitcoin']
+        assert rejected.status_code == 400
+
+    @pytest.mark.parametrize('param,value', [('to', 'inf'), ('to', 'nan'), ('from', '-inf')])
+    def test_export_rejects_non_finite_range(self, client, monkeypatch, tmp_path, param, value):
+        """Test inf and NaN bounds are a 400 before the filename or query is built."""
+        monkeypatch.setattr(app_module, 'history_store', HistoryStore(str(tmp_path / 'history.db')))
+        params = {'from': '0', 'to': '600', param: value}
+
+        response = client.get('/api/export', query_string=params)
+
+        assert response.status_code == 400
+        assert 'not a finite timestamp' in response.get_json()['error']
+
+    def test_candles_rejects_bad_requests(self, client):
+        """Test unknown intervals are a 400 and unknown coins a 404."""
+        assert client.get('/api/candles?id=bitcoin&interval=2m').status_code == 400
+        assert client.get('/api/candles?interval=1m').status_code == 400
+        assert client.get('/api/candles?id=nocoin&interval=1m').status_code == 404
+
+def test_import_has_no_side_effects():
+    """Test importing backend.app builds nothing and defers requests, NumPy and SQLite."""
+    code = (
+        "import sys, backend.app as m; "
+        "print('app' in vars(m), "
+        "*(name in sys.modules for name in ('requests', 'numpy', 'sqlite3', 'backend.storage')))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+
+    assert output.stdout.split() == ['False'] * 5
+
+
+def test_build_ingester_for_sources(monkeypatch):
+    """Test one source is used directly and several are wrapped in a HedgedIngester."""
+    from backend.coincap import CoinCapIngester
+    from backend.hedging import HedgedIngester
+
+    monkeypatch.setattr(app_module.current_config, 'MARKET_DATA_SOURCES', ['coincap'])
+    single = app_module._build_ingester(None)
+    monkeypatch.setattr(app_module.current_config, 'MARKET_DATA_SOURCES', ['coingecko', 'coincap'])
+    hedged = app_module._build_ingester(None)
+    monkeypatch.setattr(app_module.current_config, 'MARKET_DATA_SOURCES', ['nosuchsource'])
+    with pytest.raises(ValueError):
+        app_module._build_ingester(None)
+
+    assert isinstance(single, CoinCapIngester)
+    assert isinstance(hedged, HedgedIngester)
+    assert [provider.name for provider in hedged.providers] == ['coingecko', 'coincap']
+    assert hedged.rate_limiter is None
+    single.close()
+    hedged.close()
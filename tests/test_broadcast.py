@@ -0,0 +1,72 @@
+"""Tests for broadcast module."""
+import threading
+import pytest
+from backend.broadcast import HEARTBEAT, SnapshotBroadcaster
+
+
+class TestSnapshotBroadcaster:
+    """Test cases for SnapshotBroadcaster."""
+
+    @pytest.fixture
+    def broadcaster(self):
+        """Create broadcaster with a short heartbeat."""
+        broadcaster = SnapshotBroadcaster(heartbeat_interval=0.05, retry_ms=1000)
+        yield broadcaster
+        broadcaster.close()
+
+    def test_new_client_gets_latest_snapshot(self, broadcaster):
+        """Test a client connecting after publish receives the current event."""
+        broadcaster.publish(3, {'data': {'cryptos': []}})
+        stream = broadcaster.stream()
+
+        assert next(stream) == b'retry: 1000\n\n'
+        assert next(stream) == b'id: 3\nevent: snapshot\ndata: {"data":{"cryptos":[]}}\n\n'
+        assert broadcaster.client_count == 1
+        stream.close()
+        assert broadcaster.client_count == 0
+
+    def test_reconnect_with_last_event_id_skips_seen_version(self, broadcaster):
+        """Test a client that already has the latest version only gets heartbeats."""
+        broadcaster.publish(3, {'data': None})
+        stream = broadcaster.stream(last_event_id='3')
+        next(stream)
+
+        assert next(stream) == HEARTBEAT
+        stream.close()
+
+    def test_events_are_serialized_once_and_shared(self, broadcaster):
+        """Test every client receives the identical bytes object."""
+        first = broadcaster.stream(last_event_id='1')
+        second = broadcaster.stream(last_event_id='1')
+        next(first)
+        next(second)
+        threading.Timer(0.01, broadcaster.publish, args=(2, {'data': 'x'})).start()
+
+        frames = [next(first), next(second)]
+        while HEARTBEAT in frames:
+            frames = [next(first) if frames[0] == HEARTBEAT else frames[0],
+                      next(second) if frames[1] == HEARTBEAT else frames[1]]
+
+        assert frames[0] is frames[1]
+        first.close()
+        second.close()
+
+    def test_close_ends_streams(self, broadcaster):
+        """Test closing the broadcaster terminates open streams."""
+        stream = broadcaster.stream()
+        next(stream)
+        broadcaster.close()
+
+        assert list(stream) == []
+
+    def test_max_clients_limits_new_streams(self):
+        """Test streams beyond max_clients are refused until one disconnects."""
+        broadcaster = SnapshotBroadcaster(heartbeat_interval=0.05, max_clients=1)
+        stream = broadcaster.stream()
+        next(stream)
+
+        assert broadcaster.has_capacity() is False
+        stream.close()
+        assert broadcaster.has_capacity() is True
+        assert broadcaster.get_status()['rejected'] == 1
+        broadcaster.close()
@@ -0,0 +1,132 @@
+"""Tests for cache module."""
+import threading
+import time
+import dataclasses
+import pytest
+from backend.cache import Snapshot, SingleFlight, SnapshotCache
+
+
+class TestSnapshotCache:
+    """Test cases for SnapshotCache and SingleFlight."""
+
+    @pytest.fixture
+    def snapshot_cache(self):
+        """Create cache instance for testing."""
+        return SnapshotCache(ttl=60)
+
+    def test_snapshot_is_immutable(self, snapshot_cache):
+        """Test published snapshots cannot be modified in place."""
+        snapshot = snapshot_cache.publish({'cryptos': []})
+
+        assert snapshot.update_count == 1
+        assert snapshot.is_fresh()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snapshot.update_count = 5
+
+    def test_concurrent_refresh_calls_loader_once(self, snapshot_cache):
+        """Test concurrent callers on an expired cache coalesce into one fetch."""
+        calls = []
+        release = threading.Event()
+
+        def loader():
+            calls.append(1)
+            release.wait(2)
+            return {'cryptos': []}
+
+        outcomes = []
+        threads = [
+            threading.Thread(target=lambda: outcomes.append(snapshot_cache.get_or_refresh(loader)[1]))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(2)
+
+        assert len(calls) == 1
+        assert len(outcomes) == 8
+        assert set(outcomes) <= {'refreshed', 'shared', 'hit'}
+        assert snapshot_cache.get().update_count == 1
+
+    def test_failed_refresh_records_error(self, snapshot_cache):
+        """Test a loader returning None increments the error count."""
+        snapshot, outcome = snapshot_cache.get_or_refresh(lambda: None)
+
+        assert outcome == 'failed'
+        assert snapshot.data is None
+        assert snapshot.error_count == 1
+
+    def test_stale_while_revalidate(self, snapshot_cache):
+        """Test stale data is returned immediately while refreshing in background."""
+        snapshot_cache.ttl = 0
+        snapshot_cache.publish({'version': 'old'})
+        snapshot_cache.ttl = 60
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return {'version': 'new'}
+
+        snapshot, outcome = snapshot_cache.get_or_refresh(loader, stale_while_revalidate=True)
+
+        assert outcome == 'stale'
+        assert snapshot.data == {'version': 'old'}
+        assert refreshed.wait(2)
+        for _ in range(50):
+            if snapshot_cache.get().data == {'version': 'new'}:
+                break
+            time.sleep(0.01)
+        assert snapshot_cache.get().data == {'version': 'new'}
+
+    def test_single_flight_propagates_errors(self):
+        """Test the leader's exception is raised and the flight is cleared."""
+        flight = SingleFlight()
+
+        def boom():
+            raise ValueError("upstream failed")
+
+        with pytest.raises(ValueError):
+            flight.do(boom)
+        assert flight.in_flight is False
+        assert flight.do(lambda: 42) == (42, False)
+
+    def test_empty_snapshot_is_not_fresh(self):
+        """Test a default snapshot is treated as expired."""
+        assert Snapshot().is_fresh() is False
+
+    def test_unchanged_loader_result_only_renews_ttl(self, snapshot_cache):
+        """Test returning the current data object does not republish."""
+        published = []
+        snapshot_cache.on_publish = lambda snapshot: published.append(snapshot.data)
+        snapshot_cache.ttl = 0
+        data = {'cryptos': []}
+        snapshot_cache.publish(data)
+        snapshot_cache.ttl = 60
+
+        snapshot, outcome = snapshot_cache.get_or_refresh(lambda: data)
+
+        assert outcome == 'refreshed'
+        assert snapshot.is_fresh()
+        assert snapshot.update_count == 1
+        assert published == [data]
+
+    def test_restore_serves_persisted_data_as_expired(self, snapshot_cache):
+        """Test a restored snapshot is readable, expired, and continues its version."""
+        published = []
+        snapshot_cache.on_publish = published.append
+        data = {'cryptos': [{'id': 'bitcoin', 'price_usd': 1.0}]}
+
+        restored = snapshot_cache.restore(data, version=7, update_count=7, error_count=2)
+
+        assert snapshot_cache.get().data is data
+        assert not restored.is_fresh()
+        assert published == []
+        assert snapshot_cache.publish({'cryptos': []}).version == 8
+
+    def test_restore_never_replaces_live_data(self, snapshot_cache):
+        """Test restore is ignored once a snapshot has been published."""
+        live = snapshot_cache.publish({'cryptos': []})
+
+        assert snapshot_cache.restore({'cryptos': []}, version=99) is live
@@ -0,0 +1,78 @@
+"""Tests for candles module."""
+import pytest
+from backend.candles import CandleAggregator
+
+
+def make_snapshot(**prices):
+    """Build a minimal transformed snapshot."""
+    return {
+        'cryptos': [
+            {'id': crypto_id, 'price_usd': price, 'volume_24h_usd': price * 1000}
+            for crypto_id, price in prices.items()
+        ]
+    }
+
+
+class TestCandleAggregator:
+    """Test cases for CandleAggregator."""
+
+    def test_ticks_update_open_candle(self):
+        """Test ticks in one bucket update high, low, close and volume."""
+        aggregator = CandleAggregator(['1m'])
+        for offset, price in enumerate([10.0, 12.0, 9.0, 11.0]):
+            assert aggregator.ingest(make_snapshot(bitcoin=price), 60.0 + offset * 10) == []
+
+        [candle] = aggregator.candles('bitcoin', '1m', 10)
+
+        assert candle == {'start': 60, 'open': 10.0, 'high': 12.0, 'low': 9.0, 'close': 11.0,
+                          'volume': 11000.0, 'ticks': 4, 'closed': False}
+
+    def test_bucket_boundary_seals_candle(self):
+        """Test the first tick of a new bucket seals and returns the previous candle."""
+        aggregator = CandleAggregator(['1m', '5m'])
+        aggregator.ingest(make_snapshot(bitcoin=10.0, ethereum=1.0), 0.0)
+        aggregator.ingest(make_snapshot(bitcoin=11.0, ethereum=2.0), 30.0)
+
+        sealed = aggregator.ingest(make_snapshot(bitcoin=12.0, ethereum=3.0), 60.0)
+
+        assert sealed == [
+            ('bitcoin', '1m', 0, 10.0, 11.0, 10.0, 11.0, 11000.0, 2),
+            ('ethereum', '1m', 0, 1.0, 2.0, 1.0, 2.0, 2000.0, 2)
+        ]
+        candles = aggregator.candles('bitcoin', '1m', 10)
+        assert [(c['start'], c['closed']) for c in candles] == [(0, True), (60, False)]
+        assert aggregator.candles('bitcoin', '5m', 10)[0]['ticks'] == 3
+
+    def test_window_is_bounded(self):
+        """Test only the configured number of sealed candles stay in memory."""
+        aggregator = CandleAggregator(['1m'], window=3)
+        for minute in range(10):
+            aggregator.ingest(make_snapshot(bitcoin=float(minute)), minute * 60.0)
+
+        candles = aggregator.candles('bitcoin', '1m', 100)
+
+        assert [c['open'] for c in candles] == [6.0, 7.0, 8.0, 9.0]
+        assert [c['open'] for c in aggregator.candles('bitcoin', '1m', 2)] == [8.0, 9.0]
+        assert aggregator.get_status()['sealed'] == 9
+
+    def test_late_ticks_are_ignored(self):
+        """Test ticks older than the open candle do not reopen sealed buckets."""
+        aggregator = CandleAggregator(['1m'])
+        aggregator.ingest(make_snapshot(bitcoin=10.0), 120.0)
+
+        aggregator.ingest(make_snapshot(bitcoin=99.0), 30.0)
+
+        assert aggregator.candles('bitcoin', '1m', 10)[0]['high'] == 10.0
+        assert aggregator.get_status()['late_ticks'] == 1
+
+    def test_missing_price_and_unknown_crypto(self):
+        """Test records without a price are skipped."""
+        aggregator = CandleAggregator(['1m'])
+        aggregator.ingest({'cryptos': [{'id': 'bitcoin', 'price_usd': None}]}, 0.0)
+
+        assert aggregator.candles('bitcoin', '1m', 10) is None
+
+    def test_unknown_interval_rejected(self):
+        """Test unsupported intervals fail fast."""
+        with pytest.raises(ValueError):
+            CandleAggregator(['2m'])
@@ -0,0 +1,37 @@
+"""Tests for circuit_breaker module."""
+from unittest.mock import patch
+from backend.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the breaker and a success resets the count."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+
+        assert breaker.state == 'closed'
+        breaker.record_failure()
+        assert breaker.state == 'open'
+        assert breaker.allow() is False
+        assert 59 < breaker.retry_in() <= 60
+
+    def test_half_open_trial(self):
+        """Test the cool-down leads to one trial; failure reopens with a longer timeout."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with patch('backend.circuit_breaker.time.monotonic', return_value=100.0):
+            breaker.record_failure()
+        with patch('backend.circuit_breaker.time.monotonic', return_value=111.0):
+            assert breaker.state == 'half_open'
+            assert breaker.allow() is True
+            breaker.record_failure()
+            assert breaker.retry_in() == 20.0
+        with patch('backend.circuit_breaker.time.monotonic', return_value=132.0):
+            breaker.record_success()
+
+        assert breaker.state == 'closed'
+        assert breaker.get_status()['open_count'] == 2
@@ -0,0 +1,112 @@
+"""Tests for coincap module."""
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from backend.coincap import CoinCapIngester, normalize_assets
+
+ASSETS = {
+    'bitcoin': {'id': 'bitcoin', 'priceUsd': '45000.5', 'marketCapUsd': '850000000000',
+                'volumeUsd24Hr': '25000000000', 'changePercent24Hr': '2.5'},
+    'ethereum': {'id': 'ethereum', 'priceUsd': '3000', 'marketCapUsd': None,
+                 'volumeUsd24Hr': '15000000000', 'changePercent24Hr': '-1.2'}
+}
+
+
+@pytest.fixture
+def stub():
+    """Serve CoinCap's /assets from a local HTTP server."""
+    state = {'status': 200, 'requests': []}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            state['requests'].append({'path': url.path, 'query': parse_qs(url.query), 'headers': dict(self.headers)})
+            if state['status'] == 429:
+                self.send_response(429)
+                self.send_header('Retry-After', '30')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            ids = parse_qs(url.query).get('ids', [''])[0].split(',')
+            body = json.dumps({'data': [ASSETS[i] for i in ids if i in ASSETS], 'timestamp': 0}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}", state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestCoinCapIngester:
+    """Test cases for CoinCapIngester against a local stub server."""
+
+    def test_normalize_assets(self):
+        """Test CoinCap string fields map onto the CoinGecko USD fields."""
+        data = normalize_assets([ASSETS['bitcoin'], {'id': 'bad', 'priceUsd': 'n/a'}, {'priceUsd': '1'}])
+
+        assert data['bitcoin'] == {
+            'usd': 45000.5, 'usd_market_cap': 850000000000.0,
+            'usd_24h_vol': 25000000000.0, 'usd_24h_change': 2.5
+        }
+        assert data['bad']['usd'] is None
+        assert len(data) == 2
+
+    def test_fetch_market_data(self, stub):
+        """Test a fetch returns a CoinGecko-shaped payload with metadata."""
+        url, state = stub
+        ingester = CoinCapIngester(url, ['bitcoin', 'ethereum'], api_key='secret')
+
+        data = ingester.fetch_market_data()
+        ingester.close()
+
+        assert data['bitcoin']['usd'] == 45000.5
+        assert data['ethereum']['usd_market_cap'] is None
+        assert data['_metadata']['source'] == 'CoinCap'
+        assert data['_metadata']['status'] == 'success'
+        assert set(data['_metadata']['coin_fingerprints']) == {'bitcoin', 'ethereum'}
+        assert state['requests'][0]['path'] == '/assets'
+        assert state['requests'][0]['headers']['Authorization'] == 'Bearer secret'
+
+    def test_chunks_and_duplicates(self, stub):
+        """Test ids are split into chunks and a repeated payload is flagged duplicate."""
+        url, state = stub
+        ingester = CoinCapIngester(url, ['bitcoin', 'ethereum'], chunk_size=1)
+
+        first = ingester.fetch_market_data()
+        second = ingester.fetch_market_data()
+        ingester.close()
+
+        assert ingester.calls_per_fetch == 2
+        assert len(state['requests']) == 4
+        assert set(first) == {'bitcoin', 'ethereum', '_metadata'}
+        assert second['_metadata']['status'] == 'duplicate'
+
+    def test_rate_limited(self, stub):
+        """Test a 429 honours Retry-After and later fetches are skipped."""
+        url, state = stub
+        state['status'] = 429
+        ingester = CoinCapIngester(url, ['bitcoin'])
+
+        assert ingester.fetch_market_data() is None
+        assert ingester.fetch_market_data() is None
+        ingester.close()
+
+        assert len(state['requests']) == 1
+        assert 29 < ingester.retry_after_remaining() <= 30
+        status = ingester.get_status()
+        assert status['status'] == 'rate_limited'
+        assert status['skipped_fetch_count'] == 1
+        assert status['error_count'] == 1
@@ -0,0 +1,59 @@
+"""Tests for delta module."""
+from backend.delta import ChangeIndex, delta_data
+
+
+def make_data(**prices):
+    """Build a transformed snapshot with the given prices."""
+    return {
+        'timestamp': '2026-01-01T00:00:00',
+        'cryptos': [
+            {'id': crypto_id, 'name': crypto_id.title(), 'price_usd': price,
+             'transformed_at': '2026-01-01T00:00:00'}
+            for crypto_id, price in prices.items()
+        ],
+        'summary': {}
+    }
+
+
+class TestChangeIndex:
+    """Test cases for ChangeIndex."""
+
+    def test_tracks_last_changed_version(self):
+        """Test only records whose fields changed are attributed to a version."""
+        index = ChangeIndex().advance(make_data(bitcoin=1.0, ethereum=2.0), 1)
+        index = index.advance(make_data(bitcoin=1.0, ethereum=2.5), 2)
+
+        assert index.changed == {'bitcoin': 1, 'ethereum': 2}
+        assert index.changed_since(1) == ['ethereum']
+        assert index.changed_since(0) == ['bitcoin', 'ethereum']
+
+    def test_ignores_transformed_at(self):
+        """Test a new transformed_at alone is not a change."""
+        first = make_data(bitcoin=1.0)
+        second = make_data(bitcoin=1.0)
+        second['cryptos'][0]['transformed_at'] = '2026-01-01T00:01:00'
+
+        index = ChangeIndex().advance(first, 1).advance(second, 2)
+
+        assert index.changed_since(1) == []
+
+    def test_tracks_removed_records(self):
+        """Test ids that disappear are reported as removed."""
+        index = ChangeIndex().advance(make_data(bitcoin=1.0, solana=3.0), 1)
+        index = index.advance(make_data(bitcoin=1.0), 2)
+
+        assert index.removed_since(1) == ['solana']
+        assert index.removed_since(2) == []
+        assert 'solana' not in index.changed
+
+    def test_delta_data(self):
+        """Test delta snapshots keep only changed records."""
+        index = ChangeIndex().advance(make_data(bitcoin=1.0, ethereum=2.0), 1)
+        data = make_data(bitcoin=1.5, ethereum=2.0)
+        index = index.advance(data, 2)
+
+        delta = delta_data(data, index, since=1)
+
+        assert [c['id'] for c in delta['cryptos']] == ['bitcoin']
+        assert delta['timestamp'] == data['timestamp']
+        assert len(data['cryptos']) == 2
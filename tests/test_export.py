@@ -0,0 +1,92 @@
+"""Tests for export module and the export.py command line tool."""
+import json
+import pytest
+from backend.export import export_chunks
+from backend.storage import HistoryStore, export_sql
+import export as export_cli
+
+
+class TestExport:
+    """Test cases for streaming history export."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Store holding two coins with three ticks each."""
+        store = HistoryStore(str(tmp_path / 'history.db'))
+        store.insert_rows(
+            (crypto_id, float(t), float(t), None, 1e9, -0.5)
+            for t in (0, 60, 120) for crypto_id in ('ethereum', 'bitcoin')
+        )
+        return store
+
+    def test_ndjson_streams_in_batches(self, store):
+        """Test NDJSON is yielded one chunk per batch, ordered by time then coin."""
+        chunks = list(export_chunks(store, 0, 120, batch_size=2))
+        records = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+
+        assert len(chunks) == 2
+        assert [(r['crypto_id'], r['timestamp']) for r in records] == [
+            ('bitcoin', '1970-01-01T00:00:00+00:00'), ('ethereum', '1970-01-01T00:00:00+00:00'),
+            ('bitcoin', '1970-01-01T00:01:00+00:00'), ('ethereum', '1970-01-01T00:01:00+00:00')
+        ]
+        assert records[0]['market_cap_usd'] is None
+
+    def test_csv_with_id_filter(self, store):
+        """Test CSV has a header and only the requested ids."""
+        text = b''.join(export_chunks(store, 0, 600, ['ethereum'], 'csv')).decode()
+        lines = text.splitlines()
+
+        assert lines[0] == 'crypto_id,timestamp,price_usd,market_cap_usd,volume_24h_usd,change_24h_percent'
+        assert lines[1] == 'ethereum,1970-01-01T00:00:00+00:00,0.0,,1000000000.0,-0.5'
+        assert len(lines) == 4
+
+    def test_export_query_streams_from_index(self, store):
+        """Test neither export order makes SQLite sort the whole range first."""
+        conn = store._connect()
+        plan_all = ' | '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + export_sql(), [0, 120]))
+        plan_ids = ' | '.join(
+            row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + export_sql(['bitcoin']), [0, 120, 'bitcoin'])
+        )
+        conn.close()
+
+        assert 'idx_ticks_time' in plan_all
+        assert 'USE TEMP B-TREE FOR ORDER BY' not in plan_all
+        assert 'idx_ticks_crypto_time' in plan_ids
+        assert 'TEMP B-TREE' not in plan_ids
+
+    def test_unknown_format_rejected(self, store):
+        """Test unsupported formats fail before any query runs."""
+        with pytest.raises(ValueError):
+            export_chunks(store, 0, 60, fmt='xml')
+
+    def test_cli_writes_file(self, store, tmp_path):
+        """Test the command line tool exports a range to a file."""
+        output = tmp_path / 'ticks.csv'
+
+        code = export_cli.main([
+            '--db', store.db_path, '--from', '0', '--to', '600', '--ids', 'bitcoin',
+            '--format', 'csv', '-o', str(output)
+        ])
+
+        assert code == 0
+        assert output.read_text().count('bitcoin') == 3
+
+    def test_cli_rejects_empty_range(self, store, tmp_path, capsys):
+        """Test an inverted or empty range exits with 2 and writes nothing."""
+        output = tmp_path / 'ticks.csv'
+
+        assert export_cli.main(['--db', store.db_path, '--from', '600', '--to', '0', '-o', str(output)]) == 2
+        assert export_cli.main(['--db', store.db_path, '--from', '60', '--to', '60']) == 2
+        assert '--to must be after --from' in capsys.readouterr().err
+        assert not output.exists()
+
+    def test_cli_rejects_non_finite_range(self, store, capsys):
+        """Test inf and NaN bounds exit with 2 instead of raising."""
+        assert export_cli.main(['--db', store.db_path, '--from', '0', '--to', 'inf']) == 2
+        assert export_cli.main(['--db', store.db_path, '--from', 'nan', '--to', '600']) == 2
+        assert 'not a finite timestamp' in capsys.readouterr().err
+
+    def test_cli_missing_database(self, tmp_path):
+        """Test a missing database is reported instead of created."""
+        assert export_cli.main(['--db', str(tmp_path / 'missing.db')]) == 1
+        assert not (tmp_path / 'missing.db').exists()
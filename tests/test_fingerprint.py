@@ -0,0 +1,65 @@
+"""Tests for fingerprint module."""
+from backend.fingerprint import PayloadFingerprinter, coin_fingerprint
+
+
+class TestCoinFingerprint:
+    """Test cases for coin_fingerprint."""
+
+    def test_key_order_does_not_matter(self):
+        """Test equal records hash equally regardless of key order."""
+        assert coin_fingerprint({'usd': 1.0, 'usd_market_cap': 2.0}) == \
+            coin_fingerprint({'usd_market_cap': 2.0, 'usd': 1.0})
+
+    def test_unhashable_values_fall_back(self):
+        """Test records with unhashable values still fingerprint."""
+        assert coin_fingerprint({'usd': [1, 2]}) == coin_fingerprint({'usd': [1, 2]})
+        assert coin_fingerprint('invalid') == coin_fingerprint('invalid')
+
+    def test_hash_collisions_are_distinct(self):
+        """Test values whose hash() collides still get different fingerprints."""
+        assert hash(-1.0) == hash(-2.0)
+        assert coin_fingerprint({'usd_24h_change': -1.0}) != coin_fingerprint({'usd_24h_change': -2.0})
+
+
+class TestPayloadFingerprinter:
+    """Test cases for PayloadFingerprinter."""
+
+    def test_duplicate_payload_detected(self):
+        """Test a repeated payload is flagged and _metadata is ignored."""
+        fingerprinter = PayloadFingerprinter()
+        first = fingerprinter.observe({'bitcoin': {'usd': 1}, '_metadata': {'timestamp': 'a'}})
+        second = fingerprinter.observe({'bitcoin': {'usd': 1}, '_metadata': {'timestamp': 'b'}})
+
+        assert first[2] is False
+        assert second[2] is True
+        assert first[0] == second[0]
+        assert set(second[1]) == {'bitcoin'}
+
+    def test_changed_coin_counts(self):
+        """Test per-coin duplicates are counted when the payload changes."""
+        fingerprinter = PayloadFingerprinter()
+        fingerprinter.observe({'bitcoin': {'usd': 1}, 'ethereum': {'usd': 2}})
+        _, coins, duplicate = fingerprinter.observe({'bitcoin': {'usd': 1}, 'ethereum': {'usd': 3}})
+
+        assert duplicate is False
+        status = fingerprinter.get_status()
+        assert status['payloads'] == 2
+        assert status['duplicate_payloads'] == 0
+        assert status['duplicate_coins'] == 1
+        assert status['duplicate_coin_rate'] == 25.0
+
+    def test_hash_collision_is_not_a_duplicate(self):
+        """Test a changed value with a colliding hash is neither a duplicate payload nor coin."""
+        fingerprinter = PayloadFingerprinter()
+        _, first, _ = fingerprinter.observe({'bitcoin': {'usd': 1.0, 'usd_24h_change': -1.0}})
+        _, second, duplicate = fingerprinter.observe({'bitcoin': {'usd': 1.0, 'usd_24h_change': -2.0}})
+
+        assert duplicate is False
+        assert first['bitcoin'] != second['bitcoin']
+        assert fingerprinter.get_status()['duplicate_coins'] == 0
+
+    def test_status_before_observation(self):
+        """Test rates are None before any payload."""
+        status = PayloadFingerprinter().get_status()
+        assert status['duplicate_payload_rate'] is None
+        assert status['duplicate_coin_rate'] is None
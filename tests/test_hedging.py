@@ -0,0 +1,247 @@
+"""Tests for hedging module."""
+import json
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from backend.coincap import CoinCapIngester
+from backend.data_ingestion import CoinGeckoIngester
+from backend.hedging import HedgedIngester, LatencyWindow, merge_payloads
+from backend.providers import MarketDataProvider
+
+
+class FakeProvider(MarketDataProvider):
+    """Provider answering with a fixed payload after a delay."""
+
+    def __init__(self, name, payload, delay=0.0, source=None):
+        self.name = name
+        self.payload = payload
+        self.delay = delay
+        self.source = source or name
+        self.calls = 0
+        self.retry_after = 0.0
+
+    def fetch_market_data(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.payload is None:
+            return None
+        data = {crypto_id: dict(fields) for crypto_id, fields in self.payload.items()}
+        data['_metadata'] = {'timestamp': '2026-01-01T00:00:00', 'source': self.source, 'status': 'success'}
+        return data
+
+    def retry_after_remaining(self):
+        return self.retry_after
+
+    def get_status(self):
+        return {'calls': self.calls}
+
+
+class TestLatencyWindow:
+    """Test cases for LatencyWindow."""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles over the most recent samples only."""
+        window = LatencyWindow(size=100)
+        assert window.percentile(95) is None
+        for ms in range(1, 201):
+            window.add(ms / 1000)
+
+        assert len(window) == 100
+        assert window.percentile(50) == pytest.approx(0.150)
+        assert window.percentile(95) == pytest.approx(0.195)
+        assert window.get_status()['p95_ms'] == 195.0
+
+
+class TestMergePayloads:
+    """Test cases for merge_payloads."""
+
+    def test_first_answer_wins_and_gaps_are_filled(self):
+        """Test per-coin merge: precedence for the first payload, missing coins and fields filled."""
+        merged = merge_payloads([
+            {'bitcoin': {'usd': 45000, 'usd_market_cap': None, 'eur': 41000}, '_metadata': {}},
+            {'bitcoin': {'usd': 45010, 'usd_market_cap': 8.5e11}, 'ethereum': {'usd': 3000}, '_metadata': {}}
+        ])
+
+        assert merged == {
+            'bitcoin': {'usd': 45000, 'usd_market_cap': 8.5e11, 'eur': 41000},
+            'ethereum': {'usd': 3000}
+        }
+
+
+class TestHedgedIngester:
+    """Test cases for HedgedIngester with fake providers."""
+
+    def test_fast_primary_no_hedge(self):
+        """Test a primary answering before the hedge delay is the only call."""
+        primary = FakeProvider('a', {'bitcoin': {'usd': 1.0}})
+        backup = FakeProvider('b', {'bitcoin': {'usd': 2.0}})
+        ingester = HedgedIngester([primary, backup], hedge_delay=0.5)
+
+        data = ingester.fetch_market_data()
+        ingester.close()
+
+        assert data['bitcoin']['usd'] == 1.0
+        assert data['_metadata']['source'] == 'a'
+        assert backup.calls == 0
+        assert ingester.hedges_fired == 0
+
+    def test_slow_primary_is_hedged(self):
+        """Test the backup fires after the hedge delay and its answer is used first."""
+        primary = FakeProvider('a', {'bitcoin': {'usd': 1.0}}, delay=0.5)
+        backup = FakeProvider('b', {'bitcoin': {'usd': 2.0}})
+        ingester = HedgedIngester([primary, backup], hedge_delay=0.05, merge_wait=0)
+
+        started = time.perf_counter()
+        data = ingester.fetch_market_data()
+        elapsed = time.perf_counter() - started
+        ingester.close()
+
+        assert data['bitcoin']['usd'] == 2.0
+        assert data['_metadata']['source'] == 'b'
+        assert elapsed < 0.4
+        assert ingester.hedges_fired == 1
+        assert ingester.hedges_won == 1
+
+    def test_failed_primary_hedges_immediately(self):
+        """Test a failed primary triggers the backup without waiting for the delay."""
+        primary = FakeProvider('a', None)
+        backup = FakeProvider('b', {'bitcoin': {'usd': 2.0}})
+        ingester = HedgedIngester([primary, backup], hedge_delay=5.0, timeout=2.0)
+
+        started = time.perf_counter()
+        data = ingester.fetch_market_data()
+        ingester.close()
+
+        assert data['bitcoin']['usd'] == 2.0
+        assert time.perf_counter() - started < 1.0
+        # Failures count as timeout-length samples, demoting the failed source
+        assert ingester.latency['a'].percentile(95) == 2.0
+        assert ingester.ranked()[0] is backup
+
+    def test_both_answers_are_merged(self):
+        """Test answers arriving within merge_wait are merged per coin."""
+        primary = FakeProvider('a', {'bitcoin': {'usd': 1.0, 'eur': 0.9}}, delay=0.1, source='CoinGecko')
+        backup = FakeProvider('b', {'bitcoin': {'usd': 2.0, 'usd_market_cap': 5.0}, 'dogecoin': {'usd': 0.1}},
+                              delay=0.1, source='CoinCap')
+        ingester = HedgedIngester([primary, backup], hedge_delay=0.01, merge_wait=1.0)
+
+        data = ingester.fetch_market_data()
+        ingester.close()
+
+        assert data['_metadata']['source'] == 'CoinGecko+CoinCap'
+        assert data['bitcoin'] == {'usd': 1.0, 'eur': 0.9, 'usd_market_cap': 5.0}
+        assert data['dogecoin'] == {'usd': 0.1}
+        assert ingester.merged_count == 1
+
+    def test_percentiles_pick_primary(self):
+        """Test the source with the lower p95 latency becomes the primary."""
+        slow = FakeProvider('slow', {'bitcoin': {'usd': 1.0}})
+        fast = FakeProvider('fast', {'bitcoin': {'usd': 2.0}})
+        ingester = HedgedIngester([slow, fast], hedge_delay=1.0)
+        for _ in range(10):
+            ingester.latency['slow'].add(0.8)
+            ingester.latency['fast'].add(0.1)
+
+        data = ingester.fetch_market_data()
+        ingester.close()
+
+        assert data['_metadata']['source'] == 'fast'
+        assert slow.calls == 0
+        assert ingester.get_status()['primary'] == 'fast'
+
+    def test_adaptive_hedge_delay(self):
+        """Test the hedge delay follows the primary's p95 when not configured."""
+        primary = FakeProvider('a', {})
+        ingester = HedgedIngester([primary, FakeProvider('b', {})], default_hedge_delay=0.7)
+        assert ingester._hedge_delay(primary) == 0.7
+        ingester.latency['a'].add(0.2)
+        assert ingester._hedge_delay(primary) == 0.2
+        ingester.close()
+
+    def test_rate_limited_and_busy_sources_are_skipped(self):
+        """Test sources backing off are not called; with none left the fetch is skipped."""
+        primary = FakeProvider('a', {'bitcoin': {'usd': 1.0}})
+        backup = FakeProvider('b', {'bitcoin': {'usd': 2.0}})
+        primary.retry_after = 30.0
+        ingester = HedgedIngester([primary, backup])
+
+        assert ingester.fetch_market_data()['_metadata']['source'] == 'b'
+        assert primary.calls == 0
+        assert ingester.retry_after_remaining() == 0.0
+
+        backup.retry_after = 10.0
+        assert ingester.fetch_market_data() is None
+        assert ingester.retry_after_remaining() == 10.0
+        assert ingester.skipped_fetch_count == 1
+        ingester.close()
+
+    def test_duplicate_and_timeout(self):
+        """Test an identical merged payload is a duplicate and no answer within the timeout is a failure."""
+        provider = FakeProvider('a', {'bitcoin': {'usd': 1.0}})
+        ingester = HedgedIngester([provider], timeout=0.2)
+
+        assert ingester.fetch_market_data()['_metadata']['status'] == 'success'
+        assert ingester.fetch_market_data()['_metadata']['status'] == 'duplicate'
+
+        provider.delay = 0.5
+        assert ingester.fetch_market_data() is None
+        assert ingester.error_count == 1
+        ingester.close()
+
+
+class TestHedgedStubServers:
+    """Hedged fetch across a slow CoinGecko stub and a fast CoinCap stub."""
+
+    @pytest.fixture
+    def servers(self):
+        """Serve /simple/price slowly and /assets quickly from local HTTP servers."""
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if self.path.startswith('/simple/price'):
+                    time.sleep(0.4)
+                    body = {'bitcoin': {'usd': 45000, 'eur': 41000}}
+                else:
+                    body = {'data': [
+                        {'id': 'bitcoin', 'priceUsd': '45010', 'marketCapUsd': '850000000000',
+                         'volumeUsd24Hr': None, 'changePercent24Hr': '1.5'},
+                        {'id': 'ethereum', 'priceUsd': '3000', 'marketCapUsd': None,
+                         'volumeUsd24Hr': None, 'changePercent24Hr': None}
+                    ]}
+                encoded = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, *args):
+                pass
+
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{httpd.server_port}"
+        httpd.shutdown()
+        httpd.server_close()
+
+    def test_hedge_then_merge(self, servers):
+        """Test CoinCap answers first after the hedge delay and CoinGecko's answer is merged in."""
+        ingester = HedgedIngester([
+            CoinGeckoIngester(servers, ['bitcoin', 'ethereum']),
+            CoinCapIngester(servers, ['bitcoin', 'ethereum'])
+        ], hedge_delay=0.05, merge_wait=1.0)
+
+        data = ingester.fetch_market_data()
+        status = ingester.get_status()
+        ingester.close()
+
+        assert data['_metadata']['source'] == 'CoinCap+CoinGecko'
+        assert data['bitcoin']['usd'] == 45010.0
+        assert data['bitcoin']['eur'] == 41000
+        assert data['ethereum']['usd'] == 3000.0
+        assert status['hedges_won'] == 1
+        assert status['primary'] == 'coincap'
+        assert status['sources']['coingecko']['latency']['samples'] == 1
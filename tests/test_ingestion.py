@@ -1,7 +1,12 @@
 """Tests for data_ingestion module."""
+import json
+import threading
+import time
 import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, Mock
-from backend.data_ingestion import CoinGeckoIngester
+from backend.data_ingestion import CoinGeckoIngester, parse_retry_after
+from backend.rate_limiter import TokenBucket
 
 
 class TestCoinGeckoIngester:
@@ -15,7 +20,7 @@ class TestCoinGeckoIngester:
             cryptos=['bitcoin', 'ethereum', 'cardano']
         )
     
-    @patch('backend.data_ingestion.requests.get')
+    @patch('backend.data_ingestion.requests.Session.get')
     def test_fetch_market_data_success(self, mock_get, ingester):
         """Test successful data fetch."""
         mock_response = Mock()
@@ -34,7 +39,7 @@ class TestCoinGeckoIngester:
         assert result['bitcoin']['usd'] == 45000
         assert ingester.error_count == 0
     
-    @patch('backend.data_ingestion.requests.get')
+    @patch('backend.data_ingestion.requests.Session.get')
     def test_fetch_market_data_failure(self, mock_get, ingester):
         """Test data fetch failure."""
         mock_get.side_effect = Exception("Network error")
@@ -54,7 +59,7 @@ class TestCoinGeckoIngester:
         assert 'status' in status
         assert status['monitored_cryptos'] == 3
     
-    @patch('backend.data_ingestion.requests.get')
+    @patch('backend.data_ingestion.requests.Session.get')
     def test_error_recovery(self, mock_get, ingester):
         """Test that error count resets on successful fetch."""
         # First, simulate a failure
@@ -72,3 +77,274 @@ class TestCoinGeckoIngester:
         result = ingester.fetch_market_data()
         assert result is not None
         assert ingester.error_count == 0
+    
+    @patch('backend.data_ingestion.requests.Session.get')
+    def test_fetch_splits_ids_into_chunks(self, mock_get):
+        """Test large id lists are fetched in chunks and merged."""
+        ingester = CoinGeckoIngester(
+            api_url="https://api.coingecko.com/api/v3",
+            cryptos=[f"coin{i}" for i in range(5)],
+            chunk_size=2
+        )
+        
+        def respond(endpoint, params, **kwargs):
+            response = Mock(status_code=200, headers={})
+            response.json.return_value = {i: {'usd': 1.0} for i in params['ids'].split(',')}
+            return response
+        mock_get.side_effect = respond
+        
+        result = ingester.fetch_market_data()
+        ingester.close()
+        
+        assert mock_get.call_count == 3
+        assert sorted(k for k in result if k != '_metadata') == [f"coin{i}" for i in range(5)]
+        assert result['_metadata']['status'] == 'success'
+    
+    @patch('backend.data_ingestion.requests.Session.get')
+    def test_all_currencies_in_one_request(self, mock_get):
+        """Test every quote currency is requested in the same upstream call."""
+        ingester = CoinGeckoIngester(
+            api_url="https://api.coingecko.com/api/v3",
+            cryptos=['bitcoin'],
+            vs_currencies=['usd', 'eur', 'jpy']
+        )
+        mock_get.return_value = Mock(status_code=200, headers={})
+        mock_get.return_value.json.return_value = {'bitcoin': {'usd': 1.0, 'eur': 0.9, 'jpy': 150.0}}
+        
+        result = ingester.fetch_market_data()
+        
+        assert mock_get.call_count == 1
+        assert mock_get.call_args.kwargs['params']['vs_currencies'] == 'usd,eur,jpy'
+        assert result['bitcoin']['eur'] == 0.9
+    
+    @patch('backend.data_ingestion.requests.Session.get')
+    def test_failed_chunk_keeps_successful_chunks(self, mock_get):
+        """Test one failing chunk does not discard the others."""
+        ingester = CoinGeckoIngester(
+            api_url="https://api.coingecko.com/api/v3",
+            cryptos=['bitcoin', 'ethereum', 'cardano'],
+            chunk_size=1
+        )
+        
+        def respond(endpoint, params, **kwargs):
+            if params['ids'] == 'ethereum':
+                raise Exception("Network error")
+            response = Mock(status_code=200, headers={})
+            response.json.return_value = {params['ids']: {'usd': 1.0}}
+            return response
+        mock_get.side_effect = respond
+        
+        result = ingester.fetch_market_data()
+        ingester.close()
+        
+        assert set(result) == {'bitcoin', 'cardano', '_metadata'}
+        assert result['_metadata']['status'] == 'partial'
+        assert ingester.failed_chunk_count == 1
+        assert ingester.error_count == 0
+    
+    @patch('backend.data_ingestion.requests.Session.get')
+    def test_rate_limited_fetch_returns_none(self, mock_get, ingester):
+        """Test a 429 response counts as a failed fetch."""
+        mock_get.return_value = Mock(status_code=429)
+        
+        assert ingester.fetch_market_data() is None
+        assert ingester.error_count == 1
+    
+    @patch('backend.data_ingestion.requests.Session.get')
+    def test_retry_after_is_honored(self, mock_get, ingester):
+        """Test no request is sent until Retry-After has passed."""
+        mock_get.return_value = Mock(status_code=429, headers={'Retry-After': '120'})
+        
+        assert ingester.fetch_market_data() is None
+        assert ingester.fetch_market_data() is None
+        
+        assert mock_get.call_count == 1
+        assert ingester.error_count == 1
+        assert 119 < ingester.retry_after_remaining() <= 120
+        assert ingester.get_status()['status'] == 'rate_limited'
+    
+    def test_parse_retry_after(self):
+        """Test delta-seconds and HTTP dates are both understood."""
+        assert parse_retry_after('30') == 30.0
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(None) is None
+    
+    @patch('backend.data_ingestion.requests.Session.get')
+    def test_identical_payload_marked_duplicate(self, mock_get, ingester):
+        """Test a repeated upstream payload is reported as a duplicate."""
+        mock_response = Mock()
+        mock_response.json.side_effect = lambda: {'bitcoin': {'usd': 45000}, 'ethereum': {'usd': 2500}}
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        
+        first = ingester.fetch_market_data()
+        second = ingester.fetch_market_data()
+        
+        assert first['_metadata']['status'] == 'success'
+        assert second['_metadata']['status'] == 'duplicate'
+        assert second['_metadata']['coin_fingerprints'] == first['_metadata']['coin_fingerprints']
+        assert ingester.get_status()['fingerprints']['duplicate_payloads'] == 1
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket."""
+    
+    def test_burst_then_exhausted(self):
+        """Test the bucket allows a burst up to capacity, then refuses."""
+        bucket = TokenBucket(calls_per_minute=60, capacity=2)
+        
+        assert bucket.try_acquire() is True
+        assert bucket.try_acquire() is True
+        assert bucket.try_acquire() is False
+    
+    def test_acquire_times_out(self):
+        """Test acquire gives up when the wait exceeds the timeout."""
+        bucket = TokenBucket(calls_per_minute=1, capacity=1)
+        bucket.try_acquire()
+        
+        assert bucket.acquire(timeout=0.01) is False
+    
+    def test_wait_time(self):
+        """Test the time until a token refills is reported."""
+        bucket = TokenBucket(calls_per_minute=60, capacity=1)
+        
+        assert bucket.wait_time() == 0.0
+        bucket.try_acquire()
+        assert 0.9 < bucket.wait_time() <= 1.0
+    
+    def test_acquire_waits_for_refill(self):
+        """Test acquire blocks until a token is refilled."""
+        bucket = TokenBucket(calls_per_minute=6000, capacity=1)
+        bucket.try_acquire()
+        
+        assert bucket.acquire(timeout=1) is True
+    
+    def test_shared_limiter_is_consulted(self):
+        """Test the ingester skips chunks when no token is available."""
+        bucket = TokenBucket(calls_per_minute=1, capacity=1)
+        bucket.try_acquire()
+        ingester = CoinGeckoIngester(
+            api_url="https://api.coingecko.com/api/v3",
+            cryptos=['bitcoin'],
+            rate_limiter=bucket,
+            rate_limit_timeout=0.01
+        )
+        
+        with patch('backend.data_ingestion.requests.Session.get') as mock_get:
+            assert ingester.fetch_market_data() is None
+            mock_get.assert_not_called()
+
+
+class TestConditionalFetch:
+    """Test cases for pooled sessions and conditional GET against a local server."""
+    
+    @pytest.fixture
+    def server(self):
+        """Serve /simple/price with an ETag from a local HTTP server."""
+        requests_seen = []
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                requests_seen.append(dict(self.headers))
+                if self.headers.get('If-None-Match') == '"v1"':
+                    self.send_response(304)
+                    self.send_header('ETag', '"v1"')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = json.dumps({'bitcoin': {'usd': 45000}}).encode()
+                self.send_response(200)
+                self.send_header('ETag', '"v1"')
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{httpd.server_port}", requests_seen
+        httpd.shutdown()
+        httpd.server_close()
+    
+    def test_304_reuses_previous_payload(self, server):
+        """Test a matching ETag yields not_modified without re-parsing."""
+        url, requests_seen = server
+        ingester = CoinGeckoIngester(api_url=url, cryptos=['bitcoin'])
+        
+        first = ingester.fetch_market_data()
+        second = ingester.fetch_market_data()
+        ingester.close()
+        
+        assert first['_metadata']['status'] == 'success'
+        assert second['_metadata']['status'] == 'not_modified'
+        assert second['bitcoin'] == {'usd': 45000}
+        assert requests_seen[1]['If-None-Match'] == '"v1"'
+        assert ingester.not_modified_count == 1
+    
+    def test_timing_exposed_in_status(self, server):
+        """Test connect/TTFB/parse timings are reported and connections are reused."""
+        url, _ = server
+        ingester = CoinGeckoIngester(api_url=url, cryptos=['bitcoin'])
+        
+        ingester.fetch_market_data()
+        first = ingester.get_status()['last_fetch_timing']
+        ingester.fetch_market_data()
+        second = ingester.get_status()['last_fetch_timing']
+        ingester.close()
+        
+        assert set(first) == {'connect_ms', 'ttfb_ms', 'download_ms', 'parse_ms', 'total_ms'}
+        assert first['connect_ms'] > 0
+        assert second['connect_ms'] == 0  # keep-alive connection reused
+        assert second['parse_ms'] == 0  # 304 skips parsing
+    
+    def test_session_has_retry_policy(self):
+        """Test the default session mounts an adapter with retries."""
+        ingester = CoinGeckoIngester(api_url="https://api.coingecko.com/api/v3", cryptos=['bitcoin'])
+        
+        adapter = ingester.session.get_adapter("https://api.coingecko.com")
+        
+        assert adapter.max_retries.total == 3
+        assert 503 in adapter.max_retries.status_forcelist
+        assert 429 not in adapter.max_retries.status_forcelist
+        assert adapter.max_retries.respect_retry_after_header is False
+    
+    def test_429_with_retry_after_returns_immediately(self):
+        """Test a 429 is not slept through by the session but sets the ingester's back-off."""
+        requests_seen = []
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                requests_seen.append(self.path)
+                self.send_response(429)
+                self.send_header('Retry-After', '30')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            
+            def log_message(self, *args):
+                pass
+        
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            ingester = CoinGeckoIngester(api_url=f"http://127.0.0.1:{httpd.server_port}", cryptos=['bitcoin'])
+            started = time.perf_counter()
+            assert ingester.fetch_market_data() is None
+            elapsed = time.perf_counter() - started
+            ingester.close()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+        
+        assert elapsed < 5
+        assert len(requests_seen) == 1
+        assert 29 < ingester.retry_after_remaining() <= 30
@@ -0,0 +1,62 @@
+"""Tests for metrics module."""
+import threading
+from backend.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry."""
+
+    def test_counters_and_histograms_render(self):
+        """Test counters and cumulative histogram buckets in the text format."""
+        metrics = MetricsRegistry(buckets=(0.1, 1.0))
+        metrics.inc('upstream_rate_limited_total')
+        metrics.inc('upstream_rate_limited_total')
+        metrics.observe('transform_seconds', 0.05, path='scalar')
+        metrics.observe('transform_seconds', 0.5, path='scalar')
+        metrics.observe('transform_seconds', 5.0, path='scalar')
+
+        text = metrics.render()
+
+        assert '# TYPE streaming_upstream_rate_limited_total counter' in text
+        assert 'streaming_upstream_rate_limited_total 2' in text
+        assert '# TYPE streaming_transform_seconds histogram' in text
+        assert 'streaming_transform_seconds_bucket{path="scalar",le="0.1"} 1' in text
+        assert 'streaming_transform_seconds_bucket{path="scalar",le="1.0"} 2' in text
+        assert 'streaming_transform_seconds_bucket{path="scalar",le="+Inf"} 3' in text
+        assert 'streaming_transform_seconds_count{path="scalar"} 3' in text
+
+    def test_detailed_timing_off_keeps_counters(self):
+        """Test histograms are skipped when detailed timing is disabled."""
+        metrics = MetricsRegistry(detailed_timing=False)
+        metrics.inc('upstream_errors_total')
+        metrics.observe('transform_seconds', 0.01)
+        with metrics.timer('quality_check_seconds'):
+            pass
+
+        assert metrics.value('upstream_errors_total') == 1
+        assert metrics.value('transform_seconds') is None
+        assert metrics.value('quality_check_seconds') is None
+
+    def test_thread_shards_are_summed_and_retired(self):
+        """Test values recorded by finished threads survive aggregation."""
+        metrics = MetricsRegistry()
+
+        def work():
+            for _ in range(100):
+                metrics.inc('http_requests_total', route='/api/data', status='200')
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert metrics.value('http_requests_total', route='/api/data', status='200') == 800
+        assert metrics.get_status()['threads'] == 0
+
+    def test_label_values_are_escaped(self):
+        """Test quotes in label values are escaped."""
+        metrics = MetricsRegistry()
+        metrics.inc('http_requests_total', route='a"b')
+
+        assert 'route="a\\"b"' in metrics.render()
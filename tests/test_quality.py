@@ -0,0 +1,116 @@
+"""Tests for quality module."""
+import pytest
+from backend.config import DevelopmentConfig
+from backend.quality import QualityEngine
+from backend.transformations import DataTransformer
+
+
+def make_snapshot(prices, null_count=0, volume=1.0):
+    """Build a transformed snapshot for the given id -> price mapping."""
+    cryptos = [
+        {'id': crypto_id, 'price_usd': price, 'market_cap_usd': 1.0,
+         'volume_24h_usd': volume, 'change_24h_percent': 0.0}
+        for crypto_id, price in prices.items()
+    ]
+    return {
+        'cryptos': cryptos,
+        'summary': {
+            'total_count': len(cryptos) + null_count,
+            'valid_count': len(cryptos),
+            'null_count': null_count,
+            'errors': []
+        }
+    }
+
+
+class TestQualityEngine:
+    """Test cases for QualityEngine."""
+
+    @pytest.fixture
+    def engine(self):
+        """Create engine with the development thresholds."""
+        return QualityEngine(DevelopmentConfig, window=5)
+
+    def test_clean_snapshots_raise_no_alerts(self, engine):
+        """Test steady, distinct ticks produce no alerts."""
+        for i in range(5):
+            snapshot = make_snapshot({'bitcoin': 100.0 + i}, volume=float(i))
+            assert engine.evaluate(snapshot) == []
+            assert snapshot['summary']['errors'] == []
+
+    def test_null_rate_alert(self, engine):
+        """Test a null rate above MAX_NULL_PERCENTAGE is reported."""
+        snapshot = make_snapshot({'bitcoin': 100.0}, null_count=1)
+
+        alerts = engine.evaluate(snapshot)
+
+        assert [a['check'] for a in alerts] == ['null_rate']
+        assert snapshot['summary']['errors'] == alerts
+
+    def test_duplicate_rate_alert(self, engine):
+        """Test repeated identical ticks push the duplicate rate over threshold."""
+        engine.evaluate(make_snapshot({'bitcoin': 100.0, 'ethereum': 10.0}))
+
+        alerts = engine.evaluate(make_snapshot({'bitcoin': 100.0, 'ethereum': 10.0}))
+
+        assert [a['check'] for a in alerts] == ['duplicate_rate']
+        assert engine.duplicate_rate > DevelopmentConfig.DUPLICATE_THRESHOLD
+
+    def test_skipped_duplicate_payloads_raise_duplicate_alert(self, engine):
+        """Test payloads skipped before transformation still count toward the duplicate rate."""
+        engine.evaluate(make_snapshot({'bitcoin': 100.0, 'ethereum': 10.0}))
+        assert engine.duplicate_rate == 0
+
+        alerts = engine.record_duplicate_payload()
+
+        assert [a['check'] for a in alerts] == ['duplicate_rate']
+        assert engine.duplicate_rate > DevelopmentConfig.DUPLICATE_THRESHOLD
+        assert engine.get_status()['duplicate_payloads'] == 1
+        assert engine.alert_count == 1
+
+    def test_price_jump_alert(self, engine):
+        """Test a move above MAX_PRICE_CHANGE_PERCENTAGE is flagged per coin."""
+        engine.evaluate(make_snapshot({'bitcoin': 100.0, 'ethereum': 10.0}, volume=1.0))
+
+        alerts = engine.evaluate(make_snapshot({'bitcoin': 130.0, 'ethereum': 10.5}, volume=2.0))
+
+        assert len(alerts) == 1
+        assert alerts[0]['check'] == 'price_jump'
+        assert alerts[0]['id'] == 'bitcoin'
+        assert alerts[0]['value'] == 30.0
+
+    def test_zscore_flags_unusual_move_below_limit(self):
+        """Test a move far outside a coin's usual returns is flagged before the hard limit."""
+        engine = QualityEngine(DevelopmentConfig, window=20, min_samples=5)
+        price = 100.0
+        for i in range(20):
+            price *= 1.001 if i % 2 else 0.999
+            engine.evaluate(make_snapshot({'bitcoin': price}, volume=float(i)))
+
+        alerts = engine.evaluate(make_snapshot({'bitcoin': price * 1.05}, volume=99.0))
+
+        assert [a['check'] for a in alerts] == ['price_jump']
+        assert 'z=' in alerts[0]['message']
+
+    def test_status_reports_timings(self, engine):
+        """Test per-check costs are exposed."""
+        engine.evaluate(make_snapshot({'bitcoin': 100.0}))
+
+        status = engine.get_status()
+
+        assert status['evaluations'] == 1
+        assert set(status['check_timings']) == set(QualityEngine.CHECKS)
+        assert status['tracked_cryptos'] == 1
+
+    def test_transformer_runs_engine(self, engine):
+        """Test DataTransformer records alerts in summary['errors']."""
+        transformer = DataTransformer(DevelopmentConfig, quality_engine=engine)
+        raw_data = {
+            'bitcoin': {'usd': 45000},
+            'ethereum': {'usd_market_cap': 1},
+            '_metadata': {'timestamp': '2026-01-01T00:00:00', 'source': 'CoinGecko'}
+        }
+
+        result = transformer.transform_market_data(raw_data)
+
+        assert [e['check'] for e in result['summary']['errors']] == ['null_rate']
@@ -0,0 +1,65 @@
+"""Tests for ranking module."""
+from backend.cache import Snapshot
+from backend.ranking import RankIndex, RankIndexer
+
+
+def make_cryptos():
+    """Crypto records with one missing change value."""
+    return [
+        {'id': 'bitcoin', 'price_usd': 45000.0, 'change_24h_percent': 2.0},
+        {'id': 'ethereum', 'price_usd': 3000.0, 'change_24h_percent': -1.0},
+        {'id': 'cardano', 'price_usd': 0.5, 'change_24h_percent': None},
+        {'id': 'solana', 'price_usd': 100.0, 'change_24h_percent': 8.0}
+    ]
+
+
+class TestRankIndex:
+    """Test cases for RankIndex."""
+
+    def test_top_descending_and_ascending(self):
+        """Test top-n in either order skips records without a value."""
+        index = RankIndex(1, make_cryptos())
+
+        assert [c['id'] for c in index.top('change_24h_percent', 2)] == ['solana', 'bitcoin']
+        assert [c['id'] for c in index.top('change_24h_percent', 10, descending=False)] == \
+            ['ethereum', 'bitcoin', 'solana']
+
+    def test_range_bounds_are_inclusive(self):
+        """Test range filters use inclusive bounds and report the total."""
+        index = RankIndex(1, make_cryptos())
+
+        cryptos, total = index.range('price_usd', 100.0, 3000.0)
+
+        assert [c['id'] for c in cryptos] == ['solana', 'ethereum']
+        assert total == 2
+
+    def test_range_limit_keeps_order(self):
+        """Test a limited range keeps the smallest (or largest) matches."""
+        index = RankIndex(1, make_cryptos())
+
+        ascending, total = index.range('price_usd', low=1.0, limit=2)
+        descending, _ = index.range('price_usd', high=50000.0, limit=2, descending=True)
+
+        assert [c['id'] for c in ascending] == ['solana', 'ethereum']
+        assert total == 3
+        assert [c['id'] for c in descending] == ['bitcoin', 'ethereum']
+
+
+class TestRankIndexer:
+    """Test cases for RankIndexer."""
+
+    def test_index_built_once_per_version(self):
+        """Test repeated lookups of one version reuse the same index."""
+        indexer = RankIndexer()
+        snapshot = Snapshot(data={'cryptos': make_cryptos()}, version=3)
+
+        first = indexer.index_for(snapshot)
+
+        assert indexer.index_for(snapshot) is first
+        assert indexer.build_count == 1
+        assert indexer.index_for(Snapshot(data={'cryptos': []}, version=4)).version == 4
+        assert indexer.get_status()['version'] == 4
+
+    def test_no_data_has_no_index(self):
+        """Test an empty snapshot yields no index."""
+        assert RankIndexer().index_for(Snapshot()) is None
@@ -0,0 +1,53 @@
+"""Tests for records module."""
+import pytest
+from backend.records import CryptoRecord, quote_record_class
+
+
+class TestCryptoRecord:
+    """Test cases for CryptoRecord."""
+
+    @pytest.fixture
+    def record(self):
+        """Create a record for testing."""
+        return CryptoRecord('bitcoin', 'Bitcoin', 45000.0, 8.8e11, 2.5e10, 1.5, '2026-01-01T00:00:00')
+
+    def test_dict_style_access(self, record):
+        """Test records read like the dict rows they replace."""
+        assert record['price_usd'] == 45000.0
+        assert record.get('volume_24h_usd') == 2.5e10
+        assert record.get('missing', 'default') == 'default'
+        assert 'name' in record
+        with pytest.raises(KeyError):
+            record['missing']
+
+    def test_to_dict_matches_json_format(self, record):
+        """Test to_dict yields the API row format in field order."""
+        assert list(record.to_dict()) == [
+            'id', 'name', 'price_usd', 'market_cap_usd', 'volume_24h_usd',
+            'change_24h_percent', 'transformed_at'
+        ]
+        assert record == record.to_dict()
+
+    def test_records_have_no_instance_dict(self, record):
+        """Test records are slotted."""
+        assert not hasattr(record, '__dict__')
+
+
+class TestQuoteRecord:
+    """Test cases for per-currency quote rows."""
+
+    def test_fields_carry_the_currency(self):
+        """Test a quote row reads and serializes with currency-suffixed names."""
+        record = quote_record_class('eur')('bitcoin', 'Bitcoin', 41000.0, 8.1e11, 2.3e10, 1.5, 't')
+
+        assert list(record.to_dict()) == [
+            'id', 'name', 'price_eur', 'market_cap_eur', 'volume_24h_eur',
+            'change_24h_percent', 'transformed_at'
+        ]
+        assert record['price_eur'] == 41000.0
+        assert record.get('price_usd') is None
+        assert quote_record_class('eur') is type(record)
+
+    def test_usd_is_crypto_record(self):
+        """Test the USD row class is CryptoRecord itself."""
+        assert quote_record_class('usd') is CryptoRecord
@@ -0,0 +1,100 @@
+"""Tests for replay module."""
+import gzip
+import os
+import time
+import pytest
+from unittest.mock import ANY
+from backend.replay import ReplayIngester, SegmentRecorder, iter_records, list_segments
+
+
+def make_raw(price, status='success'):
+    """Build a raw payload as returned by fetch_market_data."""
+    return {
+        'bitcoin': {'usd': price},
+        '_metadata': {'timestamp': '2026-01-01T00:00:00', 'source': 'CoinGecko', 'status': status}
+    }
+
+
+class TestRecordReplay:
+    """Test cases for SegmentRecorder and ReplayIngester."""
+
+    @pytest.fixture
+    def directory(self, tmp_path):
+        """Recording directory."""
+        return str(tmp_path / 'recordings')
+
+    def test_recorder_rotates_segments(self, directory):
+        """Test records are split into gzip segments of max_records lines."""
+        recorder = SegmentRecorder(directory, max_records=2)
+        for price in (1.0, 2.0, 3.0):
+            recorder.record(make_raw(price), {'total_ms': 5.0})
+        recorder.close()
+
+        segments = list_segments(directory)
+        records = list(iter_records(segments))
+        assert len(segments) == 2
+        assert [r['payload']['bitcoin']['usd'] for r in records] == [1.0, 2.0, 3.0]
+        assert records[0]['timing'] == {'total_ms': 5.0}
+        assert '_metadata' not in records[0]['payload']
+
+    def test_truncated_segment_is_read_up_to_last_record(self, directory):
+        """Test an unclosed segment (e.g. after a crash) still replays its flushed records."""
+        recorder = SegmentRecorder(directory)
+        recorder.record(make_raw(1.0))
+        recorder.record(make_raw(2.0))
+        path = recorder.get_status()['current_segment']
+        with open(path, 'rb') as f:
+            partial = f.read()
+
+        truncated = os.path.join(directory, 'segment-truncated.ndjson.gz')
+        with open(truncated, 'wb') as f:
+            f.write(partial)
+        recorder.close()
+
+        assert [r['payload']['bitcoin']['usd'] for r in iter_records([truncated])] == [1.0, 2.0]
+
+    def test_unpaced_replay_feeds_payloads_in_order(self, directory):
+        """Test replay returns recorded payloads with fresh metadata, then a finished marker."""
+        recorder = SegmentRecorder(directory)
+        for price in (1.0, 1.0, 2.0):
+            recorder.record(make_raw(price))
+        recorder.close()
+
+        replay = ReplayIngester(directory, speed=0, idle_wait=0)
+        payloads = [replay.fetch_market_data() for _ in range(3)]
+
+        assert [p['bitcoin']['usd'] for p in payloads] == [1.0, 1.0, 2.0]
+        assert [p['_metadata']['status'] for p in payloads] == ['success', 'duplicate', 'success']
+        assert 'coin_fingerprints' in payloads[0]['_metadata']
+        assert replay.fetch_market_data() == {'_metadata': {
+            'timestamp': ANY, 'source': 'CoinGecko (replay)', 'status': 'finished'
+        }}
+        assert replay.get_status()['finished'] is True
+
+    def test_replay_is_paced_by_speed(self, directory):
+        """Test recorded gaps are divided by the replay speed."""
+        os.makedirs(directory)
+        lines = b''.join(
+            b'{"recorded_at": %f, "payload": {"bitcoin": {"usd": %d}}}\n' % (1000.0 + i * 2, i)
+            for i in range(2)
+        )
+        with gzip.open(os.path.join(directory, 'segment-0.ndjson.gz'), 'wb') as f:
+            f.write(lines)
+
+        replay = ReplayIngester(directory, speed=20)
+        replay.fetch_market_data()
+        started = time.monotonic()
+        replay.fetch_market_data()
+
+        assert 0.05 < time.monotonic() - started < 1.0
+
+    def test_loop_restarts_recording(self, directory):
+        """Test looping replays the first record again after the last."""
+        recorder = SegmentRecorder(directory)
+        recorder.record(make_raw(1.0))
+        recorder.close()
+
+        replay = ReplayIngester(directory, speed=0, loop=True)
+
+        assert replay.fetch_market_data()['bitcoin']['usd'] == 1.0
+        assert replay.fetch_market_data()['bitcoin']['usd'] == 1.0
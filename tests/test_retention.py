@@ -0,0 +1,91 @@
+"""Tests for retention module."""
+import pytest
+from backend.retention import Compactor, RetentionPolicy
+from backend.storage import HistoryStore
+
+HOUR = 3600
+DAY = 86400
+
+
+class TestRetentionPolicy:
+    """Test cases for RetentionPolicy."""
+
+    @pytest.fixture
+    def policy(self):
+        """Raw for 2 days, minutes for 30 days, hours forever."""
+        return RetentionPolicy(2 * DAY, [(60, 30 * DAY), (HOUR, None)])
+
+    def test_plan_prefers_coarsest_eligible_tier(self, policy):
+        """Test a coarse step reads hourly rollups, then the tail from finer tiers."""
+        watermarks = {60: 10 * DAY - 600, HOUR: 10 * DAY - HOUR}
+
+        segments = policy.plan(9 * DAY, 10 * DAY, HOUR, watermarks, now=10 * DAY)
+
+        assert segments == [
+            (HOUR, 9 * DAY, 10 * DAY - HOUR),
+            (60, 10 * DAY - HOUR, 10 * DAY - 600),
+            (0, 10 * DAY - 600, 10 * DAY)
+        ]
+
+    def test_plan_fine_step_uses_raw(self, policy):
+        """Test a step finer than every rollup reads raw ticks only."""
+        assert policy.plan(0, 600, 10, {60: 300}, now=600) == [(0, 0, 600)]
+
+    def test_plan_falls_back_when_tier_expired(self, policy):
+        """Test a range older than a tier's retention is served by the next coarser tier."""
+        segments = policy.plan(0, DAY, 60, {60: 60 * DAY, HOUR: 60 * DAY}, now=60 * DAY)
+
+        assert segments == [(HOUR, 0, DAY)]
+
+    def test_invalid_tiers_rejected(self):
+        """Test rollups must nest."""
+        with pytest.raises(ValueError):
+            RetentionPolicy(DAY, [(60, None), (90, None)])
+
+
+class TestCompactor:
+    """Test cases for Compactor."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Store with one tick per 30 seconds for three hours."""
+        policy = RetentionPolicy(HOUR, [(60, 2 * HOUR), (HOUR, None)])
+        store = HistoryStore(str(tmp_path / 'history.db'), retention=policy)
+        store.insert_rows(('bitcoin', float(t), float(t), None, 10.0, None) for t in range(0, 3 * HOUR, 30))
+        return store
+
+    def test_rollups_are_incremental(self, store):
+        """Test each run rolls only complete new buckets and advances the watermarks."""
+        compactor = Compactor(store, store.retention, slice_seconds=HOUR, settle=0)
+
+        first = compactor.run_once(now=2 * HOUR)
+        second = compactor.run_once(now=2 * HOUR + 120)
+
+        assert first['rolled'] == {60: 120, HOUR: 2}
+        assert second['rolled'] == {60: 2, HOUR: 0}
+        assert store.watermarks() == {60: 2 * HOUR + 120, HOUR: 2 * HOUR}
+
+    def test_prune_keeps_queries_answerable(self, store):
+        """Test expired raw ticks are deleted once rolled up and queries read the rollups."""
+        before = store.query('bitcoin', 0, HOUR, HOUR)
+        compactor = Compactor(store, store.retention, slice_seconds=600, settle=0)
+
+        result = compactor.run_once(now=3 * HOUR)
+        after = store.query('bitcoin', 0, HOUR, HOUR)
+
+        assert result['pruned'][0] == 240
+        assert result['pruned'][60] == 60
+        assert store.earliest(0) == 2 * HOUR
+        assert after == before
+        assert after[0]['samples'] == 120
+        assert after[0]['market_cap_usd'] is None
+
+    def test_bucket_split_across_tiers_is_merged(self, store):
+        """Test a query bucket spanning rollups and raw ticks is returned once."""
+        Compactor(store, store.retention, slice_seconds=HOUR, settle=0).run_once(now=HOUR + 90)
+
+        points = store.query('bitcoin', HOUR, 2 * HOUR, HOUR)
+
+        assert len(points) == 1
+        assert points[0]['samples'] == 120
+        assert points[0]['price_max'] == 2 * HOUR - 30
@@ -0,0 +1,109 @@
+"""Tests for ring_buffer module."""
+import math
+import threading
+import pytest
+from backend.ring_buffer import RecentTicks, TickRingBuffer
+
+
+class TestTickRingBuffer:
+    """Test cases for TickRingBuffer and RecentTicks."""
+
+    @pytest.fixture
+    def buffer(self):
+        """Create a small buffer for testing."""
+        return TickRingBuffer(capacity=4)
+
+    def test_append_and_window(self, buffer):
+        """Test samples come back oldest first."""
+        for i in range(3):
+            buffer.append(float(i), 100.0 + i, 10.0, 1000.0)
+
+        assert len(buffer) == 3
+        assert buffer.window('price_usd').tolist() == [100.0, 101.0, 102.0]
+        assert buffer.window('timestamp', 2).tolist() == [1.0, 2.0]
+
+    def test_wraparound_keeps_last_capacity_samples(self, buffer):
+        """Test the oldest samples are overwritten once capacity is reached."""
+        for i in range(10):
+            buffer.append(float(i), float(i), None, None)
+
+        assert len(buffer) == 4
+        assert buffer.window('price_usd').tolist() == [6.0, 7.0, 8.0, 9.0]
+        assert all(math.isnan(v) for v in buffer.window('volume_24h_usd'))
+
+    def test_window_is_zero_copy_and_read_only(self, buffer):
+        """Test windows are memoryviews that callers cannot write through."""
+        buffer.append(0.0, 1.0, None, None)
+        view = buffer.window('price_usd')
+
+        assert view.readonly
+        with pytest.raises(TypeError):
+            view[0] = 5.0
+
+    def test_window_columns_are_aligned_copies(self, buffer):
+        """Test several columns come back for the same samples and do not change afterwards."""
+        for i in range(6):
+            buffer.append(float(i), 100.0 + i, None, None)
+
+        columns = buffer.window_columns(('timestamp', 'price_usd'), 3)
+        buffer.append(6.0, 106.0, None, None)
+
+        assert columns['timestamp'].tolist() == [3.0, 4.0, 5.0]
+        assert columns['price_usd'].tolist() == [103.0, 104.0, 105.0]
+        assert buffer.window_columns(('price_usd',), 10)['price_usd'].tolist() == [103.0, 104.0, 105.0, 106.0]
+
+    def test_window_columns_consistent_under_concurrent_appends(self):
+        """Test a reader never sees timestamps and values from different positions."""
+        buffer = TickRingBuffer(capacity=64)
+        stop = threading.Event()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                buffer.append(float(i), float(i), None, None)
+                i += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(2000):
+                columns = buffer.window_columns(('timestamp', 'price_usd'), 32)
+                assert columns['timestamp'] == columns['price_usd']
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_rolling_stats_ignore_nan(self, buffer):
+        """Test statistics skip missing values."""
+        buffer.append(0.0, 2.0, None, None)
+        buffer.append(1.0, None, None, None)
+        buffer.append(2.0, 4.0, None, None)
+
+        stats = buffer.rolling_stats('price_usd')
+
+        assert stats['count'] == 2
+        assert stats['mean'] == 3.0
+        assert stats['stdev'] == 1.0
+        assert (stats['min'], stats['max']) == (2.0, 4.0)
+        assert buffer.rolling_stats('volume_24h_usd')['mean'] is None
+
+    def test_memory_usage_is_fixed(self, buffer):
+        """Test memory does not grow with appended samples."""
+        before = buffer.memory_usage()
+        for i in range(100):
+            buffer.append(float(i), 1.0, 1.0, 1.0)
+
+        assert buffer.memory_usage() == before == 4 * 2 * 4 * 8
+
+    def test_recent_ticks_ingest(self):
+        """Test snapshots are split into per-crypto buffers."""
+        ticks = RecentTicks(capacity=8)
+        ticks.ingest({'cryptos': [
+            {'id': 'bitcoin', 'price_usd': 45000.0, 'volume_24h_usd': 1.0, 'market_cap_usd': 2.0},
+            {'id': 'ethereum', 'price_usd': 2500.0}
+        ]}, timestamp=60.0)
+
+        assert ticks.get('bitcoin').window('price_usd').tolist() == [45000.0]
+        assert ticks.get('solana') is None
+        assert ticks.get_status()['tracked_cryptos'] == 2
+        assert ticks.memory_usage() > 0
@@ -0,0 +1,178 @@
+"""Tests for scheduler module."""
+import threading
+import pytest
+from unittest.mock import Mock
+from backend.cache import SnapshotCache
+from backend.circuit_breaker import CircuitBreaker
+from backend.rate_limiter import TokenBucket
+from backend.replay import ReplayIngester, SegmentRecorder
+from backend.scheduler import IngestionScheduler
+
+
+class TestIngestionScheduler:
+    """Test cases for IngestionScheduler."""
+
+    @pytest.fixture
+    def ingester(self):
+        """Create a mocked ingester returning a minimal payload."""
+        ingester = Mock()
+        ingester.fetch_market_data.return_value = {
+            'bitcoin': {'usd': 45000},
+            '_metadata': {'timestamp': '2026-01-01T00:00:00', 'source': 'CoinGecko'}
+        }
+        return ingester
+
+    @pytest.fixture
+    def transformer(self):
+        """Create a mocked transformer."""
+        transformer = Mock()
+        transformer.transform_market_data.return_value = {'cryptos': [], 'summary': {}}
+        return transformer
+
+    def test_run_once_publishes_snapshot(self, ingester, transformer):
+        """Test a single cycle fetches, transforms and publishes."""
+        published = []
+        scheduler = IngestionScheduler(ingester, transformer, published.append, interval=60)
+
+        result = scheduler.run_once()
+
+        assert result == {'cryptos': [], 'summary': {}}
+        assert published == [result]
+        assert scheduler.run_count == 1
+        assert scheduler.failure_count == 0
+
+    def test_run_once_failure_calls_on_error(self, ingester, transformer):
+        """Test a failed fetch is counted and does not publish."""
+        ingester.fetch_market_data.return_value = None
+        publish = Mock()
+        on_error = Mock()
+        scheduler = IngestionScheduler(ingester, transformer, publish, interval=60, on_error=on_error)
+
+        assert scheduler.run_once() is None
+        publish.assert_not_called()
+        on_error.assert_called_once()
+        assert scheduler.failure_count == 1
+
+    def test_start_and_stop(self, ingester, transformer):
+        """Test the background loop runs and shuts down cleanly."""
+        published = threading.Event()
+        scheduler = IngestionScheduler(
+            ingester, transformer, lambda data: published.set(), interval=60
+        )
+
+        assert scheduler.start() is True
+        assert scheduler.start() is False  # already running
+        assert published.wait(2)
+
+        scheduler.stop(timeout=2)
+
+        assert scheduler.is_running is False
+        assert scheduler.get_status()['running'] is False
+
+    @pytest.mark.parametrize('status', ['not_modified', 'duplicate'])
+    def test_not_modified_skips_transform(self, ingester, transformer, status):
+        """Test an unchanged upstream payload is neither transformed nor published."""
+        ingester.fetch_market_data.return_value = {
+            '_metadata': {'timestamp': '2026-01-01T00:00:00', 'status': status}
+        }
+        publish = Mock()
+        on_unchanged = Mock()
+        scheduler = IngestionScheduler(
+            ingester, transformer, publish, interval=60, on_unchanged=on_unchanged
+        )
+
+        assert scheduler.run_once() is None
+        transformer.transform_market_data.assert_not_called()
+        publish.assert_not_called()
+        on_unchanged.assert_called_once()
+        transformer.record_unchanged_payload.assert_called_once()
+        assert scheduler.unchanged_count == 1
+        assert scheduler.failure_count == 0
+
+    def test_exhausted_replay_stops_without_errors(self, transformer, tmp_path):
+        """Test a finished recording stops the loop without counting failures."""
+        recorder = SegmentRecorder(str(tmp_path))
+        recorder.record({'bitcoin': {'usd': 1.0}, '_metadata': {'status': 'success'}})
+        recorder.close()
+        snapshot_cache = SnapshotCache(ttl=60)
+        scheduler = IngestionScheduler(
+            ReplayIngester(str(tmp_path), speed=0, idle_wait=0), transformer,
+            snapshot_cache.publish, interval=0,
+            on_error=snapshot_cache.record_error, on_unchanged=snapshot_cache.touch
+        )
+
+        scheduler.start()
+        scheduler._thread.join(timeout=2)
+
+        assert scheduler.is_running is False
+        assert scheduler.run_count == 1
+        assert scheduler.failure_count == 0
+        assert scheduler.last_outcome == 'finished'
+        assert snapshot_cache.get().error_count == 0
+
+
+class TestAdaptivePolling:
+    """Test cases for the scheduler's delay decisions."""
+
+    @staticmethod
+    def make_scheduler(**kwargs):
+        """Scheduler whose collaborators are never called by next_delay()."""
+        return IngestionScheduler(Mock(), Mock(), Mock(), interval=60, **kwargs)
+
+    def test_fixed_interval_by_default(self):
+        """Test without min_interval the delay is the interval minus the cycle time."""
+        scheduler = self.make_scheduler()
+
+        assert scheduler.next_delay('published', 5.0) == (55.0, 'schedule')
+
+    def test_adaptive_interval_follows_changes(self):
+        """Test unchanged responses stretch the interval and new data resets it."""
+        scheduler = self.make_scheduler(min_interval=10)
+
+        assert scheduler.next_delay('published', 0.0) == (10.0, 'schedule')
+        assert scheduler.next_delay('unchanged', 0.0) == (15.0, 'schedule')
+        for _ in range(10):
+            scheduler.next_delay('unchanged', 0.0)
+        assert scheduler.poll_interval == 60.0
+        assert scheduler.next_delay('published', 0.0) == (10.0, 'schedule')
+
+    def test_budget_bounds_min_interval(self):
+        """Test the poll interval never exceeds the request budget."""
+        scheduler = self.make_scheduler(min_interval=1, rate_limiter=TokenBucket(30), calls_per_cycle=4)
+
+        assert scheduler.poll_interval == 8.0
+
+    def test_failures_back_off_exponentially(self):
+        """Test consecutive failures grow the jittered delay up to max_backoff."""
+        scheduler = self.make_scheduler(max_backoff=300)
+        delays = [scheduler.next_delay('failed', 0.0) for _ in range(6)]
+
+        assert delays[0][1] == 'schedule'
+        assert 60 <= delays[1][0] <= 120 and delays[1][1] == 'backoff'
+        assert 150 <= delays[5][0] <= 300
+        assert scheduler.next_delay('published', 0.0) == (60.0, 'schedule')
+
+    def test_retry_after_and_breaker_win(self):
+        """Test Retry-After and an open breaker override the schedule."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=500)
+        scheduler = self.make_scheduler(retry_after=lambda: 90.0, breaker=breaker)
+
+        assert scheduler.next_delay('failed', 0.0)[1] == 'retry_after'
+        breaker.record_failure()
+        delay, reason = scheduler.next_delay('skipped', 0.0)
+
+        assert reason == 'circuit_open'
+        assert delay > 400
+        assert scheduler.get_status()['circuit_breaker']['state'] == 'open'
+
+    def test_open_breaker_skips_cycles(self):
+        """Test the loop does not call upstream while the breaker is open."""
+        ingester = Mock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        scheduler = IngestionScheduler(ingester, Mock(), Mock(), interval=60, breaker=breaker)
+
+        scheduler.start()
+        scheduler.stop(timeout=2)
+
+        ingester.fetch_market_data.assert_not_called()
@@ -0,0 +1,71 @@
+"""Tests for serialization module."""
+import gzip
+import json
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+from backend.records import CryptoRecord
+from backend.serialization import EncodedBody, MIN_COMPRESS_SIZE, ResponseCache, dumps, etag_variants
+
+
+class TestSerialization:
+    """Test cases for EncodedBody and ResponseCache."""
+
+    def test_dumps_is_compact_json(self):
+        """Test dumps produces compact JSON bytes."""
+        assert json.loads(dumps({'a': [1, 2.5, None]})) == {'a': [1, 2.5, None]}
+        assert b' ' not in dumps({'a': 1, 'b': 2})
+
+    def test_dumps_converts_records(self):
+        """Test CryptoRecord rows serialize as JSON objects."""
+        record = CryptoRecord('bitcoin', 'Bitcoin', 45000.0, transformed_at='2026-01-01T00:00:00')
+        assert json.loads(dumps({'cryptos': [record]})) == {'cryptos': [record.to_dict()]}
+
+    def test_large_bodies_are_precompressed(self):
+        """Test bodies above the threshold get a gzip variant."""
+        raw = dumps({'cryptos': [{'id': f'coin{i}', 'price_usd': i} for i in range(200)]})
+        body = EncodedBody(raw)
+
+        assert len(raw) >= MIN_COMPRESS_SIZE
+        assert gzip.decompress(body.variants['gzip']) == raw
+
+    def test_small_bodies_are_not_compressed(self):
+        """Test tiny bodies are only served as identity."""
+        body = EncodedBody(b'{}')
+
+        assert list(body.variants) == ['identity']
+
+    def test_negotiate(self):
+        """Test Accept-Encoding negotiation honors q-values."""
+        body = EncodedBody(b'x' * MIN_COMPRESS_SIZE)
+
+        assert body.negotiate(parse_accept_header('gzip, deflate', Accept)) == 'gzip'
+        assert body.negotiate(parse_accept_header('gzip;q=0', Accept)) == 'identity'
+        assert body.negotiate(None) == 'identity'
+
+    def test_response_cache_builds_once(self):
+        """Test identical keys reuse the serialized body."""
+        cache = ResponseCache(max_entries=2)
+        calls = []
+
+        def build():
+            calls.append(1)
+            return {'version': 1}
+
+        first = cache.get_or_build(('data', 1), build)
+        second = cache.get_or_build(('data', 1), build)
+
+        assert first is second
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_response_cache_evicts_oldest(self):
+        """Test the cache stays bounded."""
+        cache = ResponseCache(max_entries=2)
+        for version in range(3):
+            cache.get_or_build(('data', version), lambda: {})
+
+        assert cache.get_status()['entries'] == 2
+
+    def test_etag_variants(self):
+        """Test each encoding gets a distinct strong ETag."""
+        assert etag_variants('5-0') == {'identity': '5-0', 'gzip': '5-0-gzip', 'br': '5-0-br'}
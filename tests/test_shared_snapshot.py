@@ -0,0 +1,99 @@
+"""Tests for shared_snapshot module."""
+import os
+import subprocess
+import sys
+import threading
+import pytest
+from backend.shared_snapshot import LeaderLock, SharedSnapshotFile, SharedSnapshotSync
+
+
+class TestSharedSnapshot:
+    """Test cases for the memory-mapped snapshot region and leader election."""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        """Shared file path."""
+        return str(tmp_path / 'snapshot.shm')
+
+    def test_write_then_read_zero_copy(self, path):
+        """Test a published body is read back as views into the mapping."""
+        writer = SharedSnapshotFile(path, slot_capacity=1024)
+        reader = SharedSnapshotFile(path, slot_capacity=1024)
+        assert reader.read() is None
+
+        writer.write(3, {'identity': b'{"v":3}', 'gzip': b'gz'}, error_count=1, update_count=3)
+        body = reader.read()
+
+        assert (body.version, body.error_count, body.update_count) == (3, 1, 3)
+        assert isinstance(body.variants['identity'], memoryview)
+        assert bytes(body.variants['identity']) == b'{"v":3}'
+        assert bytes(body.variants['gzip']) == b'gz'
+        assert reader.read() is body
+
+    def test_writes_alternate_slots(self, path):
+        """Test the previous body stays intact while the next one is written."""
+        shared = SharedSnapshotFile(path, slot_capacity=1024)
+        shared.write(1, {'identity': b'first'})
+        first = shared.read()
+        shared.write(2, {'identity': b'second'})
+
+        assert bytes(first.variants['identity']) == b'first'
+        assert bytes(shared.read().variants['identity']) == b'second'
+        assert shared.sequence() == 4
+
+    def test_oversized_body_is_rejected(self, path):
+        """Test bodies larger than a slot are not published."""
+        shared = SharedSnapshotFile(path, slot_capacity=8)
+
+        assert shared.write(1, {'identity': b'x' * 9}) is False
+        assert shared.read() is None
+
+    def test_read_from_another_process(self, path):
+        """Test a body written by another process is visible here."""
+        script = (
+            "import sys; sys.path.insert(0, sys.argv[2]);"
+            "from backend.shared_snapshot import SharedSnapshotFile;"
+            "SharedSnapshotFile(sys.argv[1], slot_capacity=1024).write(7, {'identity': b'from child'})"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, '-c', script, path, root], check=True)
+
+        body = SharedSnapshotFile(path, slot_capacity=1024).read()
+        assert body.version == 7
+        assert bytes(body.variants['identity']) == b'from child'
+
+    def test_only_one_leader(self, path):
+        """Test the leader lock is exclusive until released."""
+        first, second = LeaderLock(path + '.lock'), LeaderLock(path + '.lock')
+
+        assert first.try_acquire() is True
+        assert second.try_acquire() is False
+        first.release()
+        assert second.try_acquire() is True
+        second.release()
+
+    def test_follower_receives_leader_publish(self, path):
+        """Test followers never lead and pick up each publish within milliseconds."""
+        received = threading.Event()
+        bodies = []
+
+        def on_snapshot(body):
+            bodies.append(bytes(body.variants['identity']))
+            received.set()
+
+        leader = SharedSnapshotSync(path, on_leader=lambda: None, on_snapshot=on_snapshot,
+                                    slot_capacity=1024, poll_interval=0.001)
+        follower = SharedSnapshotSync(path, on_leader=lambda: None, on_snapshot=on_snapshot,
+                                      slot_capacity=1024, poll_interval=0.001)
+        leader.start()
+        follower.start()
+        try:
+            assert leader.is_leader and follower.is_follower
+            assert follower.publish(1, {'identity': b'ignored'}) is False
+            leader.publish(1, {'identity': b'snapshot'})
+
+            assert received.wait(0.5)
+            assert bodies == [b'snapshot']
+        finally:
+            follower.stop()
+            leader.stop()
@@ -0,0 +1,91 @@
+"""Tests for storage module."""
+import pytest
+from backend.storage import HistoryStore, snapshot_rows, to_epoch
+
+
+class TestHistoryStore:
+    """Test cases for HistoryStore."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Create store backed by a temporary database."""
+        store = HistoryStore(str(tmp_path / 'history.db'), batch_size=100)
+        yield store
+        store.stop(timeout=2)
+
+    @staticmethod
+    def make_snapshot(timestamp, price):
+        """Build a minimal transformed snapshot."""
+        return {
+            'timestamp': timestamp,
+            'cryptos': [
+                {'id': 'bitcoin', 'price_usd': price, 'market_cap_usd': 1e12,
+                 'volume_24h_usd': 2e10, 'change_24h_percent': 1.5},
+                {'id': 'ethereum', 'price_usd': price / 10, 'market_cap_usd': 3e11,
+                 'volume_24h_usd': 1e10, 'change_24h_percent': -0.5}
+            ]
+        }
+
+    def test_to_epoch(self):
+        """Test ISO strings are interpreted as UTC."""
+        assert to_epoch('1970-01-01T00:01:00') == 60.0
+        assert to_epoch('120') == 120.0
+        for value in ('inf', 'nan', float('-inf')):
+            with pytest.raises(ValueError):
+                to_epoch(value)
+
+    def test_snapshot_rows(self):
+        """Test snapshot flattening."""
+        rows = snapshot_rows(self.make_snapshot('1970-01-01T00:00:10', 100.0))
+
+        assert rows[0] == ('bitcoin', 10.0, 100.0, 1e12, 2e10, 1.5)
+        assert len(rows) == 2
+
+    def test_enqueue_persists_in_background(self, store):
+        """Test queued snapshots are written by the writer thread."""
+        for i in range(10):
+            assert store.enqueue(self.make_snapshot(float(i * 60), 100.0 + i))
+        store.flush()
+
+        assert store.rows_written == 20
+        points = store.query('bitcoin', 0, 600, 60)
+        assert len(points) == 10
+        assert points[0]['price_usd'] == 100.0
+
+    def test_query_downsamples(self, store):
+        """Test range queries aggregate ticks into step-sized buckets."""
+        store.insert_rows(('bitcoin', float(t), float(t), None, None, None) for t in range(0, 600, 10))
+
+        points = store.query('bitcoin', 0, 600, 300)
+
+        assert len(points) == 2
+        assert points[0]['samples'] == 30
+        assert points[0]['price_min'] == 0.0
+        assert points[0]['price_max'] == 290.0
+        assert points[1]['timestamp'].startswith('1970-01-01T00:05:00')
+
+    def test_query_respects_range_and_id(self, store):
+        """Test rows outside the range or for other ids are excluded."""
+        store.insert_rows([
+            ('bitcoin', 50.0, 1.0, None, None, None),
+            ('bitcoin', 150.0, 2.0, None, None, None),
+            ('ethereum', 60.0, 3.0, None, None, None)
+        ])
+
+        points = store.query('bitcoin', 0, 100, 10)
+
+        assert [p['price_usd'] for p in points] == [1.0]
+
+    def test_candles_persist_and_query(self, store):
+        """Test sealed candles are upserted by the writer and read back oldest first."""
+        rows = [('bitcoin', '1m', float(start), 1.0, 2.0, 0.5, 1.5, None, 3) for start in (0, 60, 120)]
+        assert store.enqueue_candles(rows)
+        assert store.enqueue_candles([('bitcoin', '1m', 120.0, 1.0, 9.0, 0.5, 8.0, None, 4)])
+        store.flush()
+
+        assert store.candles_written == 4
+        assert store.query_candles('bitcoin', '1m', 2) == [
+            (60.0, 1.0, 2.0, 0.5, 1.5, None, 3),
+            (120.0, 1.0, 9.0, 0.5, 8.0, None, 4)
+        ]
+        assert [row[0] for row in store.query_candles('bitcoin', '1m', 10, before=120.0)] == [0.0, 60.0]
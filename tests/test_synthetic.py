@@ -0,0 +1,32 @@
+"""Tests for the synthetic CoinGecko stand-in used by the benchmarks."""
+from backend.data_ingestion import CoinGeckoIngester
+from benchmarks.synthetic import StubCoinGecko, make_ids, make_price_payload
+
+
+class TestSyntheticPayloads:
+    """Test cases for payload generation and the stub server."""
+
+    def test_null_and_malformed_rates(self):
+        """Test generated payloads honour the configured rates and are reproducible."""
+        ids = make_ids(10000)
+        payload = make_price_payload(ids, null_rate=0.1, malformed_rate=0.05, seed=1)
+
+        nulls = sum(1 for entry in payload.values() if isinstance(entry, dict) and entry['usd'] is None)
+        malformed = sum(1 for entry in payload.values()
+                        if not isinstance(entry, dict) or isinstance(entry['usd'], str))
+        assert 800 < nulls < 1200
+        assert 350 < malformed < 650
+        assert payload == make_price_payload(ids, null_rate=0.1, malformed_rate=0.05, seed=1)
+
+    def test_ingester_fetches_from_stub(self):
+        """Test CoinGeckoIngester can ingest chunked payloads from the stub."""
+        with StubCoinGecko(25) as stub:
+            ingester = CoinGeckoIngester(stub.url, stub.ids, chunk_size=10)
+            try:
+                data = ingester.fetch_market_data()
+            finally:
+                ingester.close()
+
+        assert len(data) - 1 == 25
+        assert data['_metadata']['status'] == 'success'
+        assert stub.request_count == 3
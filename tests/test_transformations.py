@@ -1,7 +1,8 @@
 """Tests for transformations module."""
 import pytest
+import warnings
 from datetime import datetime
-from backend.transformations import DataTransformer
+from backend.transformations import DataTransformer, _round2
 from backend.config import DevelopmentConfig
 
 
@@ -140,3 +141,146 @@ class TestDataTransformer:
         
         # 4 valid out of 5 = 80%
         assert result['summary']['data_quality_score'] == 80.0
+    
+    @staticmethod
+    def make_large_payload(size):
+        """Build a synthetic payload with a mix of valid and invalid records."""
+        raw_data = {}
+        for i in range(size):
+            crypto_id = f"coin_{i}"
+            if i % 10 == 0:
+                raw_data[crypto_id] = {'usd_market_cap': 1000}  # missing usd
+            elif i % 17 == 0:
+                raw_data[crypto_id] = {'usd': 'n/a'}  # malformed price
+            else:
+                raw_data[crypto_id] = {
+                    'usd': (i * 7919 % 100000) / 1000 + 0.005,
+                    'usd_market_cap': i * 1000,
+                    'usd_24h_vol': i * 10.5,
+                    'usd_24h_change': (i % 40) - 20.0
+                }
+        raw_data['_metadata'] = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'source': 'CoinGecko',
+            'status': 'success'
+        }
+        return raw_data
+    
+    def test_batch_transform_parity(self, transformer):
+        """Test the vectorized path matches the scalar path record for record."""
+        pytest.importorskip('numpy')
+        transformer.batch_min_size = None
+        raw_data = self.make_large_payload(2000)
+        
+        scalar = transformer.transform_market_data(raw_data)
+        batch = transformer.transform_market_data_batch(raw_data)
+        
+        strip = lambda rows: [{k: v for k, v in row.items() if k != 'transformed_at'} for row in rows]
+        assert strip(batch['cryptos']) == strip(scalar['cryptos'])
+        assert batch['summary'] == scalar['summary']
+        assert batch['timestamp'] == scalar['timestamp']
+        assert batch['summary']['null_count'] == 200 + 106
+    
+    def test_batch_transform_rounding_matches_builtin(self, transformer):
+        """Test half-way values round exactly like round()."""
+        pytest.importorskip('numpy')
+        prices = [2.675, 1.005, 0.285, 0.125, 0.375, 1e15 + 0.5, -3.335, 45000]
+        raw_data = {f"c{i}": {'usd': p} for i, p in enumerate(prices)}
+        raw_data['_metadata'] = {'timestamp': '2026-01-01T00:00:00', 'source': 'CoinGecko'}
+        
+        result = transformer.transform_market_data_batch(raw_data)
+        
+        assert [c['price_usd'] for c in result['cryptos']] == [round(float(p), 2) for p in prices]
+
+    def test_round2_non_finite_and_large_values(self):
+        """Test inf, NaN and values past 2**53 / 100 match round() without NumPy warnings."""
+        np = pytest.importorskip('numpy')
+        values = [float('inf'), float('-inf'), float('nan'), 9.2e13 + 0.125, -1e15 - 0.375,
+                  1e17 + 8, 1.7e308, 2.675, -0.005]
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            rounded = _round2(np.array(values, dtype=np.float64))
+
+        np.testing.assert_array_equal(rounded, [round(v, 2) for v in values])
+    
+    def test_large_payload_dispatches_to_batch(self, transformer):
+        """Test payloads above BATCH_TRANSFORM_MIN_SIZE use one shared timestamp."""
+        pytest.importorskip('numpy')
+        raw_data = self.make_large_payload(transformer.batch_min_size + 1)
+        
+        result = transformer.transform_market_data(raw_data)
+        
+        assert len({c['transformed_at'] for c in result['cryptos']}) == 1
+    
+    @pytest.mark.parametrize('batch', [False, True])
+    def test_unchanged_fingerprints_reuse_records(self, transformer, batch):
+        """Test records with an unchanged coin fingerprint are reused, changed ones rebuilt."""
+        if batch:
+            pytest.importorskip('numpy')
+        transform = transformer.transform_market_data_batch if batch else transformer.transform_market_data
+        raw_data = {'bitcoin': {'usd': 45000}, 'ethereum': {'usd': 2500}}
+        raw_data['_metadata'] = {'timestamp': '2026-01-01T00:00:00', 'source': 'CoinGecko', 'coin_fingerprints': {'bitcoin': 1, 'ethereum': 2}}
+        first = transform(raw_data)
+        
+        raw_data['ethereum'] = {'usd': 2600}
+        raw_data['_metadata']['coin_fingerprints'] = {'bitcoin': 1, 'ethereum': 3}
+        second = transform(raw_data)
+        
+        assert second['cryptos'][0] is first['cryptos'][0]
+        assert second['cryptos'][1]['price_usd'] == 2600
+        assert second['summary']['valid_count'] == 2
+        assert transformer.reused_count == 1
+    
+    def test_records_share_one_timestamp(self, transformer):
+        """Test all rows of a scalar transform share one timestamp string."""
+        raw_data = {'bitcoin': {'usd': 45000}, 'ethereum': {'usd': 2500}}
+        raw_data['_metadata'] = {'timestamp': '2026-01-01T00:00:00', 'source': 'CoinGecko'}
+        
+        first, second = transformer.transform_market_data(raw_data)['cryptos']
+        
+        assert first['transformed_at'] is second['transformed_at']
+
+    @pytest.mark.parametrize('batch', [False, True])
+    def test_quote_currencies_in_one_pass(self, batch):
+        """Test quote currencies get their own rows and summary from the same payload."""
+        if batch:
+            pytest.importorskip('numpy')
+        
+        class Config(DevelopmentConfig):
+            VS_CURRENCIES = ['usd', 'eur']
+        
+        transformer = DataTransformer(Config)
+        transform = transformer.transform_market_data_batch if batch else transformer.transform_market_data
+        raw_data = {
+            'bitcoin': {'usd': 45000, 'eur': 41400.456, 'eur_market_cap': 8e11, 'eur_24h_change': 1.5},
+            'ethereum': {'usd': 2500, 'eur': None},
+            '_metadata': {'timestamp': '2026-01-01T00:00:00', 'source': 'CoinGecko'}
+        }
+        
+        result = transform(raw_data)
+        eur = result['quotes']['eur']
+        
+        assert [c['id'] for c in result['cryptos']] == ['bitcoin', 'ethereum']
+        assert [c.to_dict() for c in eur['cryptos']] == [{
+            'id': 'bitcoin', 'name': 'Bitcoin', 'price_eur': 41400.46, 'market_cap_eur': 8e11,
+            'volume_24h_eur': None, 'change_24h_percent': 1.5,
+            'transformed_at': result['cryptos'][0]['transformed_at']
+        }]
+        assert eur['summary']['valid_count'] == 1
+        assert eur['summary']['null_count'] == 1
+        assert eur['summary']['errors'] is result['summary']['errors']
+    
+    def test_quotes_reused_with_unchanged_fingerprint(self):
+        """Test quote rows are reused together with their USD record."""
+        class Config(DevelopmentConfig):
+            VS_CURRENCIES = ['usd', 'gbp']
+        
+        transformer = DataTransformer(Config)
+        raw_data = {'bitcoin': {'usd': 45000, 'gbp': 35000}}
+        raw_data['_metadata'] = {'timestamp': 't', 'source': 'CoinGecko', 'coin_fingerprints': {'bitcoin': 1}}
+        
+        first = transformer.transform_market_data(raw_data)
+        second = transformer.transform_market_data(raw_data)
+        
+        assert second['quotes']['gbp']['cryptos'][0] is first['quotes']['gbp']['cryptos'][0]
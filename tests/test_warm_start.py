@@ -0,0 +1,88 @@
+"""Tests for warm_start module."""
+import json
+import os
+import threading
+import pytest
+from unittest.mock import patch
+from backend.warm_start import LastGoodSnapshot, write_atomic
+
+
+class TestWriteAtomic:
+    """Test cases for atomic file replacement."""
+
+    def test_replaces_file_without_leftovers(self, tmp_path):
+        """Test the target holds the new bytes and no temporary file remains."""
+        path = tmp_path / 'nested' / 'body.json'
+        write_atomic(str(path), b'old')
+        write_atomic(str(path), b'new')
+
+        assert path.read_bytes() == b'new'
+        assert os.listdir(path.parent) == ['body.json']
+
+
+class TestLastGoodSnapshot:
+    """Test cases for the persisted last good snapshot."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Create a store in a temporary directory."""
+        return LastGoodSnapshot(str(tmp_path / 'last_snapshot.json'))
+
+    def test_round_trip(self, store):
+        """Test a saved body loads back with its parsed payload and exact bytes."""
+        body = json.dumps({'data': {'cryptos': []}, 'version': 3, 'last_update': None,
+                           'stats': {'update_count': 3, 'error_count': 0}}).encode()
+
+        assert store.save(3, body)
+        payload, raw = store.load()
+
+        assert raw == body
+        assert payload['version'] == 3
+        assert store.get_status()['last_saved_version'] == 3
+        assert store.get_status()['loaded_version'] == 3
+
+    def test_missing_file_loads_nothing(self, store):
+        """Test a first start without a persisted snapshot."""
+        assert store.load() is None
+
+    @pytest.mark.parametrize('content', [b'{"data": {"cryptos": [', b'[]', b'{"data": null, "version": 1}'])
+    def test_unusable_file_is_ignored(self, store, content):
+        """Test truncated or unexpected content never prevents startup."""
+        with open(store.path, 'wb') as f:
+            f.write(content)
+
+        assert store.load() is None
+
+    def test_failed_save_is_counted(self, tmp_path):
+        """Test a write error is reported instead of raised."""
+        blocker = tmp_path / 'file'
+        blocker.write_bytes(b'')
+        store = LastGoodSnapshot(str(blocker / 'last_snapshot.json'))
+
+        assert not store.save(1, b'{}')
+        assert store.get_status()['errors'] == 1
+
+    def test_submit_writes_in_background_and_coalesces(self, store):
+        """Test submit() returns at once and bodies queued during a write collapse to the newest."""
+        started, release = threading.Event(), threading.Event()
+        written = []
+
+        def slow_write(path, data):
+            started.set()
+            release.wait(5)
+            written.append(data)
+
+        with patch('backend.warm_start.write_atomic', side_effect=slow_write):
+            store.submit(1, b'{"v": 1}')
+            assert started.wait(5)
+            for version in (2, 3, 4):
+                store.submit(version, f'{{"v": {version}}}'.encode())
+            assert written == []
+            release.set()
+            assert store.flush(timeout=5)
+        store.stop(timeout=5)
+
+        assert written == [b'{"v": 1}', b'{"v": 4}']
+        assert store.get_status()['coalesced'] == 2
+        assert store.get_status()['last_saved_version'] == 4
+        assert not store.is_running